@@ -0,0 +1,91 @@
+import csv
+from datetime import date, timedelta
+from pathlib import Path
+from random import Random
+from sqlite3 import connect
+from typing import Any, Iterator, List, Union
+
+from openpyxl import Workbook
+
+PathLike = Union[str, Path]
+
+# types of generated columns, they are repeated to reach requested width
+COLUMN_TYPES = ["INTEGER", "REAL", "TEXT", "DATE"]
+_WORDS = "lorem ipsum dolor sit amet consectetur adipiscing elit sed".split()
+
+
+def column_names(width: int) -> List[str]:
+    return [f"c{i}" for i in range(width)]
+
+
+def column_types(width: int) -> List[str]:
+    return [COLUMN_TYPES[i % len(COLUMN_TYPES)] for i in range(width)]
+
+
+def _value(random: Random, type_: str) -> Any:
+    if type_ == "INTEGER":
+        return random.randrange(1_000_000)
+    if type_ == "REAL":
+        return round(random.uniform(0, 1000), 3)
+    if type_ == "DATE":
+        return date(2000, 1, 1) + timedelta(days=random.randrange(10000))
+    return " ".join(random.choices(_WORDS, k=random.randint(1, 5)))
+
+
+def generate_rows(rows: int, width: int, seed: int = 0) -> Iterator[List[Any]]:
+    """Yields the same pseudo-random rows for the same arguments."""
+    random = Random(seed)
+    types = column_types(width)
+    for _ in range(rows):
+        yield [_value(random, type_) for type_ in types]
+
+
+def create_table_sql(table: str, width: int) -> str:
+    columns = ", ".join(
+        f"{name} {type_}"
+        for name, type_ in zip(column_names(width), column_types(width))
+    )
+    return f"CREATE TABLE {table} (id INTEGER PRIMARY KEY, {columns})"
+
+
+def generate_sqlite(
+    path: PathLike, rows: int, width: int, table: str = "data", seed: int = 0
+) -> None:
+    """Creates SQLite database with table ``table`` of generated rows."""
+    connection = connect(path)
+    try:
+        connection.execute(create_table_sql(table, width))
+        names = ", ".join(column_names(width))
+        marks = ", ".join("?" * width)
+        connection.executemany(
+            f"INSERT INTO {table} ({names}) VALUES ({marks})",
+            (
+                [str(v) if isinstance(v, date) else v for v in row]
+                for row in generate_rows(rows, width, seed)
+            ),
+        )
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def generate_csv(path: PathLike, rows: int, width: int, seed: int = 0) -> None:
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(column_names(width))
+        writer.writerows(generate_rows(rows, width, seed))
+
+
+def generate_xlsx(
+    path: PathLike,
+    rows: int,
+    width: int,
+    worksheet: str = "data",
+    seed: int = 0,
+) -> None:
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(worksheet)
+    sheet.append(column_names(width))
+    for row in generate_rows(rows, width, seed):
+        sheet.append(row)
+    workbook.save(path)
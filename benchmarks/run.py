@@ -0,0 +1,355 @@
+"""Benchmarks of the data layer on synthetic datasets.
+
+Usage::
+
+    python -m benchmarks.run --rows 100000 --width 8 --output results.json
+
+Every benchmark is repeated on a fresh copy of the generated database, only
+the measured part of it is timed. Results are printed (or written to
+``--output``) as a JSON document.
+"""
+import json
+import platform
+import shutil
+import sqlite3
+import subprocess
+import sys
+from argparse import ArgumentParser
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from random import Random
+from statistics import mean, median
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import sqlalchemy
+
+from benchmarks.datagen import (
+    create_table_sql,
+    generate_csv,
+    generate_sqlite,
+    generate_xlsx,
+)
+from dbeditor.database import Database
+from dbeditor.loaders.coercion import Coercer
+from dbeditor.loaders.csv_loader import CSVLoader
+from dbeditor.loaders.merger import Merger
+from dbeditor.loaders.xls_loader import XLSLoader
+from dbeditor.uri_builder import DatabaseKind, build_uri, default_policy
+
+TABLE = "data"
+IMPORTED = "imported"
+
+
+@dataclass
+class Dataset:
+    directory: Path
+    rows: int
+    width: int
+    # number of single-row edits and deletes
+    operations: int
+    seed: int = 0
+
+    @property
+    def sqlite(self) -> Path:
+        return self.directory / "data.sqlite"
+
+    @property
+    def csv(self) -> Path:
+        return self.directory / "data.csv"
+
+    @property
+    def xlsx(self) -> Path:
+        return self.directory / "data.xlsx"
+
+    def generate(self) -> None:
+        generate_sqlite(self.sqlite, self.rows, self.width, TABLE, self.seed)
+        generate_csv(self.csv, self.rows, self.width, self.seed)
+        generate_xlsx(self.xlsx, self.rows, self.width, TABLE, self.seed)
+
+
+class Timer:
+    """Sums durations of measured blocks."""
+
+    def __init__(self) -> None:
+        self.elapsed = 0.0
+
+    @contextmanager
+    def measure(self) -> Iterator[None]:
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.elapsed += perf_counter() - start
+
+
+# takes dataset, path of a fresh copy of its database and timer, returns
+# number of processed items
+Benchmark = Callable[[Dataset, Path, Timer], int]
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str) -> Callable[[Benchmark], Benchmark]:
+    def register(function: Benchmark) -> Benchmark:
+        BENCHMARKS[name] = function
+        return function
+
+    return register
+
+
+def open_database(path: Path, cache_size: int = 0) -> Database:
+    """Opens the database the way the editor does, but without the result
+    cache unless ``cache_size`` is given."""
+    uri = build_uri(DatabaseKind.SQLITE, str(path))
+    policy = default_policy(DatabaseKind.SQLITE, str(path))
+    return Database(uri, policy=policy, cache_size=cache_size)
+
+
+@benchmark("csv_loader")
+def csv_loader(dataset: Dataset, path: Path, timer: Timer) -> int:
+    with open(dataset.csv, newline="") as file, timer.measure():
+        return sum(1 for _ in CSVLoader(file))
+
+
+@benchmark("xls_loader")
+def xls_loader(dataset: Dataset, path: Path, timer: Timer) -> int:
+    with timer.measure():
+        return sum(1 for _ in XLSLoader(dataset.xlsx, TABLE))
+
+
+def _merge_csv(
+    dataset: Dataset, path: Path, timer: Timer, fast_import: bool
+) -> int:
+    database = open_database(path)
+    database.execute_raw(create_table_sql(IMPORTED, dataset.width))
+    table = database.get_table(IMPORTED)
+    merger = Merger(table, coercer=Coercer(table), fast_import=fast_import)
+    with open(dataset.csv, newline="") as file, timer.measure():
+        with database.session as session:
+            merger.merge(session, CSVLoader(file))
+    database.engine.dispose()
+    return dataset.rows
+
+
+@benchmark("merge_csv")
+def merge_csv(dataset: Dataset, path: Path, timer: Timer) -> int:
+    return _merge_csv(dataset, path, timer, fast_import=False)
+
+
+@benchmark("merge_csv_fast_import")
+def merge_csv_fast_import(dataset: Dataset, path: Path, timer: Timer) -> int:
+    return _merge_csv(dataset, path, timer, fast_import=True)
+
+
+@benchmark("select_all")
+def select_all(dataset: Dataset, path: Path, timer: Timer) -> int:
+    database = open_database(path)
+    with timer.measure():
+        return len(database.select_all(TABLE))
+
+
+@benchmark("paged_read")
+def paged_read(dataset: Dataset, path: Path, timer: Timer) -> int:
+    database = open_database(path)
+    with timer.measure():
+        return sum(1 for _ in database.iter_rows(TABLE))
+
+
+@benchmark("select_rowid")
+def select_rowid(dataset: Dataset, path: Path, timer: Timer) -> int:
+    database = open_database(path)
+    with timer.measure():
+        return len(database.select_rowid(TABLE))
+
+
+def _positions(dataset: Dataset) -> List[int]:
+    random = Random(dataset.seed)
+    count = min(dataset.operations, dataset.rows)
+    return random.sample(range(dataset.rows), count)
+
+
+@benchmark("rowid_edit")
+def rowid_edit(dataset: Dataset, path: Path, timer: Timer) -> int:
+    database = open_database(path)
+    positions = _positions(dataset)
+    with timer.measure():
+        for value, position in enumerate(positions):
+            rowid = database.get_rowid(TABLE, position)
+            database.update_row_through_rowid(TABLE, rowid, {"c0": value})
+    return len(positions)
+
+
+@benchmark("rowid_delete")
+def rowid_delete(dataset: Dataset, path: Path, timer: Timer) -> int:
+    database = open_database(path)
+    positions = _positions(dataset)
+    with timer.measure():
+        # positions of the remaining rows shift after every deletion
+        for position in sorted(positions, reverse=True):
+            rowid = database.get_rowid(TABLE, position)
+            database.delete_row_through_rowid(TABLE, rowid)
+    return len(positions)
+
+
+_RAW_QUERIES = [
+    f"SELECT * FROM {TABLE}",
+    f"SELECT c0 % 100 AS bucket, count(*), avg(c1) FROM {TABLE} GROUP BY 1",
+    f"SELECT * FROM {TABLE} WHERE c0 < 10000 ORDER BY c1",
+]
+
+
+def _execute_raw(path: Path, timer: Timer, cache_size: int) -> int:
+    database = open_database(path, cache_size)
+    fetched = 0
+    with timer.measure():
+        for query in _RAW_QUERIES * 2:
+            result = database.execute_raw(query)
+            assert result is not None
+            fetched += len(result[1])
+    return fetched
+
+
+@benchmark("execute_raw")
+def execute_raw(dataset: Dataset, path: Path, timer: Timer) -> int:
+    return _execute_raw(path, timer, cache_size=0)
+
+
+@benchmark("execute_raw_cached")
+def execute_raw_cached(dataset: Dataset, path: Path, timer: Timer) -> int:
+    return _execute_raw(path, timer, cache_size=256 * 1024 * 1024)
+
+
+@dataclass
+class Result:
+    name: str
+    items: int
+    times: List[float] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, Any]:
+        best = min(self.times)
+        return {
+            **asdict(self),
+            "min": best,
+            "median": median(self.times),
+            "mean": mean(self.times),
+            "items_per_second": self.items / best if best else None,
+        }
+
+
+def run_benchmark(
+    name: str, dataset: Dataset, repeat: int, work_directory: Path
+) -> Result:
+    function = BENCHMARKS[name]
+    result = Result(name, 0)
+    for attempt in range(repeat):
+        path = work_directory / f"{name}-{attempt}.sqlite"
+        shutil.copyfile(dataset.sqlite, path)
+        timer = Timer()
+        result.items = function(dataset, path, timer)
+        result.times.append(timer.elapsed)
+        path.unlink()
+    return result
+
+
+def _commit() -> Optional[str]:
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip()
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "sqlalchemy": sqlalchemy.__version__,
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "commit": _commit(),
+    }
+
+
+def run(
+    rows: int,
+    width: int,
+    repeat: int = 3,
+    operations: int = 1000,
+    names: Optional[Sequence[str]] = None,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Generates a dataset and runs benchmarks on it.
+
+    :param rows: number of generated rows
+    :param width: number of generated columns
+    :param repeat: number of runs of every benchmark
+    :param operations: number of single-row edits and deletes
+    :param names: names of benchmarks to run, all of them if ``None``
+    :param seed: seed of generated data
+    :return: JSON-serializable report
+    :raises ValueError: if one of ``names`` is unknown or ``width`` is less
+        than 2.
+    """
+    if width < 2:
+        raise ValueError("Width must be at least 2.")
+    names = list(BENCHMARKS) if names is None else list(names)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+    with TemporaryDirectory() as directory:
+        dataset = Dataset(Path(directory), rows, width, operations, seed)
+        dataset.generate()
+        results = [
+            run_benchmark(name, dataset, repeat, Path(directory))
+            for name in names
+        ]
+    return {
+        "environment": environment(),
+        "parameters": {
+            "rows": rows,
+            "width": width,
+            "repeat": repeat,
+            "operations": operations,
+            "seed": seed,
+        },
+        "results": [result.summary() for result in results],
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--width", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--operations", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--only", nargs="+", choices=list(BENCHMARKS), metavar="NAME"
+    )
+    parser.add_argument("--output", type=Path, help="file to write JSON to")
+    args = parser.parse_args(argv)
+    report = run(
+        args.rows,
+        args.width,
+        args.repeat,
+        args.operations,
+        args.only,
+        args.seed,
+    )
+    text = json.dumps(report, indent=2)
+    if args.output is None:
+        print(text)
+    else:
+        args.output.write_text(text + "\n")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,25 +1,90 @@
 import os.path
+from asyncio import gather
+from contextlib import closing, contextmanager
 from sys import exit, argv
-from typing import List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from PyQt5 import QtCore, QtWidgets, QtGui
 
-from dbeditor.database import Database
+from dbeditor.database import Database, Key
+from dbeditor.async_database import AsyncDatabase
+from dbeditor.event_loop import run_app, schedule
 from sqlalchemy.exc import SQLAlchemyError
 
-from sqlalchemy import types, Column, MetaData
-from dbeditor.uri_builder import build_uri, DatabaseKind, Netloc
+from sqlalchemy import types, Column
+from dbeditor.uri_builder import (
+    build_uri,
+    DatabaseKind,
+    Netloc,
+    default_policy,
+)
 from dbeditor.table_builder import BuilderGroup
 from dbeditor.loaders.csv_loader import CSVLoader
 from dbeditor.loaders.xls_loader import XLSLoader
+from dbeditor.loaders.arrow_loader import ArrowLoader
 from dbeditor.loaders.merger import Merger
+from dbeditor.loaders.coercion import Coercer
+from dbeditor.loaders.parallel_loader import (
+    CSVSource,
+    ParallelLoader,
+    Source,
+    worksheet_sources,
+)
+from dbeditor.table_model import TableModel
+from dbeditor.import_worker import ImportWorker, LoaderOpener
+from dbeditor.export_worker import ExportWorker, ExporterOpener
+from dbeditor.exporters import table_query
+from dbeditor.exporters.csv_exporter import CSVExporter
+from dbeditor.exporters.xls_exporter import XLSExporter
+from dbeditor.profiler import Profiler
+from dbeditor.index_advisor import IndexAdvisor, IndexSuggestion
+from dbeditor.query_stats import QueryStats, SlowQueryLog
+from dbeditor.query_worker import QueryWorker
+from dbeditor.edit_buffer import EditBuffer
+
+
+@contextmanager
+def openCSV(filename: str) -> Iterator[CSVLoader]:
+    with open(filename, newline="") as file:
+        yield CSVLoader(file)
+
+
+@contextmanager
+def openCSVExporter(filename: str) -> Iterator[CSVExporter]:
+    with open(filename, "w", newline="") as file:
+        yield CSVExporter(file)
+
+
+def exporterOpener(filename: str) -> ExporterOpener:
+    if filename.lower().endswith(".xlsx"):
+        return lambda: XLSExporter(filename)
+    return lambda: openCSVExporter(filename)
+
+
+def slowQueryLogPath() -> str:
+    location = QtCore.QStandardPaths.writableLocation(
+        QtCore.QStandardPaths.AppDataLocation
+    )
+    return os.path.join(location, "slow_queries.log")
+
+
+# number of matches selected by a single search
+SEARCH_PAGE_SIZE = 1000
 
 
 class DBeditor(QtWidgets.QMainWindow):
     def __init__(self) -> None:
         super().__init__()
         self._database: Optional[Database] = None
+        self._asyncDatabase: Optional[AsyncDatabase] = None
         self._builder_group: Optional[BuilderGroup] = None
+        self._importWorker: Optional[ImportWorker] = None
+        self._exportWorker: Optional[ExportWorker] = None
+        self._editBuffer: Optional[EditBuffer] = None
+        # table, pattern, sort and data version of the last search
+        self._lastSearch: Tuple[Any, ...] = ()
+        self._searchKey: Optional[Key] = None
+        self._searchMatches: List[int] = []
         self.setupUi()
 
     def on_database_open(self) -> None:
@@ -31,11 +96,17 @@ class DBeditor(QtWidgets.QMainWindow):
         )
         if not filename:
             return
-        self._database = Database(build_uri(DatabaseKind.SQLITE, filename))
+        self.flushEdits()
+        self._database = Database(
+            build_uri(DatabaseKind.SQLITE, filename),
+            policy=default_policy(DatabaseKind.SQLITE, filename),
+        )
         self._builder_group = BuilderGroup(self._database.engine)
+        self.resetEditBuffer()
+        self.applySlowQueryLog()
+        self.applyProfiling()
         self.addedRows = {}
-        self.tableWidget.setColumnCount(0)
-        self.tableWidget.setRowCount(0)
+        self.clearTable()
         self.tables = self._database.get_tables()
         self.initTablesMenu(self.tables)
         if self.tables:
@@ -43,9 +114,8 @@ class DBeditor(QtWidgets.QMainWindow):
         else:
             self.chosenTable = ""
             self.chosenTableLabel.clear()
+        self.connectAsync(DatabaseKind.SQLITE, filename)
         self.setWindowTitle(f"DBeditor - {os.path.basename(filename)}")
-        self.tableWidget.itemDoubleClicked.connect(self.saveItem)
-        self.tableWidget.itemChanged.connect(self.editDBfunc)
 
     def on_database_create(self) -> None:
         filename, _ = QtWidgets.QFileDialog.getSaveFileName(
@@ -57,17 +127,22 @@ class DBeditor(QtWidgets.QMainWindow):
         if not filename:
             return
         # TODO: create method for db reinit.
-        self._database = Database(build_uri(DatabaseKind.SQLITE, filename))
+        self.flushEdits()
+        self._database = Database(
+            build_uri(DatabaseKind.SQLITE, filename),
+            policy=default_policy(DatabaseKind.SQLITE, filename),
+        )
         self._builder_group = BuilderGroup(self._database.engine)
+        self.resetEditBuffer()
+        self.applySlowQueryLog()
+        self.applyProfiling()
         self.addedRows, self.tables = {}, []
         self.initTablesMenu([])
         self.chosenTable = ""
         self.chosenTableLabel.clear()
+        self.connectAsync(DatabaseKind.SQLITE, filename)
         self.setWindowTitle(f"DBeditor - {os.path.basename(filename)}")
-        self.tableWidget.setColumnCount(0)
-        self.tableWidget.setRowCount(0)
-        self.tableWidget.itemDoubleClicked.connect(self.saveItem)
-        self.tableWidget.itemChanged.connect(self.editDBfunc)
+        self.clearTable()
 
     def on_remote_connect(self) -> None:
         translateKind = {
@@ -81,17 +156,20 @@ class DBeditor(QtWidgets.QMainWindow):
             self.remoteConnectionWindow.ip.text(),
             self.remoteConnectionWindow.port.text(),
         )
-        uri = build_uri(
-            translateKind[self.remoteConnectionWindow.DBkind.currentText()],
-            self.remoteConnectionWindow.DBlocation.text(),
-            netlocation,
-        )
+        kind = translateKind[self.remoteConnectionWindow.DBkind.currentText()]
+        location = self.remoteConnectionWindow.DBlocation.text()
+        uri = build_uri(kind, location, netlocation)
         try:
-            self._database = Database(uri)
+            self.flushEdits()
+            self._database = Database(
+                uri, policy=default_policy(kind, location)
+            )
             self._builder_group = BuilderGroup(self._database.engine)
+            self.resetEditBuffer()
+            self.applySlowQueryLog()
+            self.applyProfiling()
             self.addedRows = {}
-            self.tableWidget.setColumnCount(0)
-            self.tableWidget.setRowCount(0)
+            self.clearTable()
             self.tables = self._database.get_tables()
             self.initTablesMenu(self.tables)
             if self.tables:
@@ -99,14 +177,91 @@ class DBeditor(QtWidgets.QMainWindow):
             else:
                 self.chosenTable = ""
                 self.chosenTableLabel.clear()
+            self.connectAsync(kind, location, netlocation)
             self.setWindowTitle(
                 f"DBeditor - {self.remoteConnectionWindow.DBlocation.text()}"
             )
-            self.tableWidget.itemDoubleClicked.connect(self.saveItem)
-            self.tableWidget.itemChanged.connect(self.editDBfunc)
         except SQLAlchemyError as error:
             self.remoteConnectionWindow.displayError(error)
 
+    def connectAsync(
+        self, kind: DatabaseKind, location: str, netloc: Optional[Netloc] = None
+    ) -> None:
+        schedule(self.disposeAsync())
+        schedule(self._connectAsync(self._database, kind, location, netloc))
+
+    async def disposeAsync(self) -> None:
+        asyncDatabase, self._asyncDatabase = self._asyncDatabase, None
+        if asyncDatabase is not None:
+            await asyncDatabase.dispose()
+
+    async def _connectAsync(
+        self,
+        database: Optional[Database],
+        kind: DatabaseKind,
+        location: str,
+        netloc: Optional[Netloc],
+    ) -> None:
+        # the driver is optional, without it table summaries aren't shown
+        try:
+            asyncDatabase = await AsyncDatabase.create(
+                build_uri(kind, location, netloc, asynchronous=True),
+                policy=default_policy(kind, location, asynchronous=True),
+                cache_size=0,
+            )
+        except (ImportError, SQLAlchemyError):
+            return
+        if self._database is not database:
+            await asyncDatabase.dispose()
+            return
+        self._asyncDatabase = asyncDatabase
+        if self.chosenTable and self.chosenTable not in self._builder_group:
+            await self.loadTableSummary(asyncDatabase, self.chosenTable)
+
+    async def loadTableSummary(
+        self, asyncDatabase: AsyncDatabase, table: str
+    ) -> None:
+        try:
+            rows, pk = await gather(
+                asyncDatabase.count_rows(table),
+                asyncDatabase.get_pk_column_names(table),
+            )
+        except SQLAlchemyError:
+            return
+        if asyncDatabase is self._asyncDatabase and table == self.chosenTable:
+            self.showTableSummary(table, rows, pk)
+
+    async def openTableAsync(
+        self, asyncDatabase: AsyncDatabase, table: str, model: TableModel
+    ) -> None:
+        """Loads number of rows, primary key and the first page of the table
+        concurrently, the following pages are fetched while scrolling."""
+        try:
+            # the table could be altered through the synchronous database
+            await asyncDatabase.forget_table(table)
+            await asyncDatabase.set_sort(
+                table, *(self._database.get_sort(table) or (None,))
+            )
+            summary = await asyncDatabase.open_table(table, model.page_size)
+        except SQLAlchemyError:
+            if self.tableModel is model:
+                # pages are fetched by the synchronous database instead
+                model.resume_fetching()
+                try:
+                    model.fetchMore(QtCore.QModelIndex())
+                except SQLAlchemyError as error:
+                    self.displayError(str(error))
+            return
+        if self.tableModel is model:
+            model.add_page(*summary.page)
+            self.showTableSummary(table, summary.rows, summary.pk)
+
+    def showTableSummary(self, table: str, rows: int, pk: List[str]) -> None:
+        key = ", ".join(pk) if pk else "none"
+        self.statusBar().showMessage(
+            f"{table}: {rows} rows, primary key: {key}"
+        )
+
     def initRemoteConWindow(self) -> None:
         self.remoteConnectionWindow = remoteConnectionWindow()
         self.remoteConnectionWindow.connect.clicked.connect(
@@ -117,26 +272,18 @@ class DBeditor(QtWidgets.QMainWindow):
     def importCSV(self) -> None:
         if self._database:
             if self.chosenTable not in self._builder_group:
-                filename, _ = QtWidgets.QFileDialog.getOpenFileName(
+                filenames, _ = QtWidgets.QFileDialog.getOpenFileNames(
                     self.centralwidget,
                     "Select сsv",
                     "",
                     "*.csv",
                 )
-                if not filename:
+                if not filenames:
                     return
-                try:
-                    with open(filename) as file:
-                        loader = CSVLoader(file)
-                        merger = Merger(
-                            self._database.get_table(self.chosenTable)
-                        )
-                        # FIXME: file closed during merge
-                        with self._database.session as s:
-                            merger.merge(s, loader)
-                    self.initTable(self.chosenTable)
-                except SQLAlchemyError as error:
-                    self.displayError(str(error))
+                if len(filenames) == 1:
+                    self.startImport(lambda: openCSV(filenames[0]))
+                else:
+                    self.startParallelImport(map(CSVSource, filenames))
             else:
                 self.displayError("Save the table before importing the data")
 
@@ -151,25 +298,201 @@ class DBeditor(QtWidgets.QMainWindow):
                 )
                 if not filename:
                     return
-                worksheet, okPressed = QtWidgets.QInputDialog.getText(
-                    self, "Import xls", "Enter the title of the worksheet"
+                try:
+                    sources = worksheet_sources(filename)
+                except (OSError, ValueError) as error:
+                    self.displayError(str(error))
+                    return
+                allWorksheets = "All worksheets"
+                worksheet, okPressed = QtWidgets.QInputDialog.getItem(
+                    self,
+                    "Import xls",
+                    "Choose the worksheet",
+                    [source.worksheet for source in sources] + [allWorksheets],
+                    0,
+                    False,
                 )
-                if okPressed and worksheet:
-                    try:
-                        with open(filename, "rb") as file:
-                            loader = XLSLoader(file, worksheet)
-                            merger = Merger(
-                                self._database.get_table(self.chosenTable)
-                            )
-                            # FIXME: file closed during merge
-                            with self._database.session as s:
-                                merger.merge(s, loader)
-                        self.initTable(self.chosenTable)
-                    except SQLAlchemyError as error:
-                        self.displayError(str(error))
+                if not okPressed:
+                    return
+                if worksheet == allWorksheets:
+                    self.startParallelImport(sources)
+                else:
+                    self.startImport(
+                        lambda: closing(XLSLoader(filename, worksheet))
+                    )
             else:
                 self.displayError("Save the table before importing the data")
 
+    def importArrow(self) -> None:
+        if self._database:
+            if self.chosenTable not in self._builder_group:
+                filename, _ = QtWidgets.QFileDialog.getOpenFileName(
+                    self.centralwidget,
+                    "Select Parquet or Arrow file",
+                    "",
+                    "*.parquet *.pq *.arrow *.feather",
+                )
+                if not filename:
+                    return
+                columns = self._database.get_table_column_names(
+                    self.chosenTable
+                )
+                self.startImport(
+                    lambda: closing(ArrowLoader(filename, columns))
+                )
+            else:
+                self.displayError("Save the table before importing the data")
+
+    def startParallelImport(self, sources: Iterable[Source]) -> None:
+        target = self._database.get_table(self.chosenTable)
+        sourceList = list(sources)
+        self.startImport(
+            lambda: ParallelLoader(sourceList, Coercer(target)), coerce=False
+        )
+
+    def startImport(
+        self, openLoader: LoaderOpener, coerce: bool = True
+    ) -> None:
+        if self._importWorker is not None:
+            self.displayError("Another import is already running")
+            return
+        table = self.chosenTable
+        database = self._database
+        target = database.get_table(table)
+        worker = ImportWorker(
+            Merger(
+                target,
+                coercer=Coercer(target) if coerce else None,
+                fast_import=self.settingsWindow.fastImport.isChecked(),
+                rebuild_indexes=self.settingsWindow.fastImport.isChecked(),
+                use_copy=True,
+            ),
+            lambda: database.session,
+            openLoader,
+        )
+        dialog = QtWidgets.QProgressDialog(
+            f"Importing data into {table}...", "Cancel", 0, 0, self
+        )
+        dialog.setWindowTitle("Import")
+        dialog.setMinimumDuration(0)
+        dialog.canceled.connect(worker.cancel)
+        worker.signals.progress.connect(
+            lambda rows, rate: dialog.setLabelText(
+                f"Importing data into {table}: {rows} rows ({rate:.0f} rows/s)"
+            )
+        )
+        worker.signals.finished.connect(
+            lambda rows: self.onImportDone(database, table, dialog)
+        )
+        worker.signals.cancelled.connect(
+            lambda: self.onImportDone(database, table, dialog)
+        )
+        worker.signals.failed.connect(
+            lambda error: self.onImportDone(database, table, dialog, error)
+        )
+        self._importWorker = worker
+        dialog.show()
+        QtCore.QThreadPool.globalInstance().start(worker)
+
+    def onImportDone(
+        self,
+        database: Database,
+        table: str,
+        dialog: QtWidgets.QProgressDialog,
+        error: Optional[str] = None,
+    ) -> None:
+        self._importWorker = None
+        dialog.canceled.disconnect()
+        dialog.reset()
+        database.invalidate(table)
+        if error is not None:
+            self.displayError(error)
+        if database is self._database and table == self.chosenTable:
+            self.initTable(table)
+
+    def exportCSV(self) -> None:
+        self.exportTable("CSV (*.csv)")
+
+    def exportXls(self) -> None:
+        self.exportTable("Excel (*.xlsx)")
+
+    def exportTable(self, fileFilter: str) -> None:
+        if not self._database or not self.chosenTableLabel.text():
+            return
+        if self.chosenTable in self._builder_group:
+            self.displayError("Save the table before exporting the data")
+            return
+        filename, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self.centralwidget, "Export table", self.chosenTable, fileFilter
+        )
+        if not filename:
+            return
+        self.flushEdits()
+        self.startExport(
+            table_query(self._database, self.chosenTable),
+            filename,
+            f"Exporting {self.chosenTable}",
+        )
+
+    def exportCustomQuery(self) -> None:
+        filename, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self.customQueryWindow,
+            "Export query result",
+            "",
+            "CSV (*.csv);;Excel (*.xlsx)",
+        )
+        if not filename:
+            return
+        self.startExport(
+            self.customQueryWindow.query.toPlainText(),
+            filename,
+            "Exporting query result",
+        )
+
+    def startExport(self, query: str, filename: str, description: str) -> None:
+        if self._exportWorker is not None:
+            self.displayError("Another export is already running")
+            return
+        worker = ExportWorker(self._database, query, exporterOpener(filename))
+        dialog = QtWidgets.QProgressDialog(
+            f"{description}...", "Cancel", 0, 0, self
+        )
+        dialog.setWindowTitle("Export")
+        dialog.setMinimumDuration(0)
+        dialog.canceled.connect(worker.cancel)
+        worker.signals.progress.connect(
+            lambda rows, rate: dialog.setLabelText(
+                f"{description}: {rows} rows ({rate:.0f} rows/s)"
+            )
+        )
+        worker.signals.finished.connect(
+            lambda rows: self.onExportDone(dialog, filename)
+        )
+        worker.signals.cancelled.connect(
+            lambda: self.onExportDone(dialog, filename, removeFile=True)
+        )
+        worker.signals.failed.connect(
+            lambda error: self.onExportDone(dialog, filename, error, True)
+        )
+        self._exportWorker = worker
+        dialog.show()
+        QtCore.QThreadPool.globalInstance().start(worker)
+
+    def onExportDone(
+        self,
+        dialog: QtWidgets.QProgressDialog,
+        filename: str,
+        error: Optional[str] = None,
+        removeFile: bool = False,
+    ) -> None:
+        self._exportWorker = None
+        dialog.canceled.disconnect()
+        dialog.reset()
+        if removeFile and os.path.exists(filename):
+            os.remove(filename)
+        if error is not None:
+            self.displayError(error)
+
     def initTablesMenu(self, tables: List[str]) -> None:
         if self.tablesMenuCreated:
             self.menubar.removeAction(self.tableMenu.menuAction())
@@ -184,14 +507,9 @@ class DBeditor(QtWidgets.QMainWindow):
         self.menubar.addAction(self.tableMenu.menuAction())
         self.tablesMenuCreated = True
         self.tablesActionGroup.triggered.connect(
-            lambda sender: self.initTable(sender.text(), True)
+            lambda sender: self.initTable(sender.text())
         )
 
-    def saveItem(self, item: QtWidgets.QTableWidgetItem) -> None:
-        if self.chosenTable not in self._builder_group:
-            self.selItemText = item.text()
-            self.addrToDBRow = self.findRowFromUI(item.row())
-
     def displayError(self, err: str, close: bool = False) -> None:
         msg = QtWidgets.QMessageBox(self)
         msg.setIcon(QtWidgets.QMessageBox.Critical)
@@ -204,80 +522,94 @@ class DBeditor(QtWidgets.QMainWindow):
             msg.setDefaultButton(QtWidgets.QMessageBox.Cancel)
         return msg.exec_()
 
-    def findRowFromUI(self, row) -> dict:
-        pkItemValues = []
-        for uiColIndex in [
-            self.names.index(title) for title in self.primeKeyColumns
-        ]:
-            pkItemValues.append(self.tableWidget.item(row, uiColIndex).text())
-        if out := dict(zip(self.primeKeyColumns, pkItemValues)):
+    def findRowFromUI(self, row, overrides: Optional[dict] = None) -> dict:
+        values = self.tableModel.row_values(row)
+        if overrides:
+            for col, value in overrides.items():
+                values[col] = value
+        out = {
+            title: values[self.names.index(title)]
+            for title in self.primeKeyColumns
+        }
+        if out:
             return out
         return False
 
-    def editDBfunc(self, item: QtWidgets.QTableWidgetItem) -> None:
+    def editDBfunc(self, row: int, column: int, previous) -> None:
+        if self.tableModel.is_pending(row):
+            self.addedRows.setdefault(self.chosenTable, self.tableModel.pending)
+            return
+        values = {
+            self.names[column]: self.translateString(
+                self.tableModel.value(row, column)
+            )
+        }
         try:
-            if self.chosenTable not in self._builder_group:
-                if (
-                    self.chosenTable not in self.addedRows
-                    or item.row() not in self.addedRows[self.chosenTable]
-                ):
-                    if self.settingsWindow.rowid.isChecked():
-                        rowid = self._database.select_rowid(self.chosenTable)[
-                            self.tableWidget.selectedRanges()[-1].bottomRow()
-                        ][0]
-                        self._database.update_row_through_rowid(
-                            self.chosenTable,
-                            rowid,
-                            {
-                                self.names[item.column()]: self.translateString(
-                                    item.text()
-                                )
-                            },
-                        )
-                    else:
-                        self._database.update_row(
-                            self.chosenTable,
-                            self.addrToDBRow,
-                            {
-                                self.names[item.column()]: self.translateString(
-                                    item.text()
-                                )
-                            },
-                        )
-                else:
-                    self.addedRows[self.chosenTable][item.row()][
-                        item.column()
-                    ] = item.text()
+            if self.settingsWindow.rowid.isChecked():
+                key = {"rowid": self._database.get_rowid(self.chosenTable, row)}
             else:
-                if self.chosenTable not in self.addedRows:
-                    self.addedRows[self.chosenTable] = {
-                        item.row(): {item.column(): item.text()}
-                    }
-                else:
-                    self.addedRows[self.chosenTable][item.row()][
-                        item.column()
-                    ] = item.text()
+                key = self.findRowFromUI(row, {column: previous})
+                if not key:
+                    self.tableModel.set_value(row, column, previous)
+                    self.displayError(
+                        "It's unable to automatically locate row. "
+                        "Table doesn't have any primary key"
+                    )
+                    return
+            if self.settingsWindow.bufferEdits.isChecked():
+                if self._editBuffer.add(self.chosenTable, key, values):
+                    self.flushEdits()
+                self.updatePendingEdits()
+            elif self.settingsWindow.rowid.isChecked():
+                self._database.update_row_through_rowid(
+                    self.chosenTable, key["rowid"], values
+                )
+            else:
+                self._database.update_row(self.chosenTable, key, values)
         except SQLAlchemyError as error:
-            self.tableWidget.blockSignals(True)
+            self.tableModel.set_value(row, column, previous)
             self.displayError(str(error))
-            self.tableWidget.setItem(
-                item.row(),
-                item.column(),
-                QtWidgets.QTableWidgetItem(self.selItemText),
-            )
-            self.tableWidget.blockSignals(False)
 
-    def insertRowsDB(self) -> None:
-        for table, rows in self.addedRows.items():
-            for row in rows:
-                rowItems = {}
-                for col in self.addedRows[self.chosenTable][row]:
-                    rowItems[self.names[col]] = self.addedRows[table][row][col]
-                self._database.insert_row(table, rowItems)
+    def flushEdits(self) -> bool:
+        """Writes buffered edits and returns whether it succeeded, failed
+        edits are discarded and the table is reloaded."""
+        if self._editBuffer is None or not len(self._editBuffer):
+            return True
+        try:
+            self._editBuffer.flush()
+        except SQLAlchemyError as error:
+            self.displayError(f"Buffered edits were discarded: {error}")
+            if self._editBuffer.database is self._database:
+                self.initTable(self.chosenTable)
+            self.updatePendingEdits()
+            return False
+        self.updatePendingEdits()
+        return True
+
+    def resetEditBuffer(self) -> None:
+        self.flushEdits()
+        self._editBuffer = EditBuffer(self._database)
+        self.updatePendingEdits()
+
+    def updatePendingEdits(self) -> None:
+        count = len(self._editBuffer) if self._editBuffer is not None else 0
+        self.pendingEditsLabel.setText(
+            f"Pending edits: {count}" if count else ""
+        )
+
+    def insertRowsDB(self, table: str) -> None:
+        names = self._database.get_table_column_names(table)
+        with self._database.unit_of_work():
+            for row in self.addedRows.get(table, []):
+                if row:
+                    self._database.insert_row(
+                        table,
+                        {names[col]: value for col, value in row.items()},
+                    )
+        self.addedRows.pop(table, None)
 
     def addTablesUI(self) -> None:
         if self._database:
-            self.tableWidget.blockSignals(True)
             table, okPressed = QtWidgets.QInputDialog.getText(
                 self, "New table", "Enter the title of the table"
             )
@@ -300,7 +632,6 @@ class DBeditor(QtWidgets.QMainWindow):
                         )
                     self.tablesActionGroup.addAction(action)
                     self.tableMenu.addAction(action)
-            self.tableWidget.blockSignals(False)
 
     def translateString(self, string: str):
         translate = {"True": True, "False": False, "None": None, "Null": None}
@@ -365,11 +696,7 @@ class DBeditor(QtWidgets.QMainWindow):
                 self.chosenTableLabel.text()
                 and self.chosenTable not in self._builder_group
             ):
-                self._database.get_table(self.chosenTable).drop(
-                    self._database._engine
-                )
-                self._database._metadata = MetaData()
-                self._database._metadata.reflect(bind=self._database._engine)
+                self._database.drop_table(self.chosenTable)
             if self.chosenTable in self.addedRows:
                 del self.addedRows[self.chosenTable]
             if self.chosenTable in self._builder_group:
@@ -381,8 +708,7 @@ class DBeditor(QtWidgets.QMainWindow):
             action = self.tablesActionGroup.checkedAction()
             self.tableMenu.removeAction(action)
             self.tablesActionGroup.removeAction(action)
-            self.tableWidget.setColumnCount(0)
-            self.tableWidget.setRowCount(0)
+            self.clearTable()
             self.chosenTableLabel.setText("")
 
     def initAddColumnWindow(self) -> None:
@@ -396,149 +722,159 @@ class DBeditor(QtWidgets.QMainWindow):
                     "Adding columns to an existing table is not supported"
                 )
 
-    def renderExisting(self):
-        data = self._database.select_all(self.chosenTable)
-        self.names = self._database.get_table_column_names(self.chosenTable)
-        self.primeKeyColumns = self._database.get_pk_column_names(
-            self.chosenTable
-        )
-        self.tableWidget.setColumnCount(len(self.names))
-        self.tableWidget.setHorizontalHeaderLabels(self.names)
-        self.tableWidget.setRowCount(len(data))
-        for row in range(len(data)):
-            for col in range(len(self.names)):
-                self.tableWidget.setItem(
-                    row,
-                    col,
-                    QtWidgets.QTableWidgetItem(str(data[row][col])),
-                )
-        if self.chosenTable in self.addedRows:
-            for row in self.addedRows[self.chosenTable]:
-                self.tableWidget.insertRow(row)
-                for col in range(len(self.names)):
-                    if col in self.addedRows[self.chosenTable][row]:
-                        self.tableWidget.setItem(
-                            row,
-                            col,
-                            QtWidgets.QTableWidgetItem(
-                                self.addedRows[self.chosenTable][row][col]
-                            ),
-                        )
-                    else:
-                        self.tableWidget.setItem(
-                            row,
-                            col,
-                            QtWidgets.QTableWidgetItem(),
-                        )
+    def clearTable(self) -> None:
+        self.tableModel = TableModel([])
+        self.tableView.setModel(self.tableModel)
 
-    def renderNew(self, render):
-        if self.chosenTable in self._builder_group:
-            self.names = list(self._builder_group[self.chosenTable])
-            self.tableWidget.setColumnCount(
-                len(self._builder_group[self.chosenTable])
+    def setTableModel(self, model: TableModel) -> None:
+        self.tableModel = model
+        self.tableModel.cellEdited.connect(self.editDBfunc)
+        self.tableModel.fetchMore(QtCore.QModelIndex())
+        self.tableView.setModel(self.tableModel)
+
+    def renderExisting(self) -> None:
+        table = self.chosenTable
+        self.names = self._database.get_table_column_names(table)
+        self.primeKeyColumns = self._database.get_pk_column_names(table)
+        model = TableModel(
+            self.names,
+            lambda key, limit: self._database.fetch_page(table, key, limit),
+            self.addedRows.get(table),
+        )
+        asyncDatabase = self._asyncDatabase
+        if asyncDatabase is not None:
+            model.defer_fetching()
+        self.setTableModel(model)
+        self.showSortIndicator()
+        if asyncDatabase is not None:
+            schedule(self.openTableAsync(asyncDatabase, table, model))
+
+    def renderNew(self) -> None:
+        self.names = list(self._builder_group[self.chosenTable])
+        self.primeKeyColumns = []
+        pending = self.addedRows.get(self.chosenTable, [{}])
+        self.setTableModel(TableModel(self.names, pending=pending))
+        self.showSortIndicator()
+
+    def showSortIndicator(self) -> None:
+        header = self.tableView.horizontalHeader()
+        sort = None
+        if self.chosenTable not in self._builder_group:
+            sort = self._database.get_sort(self.chosenTable)
+        if sort is None:
+            header.setSortIndicator(-1, QtCore.Qt.AscendingOrder)
+            return
+        order = (
+            QtCore.Qt.DescendingOrder if sort[1] else QtCore.Qt.AscendingOrder
+        )
+        header.setSortIndicator(self.names.index(sort[0]), order)
+
+    def sortByColumn(self, column: int) -> None:
+        if (
+            not self._database
+            or not self.chosenTableLabel.text()
+            or self.chosenTable in self._builder_group
+        ):
+            return
+        name = self.names[column]
+        # clicks switch ascending, descending and unsorted order
+        sort = self._database.get_sort(self.chosenTable)
+        descending = sort is not None and sort[0] == name and not sort[1]
+        unsorted = sort is not None and sort[0] == name and sort[1]
+        if sort is None or sort[0] != name:
+            if not self.confirmSortIndex(name):
+                self.showSortIndicator()
+                return
+        self.flushEdits()
+        self._database.set_sort(
+            self.chosenTable, None if unsorted else name, descending
+        )
+        self.renderExisting()
+
+    def confirmSortIndex(self, column: str) -> bool:
+        try:
+            if self._database.has_sort_index(self.chosenTable, column):
+                return True
+            answer = QtWidgets.QMessageBox.question(
+                self,
+                "Sort",
+                f"Column {column} isn't indexed, so sorting a large table is "
+                "slow. Create an index?",
+                QtWidgets.QMessageBox.Yes
+                | QtWidgets.QMessageBox.No
+                | QtWidgets.QMessageBox.Cancel,
+                QtWidgets.QMessageBox.Yes,
             )
-            self.tableWidget.setHorizontalHeaderLabels(self.names)
-            if self.chosenTable in self.addedRows:
-                if render:
-                    self.tableWidget.setRowCount(
-                        len(self.addedRows[self.chosenTable].keys())
-                    )
-                    for row in self.addedRows[self.chosenTable]:
-                        for col in range(len(self.names)):
-                            if col in self.addedRows[self.chosenTable][row]:
-                                self.tableWidget.setItem(
-                                    row,
-                                    col,
-                                    QtWidgets.QTableWidgetItem(
-                                        self.addedRows[self.chosenTable][row][
-                                            col
-                                        ]
-                                    ),
-                                )
-                            else:
-                                self.tableWidget.setItem(
-                                    row,
-                                    col,
-                                    QtWidgets.QTableWidgetItem(),
-                                )
-            else:
-                self.tableWidget.setRowCount(1)
-                builder = self._builder_group[self.chosenTable]
-                for col in range(len(builder)):
-                    self.tableWidget.setItem(
-                        0,
-                        col,
-                        QtWidgets.QTableWidgetItem(),
-                    )
-        else:
-            self.tableWidget.setRowCount(0)
-            self.tableWidget.setColumnCount(0)
+            if answer == QtWidgets.QMessageBox.Yes:
+                self._database.create_sort_index(self.chosenTable, column)
+        except SQLAlchemyError as error:
+            self.displayError(str(error))
+            return False
+        return answer != QtWidgets.QMessageBox.Cancel
 
-    def initTable(self, table: str, render: bool = False) -> None:
+    def initTable(self, table: str) -> None:
+        self.flushEdits()
         self.chosenTable = table.rstrip("*")
         self.chosenTableLabel.setText(self.chosenTable)
-        self.tableWidget.blockSignals(True)
+        self.statusBar().clearMessage()
         if self.chosenTable not in self._builder_group:
             self.renderExisting()
         else:
-            self.renderNew(render)
-        self.tableWidget.blockSignals(False)
+            self.renderNew()
+        if self.indexesWindow.isVisible():
+            self.refreshIndexes()
 
     def delRowDB(self) -> None:
+        # keys in the grid may be edited but not written yet
+        if not self.flushEdits():
+            return
+        rows = {
+            index.row()
+            for index in self.tableView.selectionModel().selectedIndexes()
+        }
+        stored = sorted(
+            row for row in rows if not self.tableModel.is_pending(row)
+        )
         try:
-            self.tableWidget.blockSignals(True)
-            selItems = self.tableWidget.selectedRanges()
-            ok = True
-            for selItem in selItems:
-                if self.chosenTable not in self.addedRows or (
-                    self.chosenTable in self.addedRows
-                    and selItem.bottomRow()
-                    not in self.addedRows[self.chosenTable]
-                ):
-                    if self.settingsWindow.rowid.isChecked():
-                        rowid = self._database.select_rowid(self.chosenTable)[
-                            selItem.bottomRow()
-                        ][0]
-                        self._database.delete_row_through_rowid(
-                            self.chosenTable, rowid
-                        )
-                    else:
-                        pks = self.findRowFromUI(selItem.bottomRow())
-                        if pks:
-                            self._database.delete_row(self.chosenTable, pks)
-                        else:
-                            ok = False
-                            self.displayError(
-                                "It's unable to automatically locate row. "
-                                "Table doesn't have any primary key"
-                            )
-                else:
-                    del self.addedRows[self.chosenTable][selItem.bottomRow()]
-                if ok:
-                    self.tableWidget.removeRow(selItem.bottomRow())
-                if (
-                    ok
-                    and self.chosenTable in self.addedRows
-                    and not self.addedRows[self.chosenTable]
-                    and self.chosenTable not in self._builder_group
-                ):
-                    action1 = self.tablesActionGroup.checkedAction()
-                    self.tablesActionGroup.removeAction(action1)
-                    self.tableMenu.removeAction(action1)
-                    action2 = QtWidgets.QAction(
-                        self.chosenTable,
-                        self.menubar,
-                        checkable=True,
-                        checked=True,
+            if stored and self.settingsWindow.rowid.isChecked():
+                rowids = self._database.get_rowids(self.chosenTable, stored)
+                self._database.delete_rows_through_rowid(
+                    self.chosenTable, rowids
+                )
+            elif stored:
+                if not self.primeKeyColumns:
+                    self.displayError(
+                        "It's unable to automatically locate row. "
+                        "Table doesn't have any primary key"
                     )
-                    self.tablesActionGroup.addAction(action2)
-                    self.tableMenu.addAction(action2)
-                    self.tableWidget.blockSignals(False)
+                    return
+                keys = [
+                    tuple(self.findRowFromUI(row).values()) for row in stored
+                ]
+                self._database.delete_rows(self.chosenTable, keys)
         except SQLAlchemyError as error:
             self.displayError(str(error))
+            return
+        self.tableModel.remove_rows(rows)
+        if (
+            self.chosenTable in self.addedRows
+            and not self.addedRows[self.chosenTable]
+            and self.chosenTable not in self._builder_group
+        ):
+            del self.addedRows[self.chosenTable]
+            action1 = self.tablesActionGroup.checkedAction()
+            self.tablesActionGroup.removeAction(action1)
+            self.tableMenu.removeAction(action1)
+            action2 = QtWidgets.QAction(
+                self.chosenTable,
+                self.menubar,
+                checkable=True,
+                checked=True,
+            )
+            self.tablesActionGroup.addAction(action2)
+            self.tableMenu.addAction(action2)
 
     def addRowUI(self) -> None:
-        self.tableWidget.blockSignals(True)
         if (
             self.chosenTable not in self.addedRows
             and self.chosenTable not in self._builder_group
@@ -554,29 +890,20 @@ class DBeditor(QtWidgets.QMainWindow):
             )
             self.tablesActionGroup.addAction(action2)
             self.tableMenu.addAction(action2)
-        if self.tableWidget.rowCount():
-            self.tableWidget.insertRow(self.tableWidget.rowCount())
-            if self.chosenTable not in self.addedRows:
-                self.addedRows[self.chosenTable] = {
-                    self.tableWidget.rowCount() - 1: {}
-                }
-            else:
-                self.addedRows[self.chosenTable][
-                    self.tableWidget.rowCount() - 1
-                ] = {}
-            self.tableWidget.scrollToBottom()
-        else:
-            self.tableWidget.insertRow(0)
-            self.addedRows[self.chosenTable] = {0: {}}
-        self.tableWidget.blockSignals(False)
+        self.addedRows.setdefault(self.chosenTable, self.tableModel.pending)
+        self.tableModel.append_pending()
+        self.tableView.scrollToBottom()
 
     def closeEvent(self, event: QtGui.QCloseEvent) -> None:
         if self._database:
             try:
+                if self._editBuffer is not None:
+                    self._editBuffer.flush()
                 if len(self._builder_group) != 0:
                     self.addTablesDB()
-                if self.addedRows:
-                    self.insertRowsDB()
+                for table in list(self.addedRows):
+                    if table not in self._builder_group:
+                        self.insertRowsDB(table)
                 event.accept()
             except SQLAlchemyError as error:
                 reply = self.displayError(str(error), True)
@@ -593,9 +920,7 @@ class DBeditor(QtWidgets.QMainWindow):
         try:
             if self.chosenTable in self._builder_group:
                 self.addTablesDB()
-            if self.addedRows:
-                self.insertRowsDB()
-                del self.addedRows[self.chosenTable]
+            self.insertRowsDB(self.chosenTable)
             self.initTable(self.chosenTable)
             action1 = self.tablesActionGroup.checkedAction()
             self.tablesActionGroup.removeAction(action1)
@@ -609,29 +934,170 @@ class DBeditor(QtWidgets.QMainWindow):
             self.displayError(str(error))
 
     def executeCustomQuery(self) -> None:
-        query = self.customQueryWindow.query.toPlainText()
+        window = self.customQueryWindow
+        if window.worker is not None:
+            window.displayError("Another query is already running")
+            return
+        database = self._database
+        worker = QueryWorker(
+            database,
+            window.query.toPlainText(),
+            max_rows=window.rowLimit.value(),
+            explain=window.showPlan.isChecked(),
+        )
+        worker.signals.started.connect(window.showColumns)
+        worker.signals.rows.connect(window.appendRows)
+        worker.signals.progress.connect(window.showProgress)
+        worker.signals.finished.connect(
+            lambda *_: self.onCustomQueryDone(database)
+        )
+        worker.signals.measured.connect(window.showStats)
+        worker.signals.finished.connect(window.showFinished)
+        worker.signals.cancelled.connect(window.showCancelled)
+        worker.signals.failed.connect(window.showFailed)
+        window.start(worker)
+        QtCore.QThreadPool.globalInstance().start(worker)
+
+    def applySlowQueryLog(self) -> None:
+        if not self._database:
+            return
+        threshold = self.settingsWindow.slowQueryThreshold.value()
+        self._database.instrumentation.slow_log = (
+            SlowQueryLog(slowQueryLogPath(), threshold / 1000)
+            if threshold
+            else None
+        )
+
+    def applyProfiling(self) -> None:
+        if not self._database:
+            return
+        if self.profilerWindow.enabled.isChecked():
+            self._database.profiler.enable()
+        else:
+            self._database.profiler.disable()
+
+    def initProfilerWindow(self) -> None:
+        self.profilerWindow.show()
+        self.refreshProfile()
+
+    def refreshProfile(self) -> None:
+        if self._database:
+            self.profilerWindow.showProfile(self._database.profiler)
+
+    def resetProfile(self) -> None:
+        if self._database:
+            self._database.profiler.reset()
+            self.refreshProfile()
+
+    def saveProfile(self) -> None:
+        if not self._database:
+            return
+        filename, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self.profilerWindow,
+            "Save profile",
+            "profile.json",
+            "JSON (*.json)",
+        )
+        if not filename:
+            return
         try:
-            result = self._database.execute_raw(query)
-            if result:
-                columns, data = result
-                self.customQueryWindow.tableWidget.setColumnCount(len(columns))
-                self.customQueryWindow.tableWidget.setHorizontalHeaderLabels(
-                    columns
-                )
-                self.customQueryWindow.tableWidget.setRowCount(len(data))
-                for row in range(len(data)):
-                    for col in range(len(columns)):
-                        self.customQueryWindow.tableWidget.setItem(
-                            row,
-                            col,
-                            QtWidgets.QTableWidgetItem(str(data[row][col])),
-                        )
-            tables = self._database.get_tables()
-            self.menubar.removeAction(self.tableMenu.menuAction())
-            self.initTablesMenu(tables)
-            self.initTable(self.chosenTable)
+            self._database.profiler.dump(filename)
+        except OSError as error:
+            self.profilerWindow.displayError(str(error))
+
+    def initIndexesWindow(self) -> None:
+        self.indexesWindow.show()
+        self.refreshIndexes()
+
+    def refreshIndexes(self) -> None:
+        if (
+            not self._database
+            or not self.chosenTableLabel.text()
+            or self.chosenTable in self._builder_group
+        ):
+            self.indexesWindow.showIndexes("", [])
+            return
+        try:
+            indexes = self._database.get_indexes(self.chosenTable)
+        except SQLAlchemyError as error:
+            self.indexesWindow.displayError(str(error))
+            return
+        self.indexesWindow.showIndexes(self.chosenTable, indexes)
+
+    def createIndex(self) -> None:
+        table = self.indexesWindow.table
+        columns = [
+            column.strip()
+            for column in self.indexesWindow.columns.text().split(",")
+            if column.strip()
+        ]
+        if not self._database or not table:
+            return
+        try:
+            self._database.create_index(
+                table, columns, unique=self.indexesWindow.unique.isChecked()
+            )
+        except KeyError as error:
+            self.indexesWindow.displayError(f"Column {error} doesn't exist.")
+            return
+        except (SQLAlchemyError, ValueError) as error:
+            self.indexesWindow.displayError(str(error))
+            return
+        self.indexesWindow.columns.clear()
+        self.refreshIndexes()
+
+    def dropIndex(self) -> None:
+        row = self.indexesWindow.selectedRow(self.indexesWindow.tableView)
+        if not self._database or row is None:
+            return
+        name = self.indexesWindow.indexes[row]["name"]
+        try:
+            self._database.drop_index(self.indexesWindow.table, name)
+        except (SQLAlchemyError, KeyError) as error:
+            self.indexesWindow.displayError(str(error))
+        self.refreshIndexes()
+
+    def suggestIndexes(self) -> None:
+        if not self._database:
+            return
+        if not self._database.profiler.statements():
+            self.indexesWindow.displayError(
+                "No statements were profiled. Enable profiling in "
+                "Tools -> Profiler and work with the tables first."
+            )
+            return
+        try:
+            suggestions = IndexAdvisor(self._database).suggest()
         except SQLAlchemyError as error:
-            self.customQueryWindow.displayError(str(error))
+            self.indexesWindow.displayError(str(error))
+            return
+        self.indexesWindow.showSuggestions(suggestions)
+
+    def createSuggestedIndex(self) -> None:
+        window = self.indexesWindow
+        row = window.selectedRow(window.suggestionsView)
+        if not self._database or row is None:
+            return
+        suggestion = window.suggestions[row]
+        try:
+            self._database.create_index(
+                suggestion.table, suggestion.columns, suggestion.name
+            )
+        except (SQLAlchemyError, KeyError) as error:
+            window.displayError(str(error))
+            return
+        window.showSuggestions(
+            [s for s in window.suggestions if s is not suggestion]
+        )
+        self.refreshIndexes()
+
+    def onCustomQueryDone(self, database: Database) -> None:
+        if database is not self._database:
+            return
+        tables = self._database.get_tables()
+        self.menubar.removeAction(self.tableMenu.menuAction())
+        self.initTablesMenu(tables)
+        self.initTable(self.chosenTable)
 
     def contextMenuEvent(self, event) -> None:
         if self._database:
@@ -658,16 +1124,75 @@ class DBeditor(QtWidgets.QMainWindow):
         self.customQueryWindow = CustomQueryWindow()
         self.customQueryWindow.show()
         self.customQueryWindow.execute.clicked.connect(self.executeCustomQuery)
+        self.customQueryWindow.export.clicked.connect(self.exportCustomQuery)
 
     def searchAcrossTable(self) -> None:
-        self.tableWidget.setCurrentItem(None)
-        if self.search:
-            matchingItems = self.tableWidget.findItems(
-                self.search.text(), QtCore.Qt.MatchContains
+        pattern = self.search.text()
+        if (
+            not pattern
+            or not self._database
+            or not self.chosenTableLabel.text()
+            or self.chosenTable in self._builder_group
+        ):
+            return
+        # repeated search with the same text moves to the next match
+        search = (
+            self.chosenTable,
+            pattern,
+            self._database.get_sort(self.chosenTable),
+            self._database.data_version(self.chosenTable),
+        )
+        if search != self._lastSearch:
+            self._lastSearch, self._searchKey = search, None
+            self._searchMatches = []
+        try:
+            if not self._searchMatches:
+                self._searchMatches = self.findMatches(pattern)
+        except (SQLAlchemyError, ValueError) as error:
+            self.displayError(str(error))
+            return
+        if self._searchMatches:
+            self.showMatch(self._searchMatches.pop())
+
+    def findMatches(self, pattern: str) -> List[int]:
+        """Returns positions of the next page of matches in reversed order
+        of the view, starting from the first page after the last one."""
+        afterKey = self._searchKey
+        keys, self._searchKey = self._database.search(
+            self.chosenTable, pattern, afterKey, SEARCH_PAGE_SIZE
+        )
+        if not keys and afterKey is not None:
+            keys, self._searchKey = self._database.search(
+                self.chosenTable, pattern, None, SEARCH_PAGE_SIZE
             )
-            if matchingItems:
-                for item in matchingItems:
-                    item.setSelected(True)
+        positions = self._database.get_positions(self.chosenTable, keys)
+        # positions are in key order, which differs from the sorted view
+        return sorted(positions, reverse=True)
+
+    def showMatch(self, row: int) -> None:
+        # only pages up to the match are loaded
+        while self.tableModel.fetched_count() <= row and (
+            self.tableModel.canFetchMore(QtCore.QModelIndex())
+        ):
+            self.tableModel.fetchMore(QtCore.QModelIndex())
+        self.tableView.clearSelection()
+        self.tableView.selectRow(row)
+        self.tableView.scrollTo(self.tableModel.index(row, 0))
+
+    def toggleSearchIndex(self) -> None:
+        if (
+            not self._database
+            or not self.chosenTableLabel.text()
+            or self.chosenTable in self._builder_group
+        ):
+            return
+        try:
+            if self._database.has_search_index(self.chosenTable):
+                self._database.drop_search_index(self.chosenTable)
+            else:
+                self._database.create_search_index(self.chosenTable)
+        except (SQLAlchemyError, ValueError) as error:
+            self.displayError(str(error))
 
     def initSettingsMenu(self) -> None:
         self.settingsWindow.show()
@@ -682,20 +1207,40 @@ class DBeditor(QtWidgets.QMainWindow):
         self.gridLayout.addWidget(self.search, 0, 0, 1, 1)
         self.startSearch = QtWidgets.QPushButton("Search", self.centralwidget)
         self.gridLayout.addWidget(self.startSearch, 0, 1, 1, 1)
-        self.tableWidget = QtWidgets.QTableWidget(self.centralwidget)
-        self.tableWidget.setColumnCount(0)
-        self.tableWidget.setRowCount(0)
-        self.tableWidget.horizontalHeader().setStretchLastSection(True)
-        self.gridLayout.addWidget(self.tableWidget, 2, 0, 1, 2)
+        self.tableView = QtWidgets.QTableView(self.centralwidget)
+        self.tableView.horizontalHeader().setStretchLastSection(True)
+        self.tableView.horizontalHeader().setSortIndicatorShown(True)
+        self.tableView.horizontalHeader().sectionClicked.connect(
+            self.sortByColumn
+        )
+        self.clearTable()
+        self.gridLayout.addWidget(self.tableView, 2, 0, 1, 2)
         self.chosenTableLabel = QtWidgets.QLabel(self.centralwidget)
         self.chosenTableLabel.setText("")
         self.gridLayout.addWidget(self.chosenTableLabel, 1, 0, 1, 1)
+        self.pendingEditsLabel = QtWidgets.QLabel(self.centralwidget)
+        self.gridLayout.addWidget(self.pendingEditsLabel, 1, 1, 1, 1)
         self.setCentralWidget(self.centralwidget)
         self.menubar = QtWidgets.QMenuBar(self)
         self.menubar.setGeometry(QtCore.QRect(0, 0, 569, 21))
         self.fileMenu = QtWidgets.QMenu("File", self.menubar)
         self.structureMenu = QtWidgets.QMenu("Structure", self.menubar)
         self.settingsWindow = settingsWindow()
+        self.settingsWindow.slowQueryThreshold.valueChanged.connect(
+            self.applySlowQueryLog
+        )
+        self.profilerWindow = ProfilerWindow()
+        self.profilerWindow.enabled.toggled.connect(self.applyProfiling)
+        self.profilerWindow.refresh.clicked.connect(self.refreshProfile)
+        self.profilerWindow.reset.clicked.connect(self.resetProfile)
+        self.profilerWindow.save.clicked.connect(self.saveProfile)
+        self.indexesWindow = IndexesWindow()
+        self.indexesWindow.add.clicked.connect(self.createIndex)
+        self.indexesWindow.drop.clicked.connect(self.dropIndex)
+        self.indexesWindow.suggest.clicked.connect(self.suggestIndexes)
+        self.indexesWindow.createSuggested.clicked.connect(
+            self.createSuggestedIndex
+        )
         self.toolsMenu = QtWidgets.QMenu("Tools", self.menubar)
         self.setMenuBar(self.menubar)
         self.openDB = QtWidgets.QAction("Open DB", self.centralwidget)
@@ -707,13 +1252,27 @@ class DBeditor(QtWidgets.QMainWindow):
             "Import data from CSV", self.centralwidget
         )
         self.saveTableAct = QtWidgets.QAction("Save table", self.centralwidget)
+        self.exportCsvAct = QtWidgets.QAction(
+            "Export table to CSV", self.centralwidget
+        )
+        self.exportXlsAct = QtWidgets.QAction(
+            "Export table to XLSX", self.centralwidget
+        )
         self.importXlsAct = QtWidgets.QAction(
             "Import data from XLS", self.centralwidget
         )
+        self.importArrowAct = QtWidgets.QAction(
+            "Import data from Parquet/Arrow", self.centralwidget
+        )
         self.addTableAct = QtWidgets.QAction("Add table", self.centralwidget)
         self.addColumnAct = QtWidgets.QAction("Add column", self.centralwidget)
         self.dropTableAct = QtWidgets.QAction("Drop table", self.centralwidget)
         self.settingsAct = QtWidgets.QAction("Settings", self.centralwidget)
+        self.searchIndexAct = QtWidgets.QAction(
+            "Create/drop search index", self.centralwidget
+        )
+        self.profilerAct = QtWidgets.QAction("Profiler", self.centralwidget)
+        self.indexesAct = QtWidgets.QAction("Indexes", self.centralwidget)
 
         self.fileMenu.addActions(
             (
@@ -722,13 +1281,23 @@ class DBeditor(QtWidgets.QMainWindow):
                 self.remoteConAct,
                 self.importCsvAct,
                 self.importXlsAct,
+                self.importArrowAct,
+                self.exportCsvAct,
+                self.exportXlsAct,
                 self.saveTableAct,
             )
         )
         self.structureMenu.addActions(
             (self.addTableAct, self.addColumnAct, self.dropTableAct)
         )
-        self.toolsMenu.addAction(self.settingsAct)
+        self.toolsMenu.addActions(
+            (
+                self.settingsAct,
+                self.searchIndexAct,
+                self.indexesAct,
+                self.profilerAct,
+            )
+        )
         self.menubar.addActions(
             (
                 self.fileMenu.menuAction(),
@@ -738,16 +1307,25 @@ class DBeditor(QtWidgets.QMainWindow):
         )
 
         self.settingsAct.triggered.connect(self.initSettingsMenu)
+        self.searchIndexAct.triggered.connect(self.toggleSearchIndex)
+        self.profilerAct.triggered.connect(self.initProfilerWindow)
+        self.indexesAct.triggered.connect(self.initIndexesWindow)
         self.openDB.triggered.connect(self.on_database_open)
         self.createDB.triggered.connect(self.on_database_create)
         self.saveTableAct.triggered.connect(self.saveTableDB)
         self.remoteConAct.triggered.connect(self.initRemoteConWindow)
         self.importCsvAct.triggered.connect(self.importCSV)
         self.importXlsAct.triggered.connect(self.importXls)
+        self.importArrowAct.triggered.connect(self.importArrow)
+        self.exportCsvAct.triggered.connect(self.exportCSV)
+        self.exportXlsAct.triggered.connect(self.exportXls)
         self.addTableAct.triggered.connect(self.addTablesUI)
         self.addColumnAct.triggered.connect(self.initAddColumnWindow)
         self.dropTableAct.triggered.connect(self.dropTableDB)
         self.startSearch.clicked.connect(self.searchAcrossTable)
+        self.flushTimer = QtCore.QTimer(self)
+        self.flushTimer.timeout.connect(self.flushEdits)
+        self.flushTimer.start(5000)
 
         self.tablesMenuCreated = False
 
@@ -755,6 +1333,7 @@ class DBeditor(QtWidgets.QMainWindow):
 class CustomQueryWindow(QtWidgets.QWidget):
     def __init__(self) -> None:
         super().__init__()
+        self.worker: Optional[QueryWorker] = None
         self.setupUi()
 
     def displayError(self, err: str) -> None:
@@ -764,6 +1343,68 @@ class CustomQueryWindow(QtWidgets.QWidget):
         msg.setText(err)
         return msg.exec_()
 
+    def start(self, worker: QueryWorker) -> None:
+        self.worker = worker
+        self.model = TableModel([], editable=False)
+        self.tableView.setModel(self.model)
+        self.execute.setDisabled(True)
+        self.cancel.setDisabled(False)
+        self.fetched = 0
+        self.stats.setText("")
+        self.plan.clear()
+        self.elapsed.start()
+        self.clock.start()
+        self.showProgress(0, 0)
+
+    def stop(self, status: str) -> None:
+        self.worker = None
+        self.clock.stop()
+        self.execute.setDisabled(False)
+        self.cancel.setDisabled(True)
+        self.status.setText(status)
+
+    def cancelQuery(self) -> None:
+        if self.worker is not None:
+            self.worker.cancel()
+            self.status.setText("Cancelling...")
+
+    def showColumns(self, columns: List[str]) -> None:
+        self.model = TableModel(columns, editable=False)
+        self.tableView.setModel(self.model)
+
+    def appendRows(self, rows: List[Tuple[Any, ...]]) -> None:
+        self.model.append_rows(rows)
+
+    def showProgress(self, rows: int, seconds: float) -> None:
+        self.fetched = rows
+        self.status.setText(f"Running: {rows} rows, {seconds:.1f} s")
+
+    def updateElapsed(self) -> None:
+        self.showProgress(self.fetched, self.elapsed.elapsed() / 1000)
+
+    def showFinished(
+        self, rows: int, seconds: float, affected: int, truncated: bool
+    ) -> None:
+        if self.model.columnCount():
+            status = f"{rows} rows"
+            if truncated:
+                status += f" (limited to {self.rowLimit.value()})"
+        else:
+            status = f"{affected} rows affected" if affected >= 0 else "Done"
+        self.stop(f"{status}, {seconds:.2f} s")
+
+    def showStats(self, stats: QueryStats) -> None:
+        self.stats.setText(stats.summary())
+        if stats.plan is not None:
+            self.plan.setPlainText("\n".join(stats.plan))
+
+    def showCancelled(self) -> None:
+        self.stop(f"Cancelled after {self.fetched} rows")
+
+    def showFailed(self, error: str) -> None:
+        self.stop("Failed")
+        self.displayError(error)
+
     def setupUi(self) -> None:
         self.setWindowTitle("Custom query window")
         self.resize(640, 300)
@@ -776,8 +1417,22 @@ class CustomQueryWindow(QtWidgets.QWidget):
         self.gridLayout1.addWidget(self.label1, 0, 0, 1, 1)
         self.query = QtWidgets.QPlainTextEdit(self.inputFrame)
         self.gridLayout1.addWidget(self.query, 1, 0, 1, 2)
+        self.rowLimit = QtWidgets.QSpinBox(self.inputFrame)
+        self.rowLimit.setPrefix("Row limit: ")
+        self.rowLimit.setRange(1, 10_000_000)
+        self.rowLimit.setValue(10000)
+        self.gridLayout1.addWidget(self.rowLimit, 2, 0, 1, 2)
+        self.showPlan = QtWidgets.QCheckBox("Show plan", self.inputFrame)
+        self.gridLayout1.addWidget(self.showPlan, 4, 0, 1, 2)
+        self.cancel = QtWidgets.QPushButton("Cancel", self.inputFrame)
+        self.cancel.setDisabled(True)
+        self.cancel.clicked.connect(self.cancelQuery)
+        self.gridLayout1.addWidget(self.cancel, 3, 0, 1, 1)
         self.execute = QtWidgets.QPushButton("Execute", self.inputFrame)
-        self.gridLayout1.addWidget(self.execute, 2, 1, 1, 1)
+        self.gridLayout1.addWidget(self.execute, 3, 1, 1, 1)
+        self.export = QtWidgets.QPushButton("Export...", self.inputFrame)
+        self.export.setToolTip("Export the whole result to CSV or XLSX")
+        self.gridLayout1.addWidget(self.export, 5, 0, 1, 2)
         self.horizontalLayout.addWidget(self.inputFrame)
         self.outputFrame = QtWidgets.QFrame(self)
         self.outputFrame.setFrameShape(QtWidgets.QFrame.StyledPanel)
@@ -785,12 +1440,29 @@ class CustomQueryWindow(QtWidgets.QWidget):
         self.gridLayout2 = QtWidgets.QGridLayout(self.outputFrame)
         self.label2 = QtWidgets.QLabel("Output:", self.outputFrame)
         self.gridLayout2.addWidget(self.label2, 0, 0, 1, 1)
-        self.tableWidget = QtWidgets.QTableWidget(self.outputFrame)
-        self.tableWidget.setColumnCount(0)
-        self.tableWidget.setRowCount(0)
-        self.tableWidget.horizontalHeader().setStretchLastSection(True)
-        self.gridLayout2.addWidget(self.tableWidget, 1, 0, 1, 1)
+        self.status = QtWidgets.QLabel("", self.outputFrame)
+        self.gridLayout2.addWidget(self.status, 0, 1, 1, 1)
+        self.model = TableModel([], editable=False)
+        self.tableView = QtWidgets.QTableView(self.outputFrame)
+        self.tableView.setModel(self.model)
+        self.tableView.horizontalHeader().setStretchLastSection(True)
+        self.gridLayout2.addWidget(self.tableView, 1, 0, 1, 2)
+        self.stats = QtWidgets.QLabel("", self.outputFrame)
+        self.gridLayout2.addWidget(self.stats, 2, 0, 1, 2)
         self.horizontalLayout.addWidget(self.outputFrame)
+        self.plan = QtWidgets.QPlainTextEdit(self)
+        self.plan.setReadOnly(True)
+        self.plan.setPlaceholderText("Plan")
+        self.horizontalLayout.addWidget(self.plan)
+        self.fetched = 0
+        self.elapsed = QtCore.QElapsedTimer()
+        self.clock = QtCore.QTimer(self)
+        self.clock.timeout.connect(self.updateElapsed)
+        self.clock.setInterval(100)
+
+    def closeEvent(self, event: QtGui.QCloseEvent) -> None:
+        self.cancelQuery()
+        super().closeEvent(event)
 
 
 class addColumnWindow(QtWidgets.QWidget):
@@ -928,6 +1600,166 @@ class remoteConnectionWindow(QtWidgets.QWidget):
         self.gridLayout.addWidget(self.connect, 10, 2, 1, 1)
 
 
+class ProfilerWindow(QtWidgets.QWidget):
+    COLUMNS = [
+        "Operation",
+        "Statement",
+        "Count",
+        "Total, ms",
+        "p50, ms",
+        "p99, ms",
+        "Rows",
+    ]
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.setupUi()
+
+    def displayError(self, err: str) -> None:
+        msg = QtWidgets.QMessageBox(self)
+        msg.setIcon(QtWidgets.QMessageBox.Critical)
+        msg.setWindowTitle("Error")
+        msg.setText(err)
+        return msg.exec_()
+
+    def showProfile(self, profiler: Profiler) -> None:
+        self.model = TableModel(self.COLUMNS, editable=False)
+        self.model.append_rows(
+            (
+                profile.operation or "-",
+                profile.template,
+                profile.count,
+                f"{profile.total * 1000:.2f}",
+                f"{profile.p50 * 1000:.2f}",
+                f"{profile.p99 * 1000:.2f}",
+                profile.rows,
+            )
+            for profile in profiler.statements()
+        )
+        self.tableView.setModel(self.model)
+        pool = profiler.pool()
+        self.pool.setText(
+            f"Connections: {pool.checkouts} checkouts, held "
+            f"{pool.held_total * 1000:.1f} ms in total, "
+            f"{pool.held_max * 1000:.1f} ms at most"
+        )
+
+    def setupUi(self) -> None:
+        self.setWindowTitle("Profiler")
+        self.resize(900, 400)
+        self.gridLayout = QtWidgets.QGridLayout(self)
+        self.enabled = QtWidgets.QCheckBox("Profile statements", self)
+        self.gridLayout.addWidget(self.enabled, 0, 0, 1, 1)
+        self.refresh = QtWidgets.QPushButton("Refresh", self)
+        self.gridLayout.addWidget(self.refresh, 0, 1, 1, 1)
+        self.reset = QtWidgets.QPushButton("Reset", self)
+        self.gridLayout.addWidget(self.reset, 0, 2, 1, 1)
+        self.save = QtWidgets.QPushButton("Save to file", self)
+        self.gridLayout.addWidget(self.save, 0, 3, 1, 1)
+        self.model = TableModel(self.COLUMNS, editable=False)
+        self.tableView = QtWidgets.QTableView(self)
+        self.tableView.setModel(self.model)
+        self.gridLayout.addWidget(self.tableView, 1, 0, 1, 4)
+        self.pool = QtWidgets.QLabel("", self)
+        self.gridLayout.addWidget(self.pool, 2, 0, 1, 4)
+
+
+class IndexesWindow(QtWidgets.QWidget):
+    COLUMNS = ["Name", "Columns", "Unique"]
+    SUGGESTION_COLUMNS = [
+        "Table",
+        "Columns",
+        "Statements",
+        "Executions",
+        "Time, ms",
+        "Benefit, ms",
+        "Writes",
+    ]
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.table = ""
+        self.indexes: List[Dict[str, Any]] = []
+        self.suggestions: List[IndexSuggestion] = []
+        self.setupUi()
+
+    def displayError(self, err: str) -> None:
+        msg = QtWidgets.QMessageBox(self)
+        msg.setIcon(QtWidgets.QMessageBox.Critical)
+        msg.setWindowTitle("Error")
+        msg.setText(err)
+        return msg.exec_()
+
+    def selectedRow(self, view: QtWidgets.QTableView) -> Optional[int]:
+        rows = view.selectionModel().selectedRows()
+        return rows[0].row() if rows else None
+
+    def showIndexes(self, table: str, indexes: List[Dict[str, Any]]) -> None:
+        self.table = table
+        self.indexes = indexes
+        self.label.setText(f"Indexes of {table}" if table else "No table")
+        model = TableModel(self.COLUMNS, editable=False)
+        model.append_rows(
+            (
+                index["name"],
+                ", ".join(index["column_names"]),
+                "yes" if index["unique"] else "no",
+            )
+            for index in indexes
+        )
+        self.tableView.setModel(model)
+
+    def showSuggestions(self, suggestions: List[IndexSuggestion]) -> None:
+        self.suggestions = suggestions
+        model = TableModel(self.SUGGESTION_COLUMNS, editable=False)
+        model.append_rows(
+            (
+                suggestion.table,
+                ", ".join(suggestion.columns),
+                "\n".join(suggestion.statements),
+                suggestion.executions,
+                f"{suggestion.elapsed * 1000:.2f}",
+                f"{suggestion.benefit * 1000:.2f}",
+                suggestion.writes,
+            )
+            for suggestion in suggestions
+        )
+        self.suggestionsView.setModel(model)
+
+    def setupUi(self) -> None:
+        self.setWindowTitle("Indexes")
+        self.resize(800, 500)
+        self.gridLayout = QtWidgets.QGridLayout(self)
+        self.label = QtWidgets.QLabel("No table", self)
+        self.gridLayout.addWidget(self.label, 0, 0, 1, 4)
+        self.tableView = QtWidgets.QTableView(self)
+        self.gridLayout.addWidget(self.tableView, 1, 0, 1, 4)
+        self.columns = QtWidgets.QLineEdit(self)
+        self.columns.setPlaceholderText("Columns, comma separated")
+        self.gridLayout.addWidget(self.columns, 2, 0, 1, 1)
+        self.unique = QtWidgets.QCheckBox("Unique", self)
+        self.gridLayout.addWidget(self.unique, 2, 1, 1, 1)
+        self.add = QtWidgets.QPushButton("Create", self)
+        self.gridLayout.addWidget(self.add, 2, 2, 1, 1)
+        self.drop = QtWidgets.QPushButton("Drop selected", self)
+        self.gridLayout.addWidget(self.drop, 2, 3, 1, 1)
+        self.suggest = QtWidgets.QPushButton(
+            "Suggest indexes for profiled statements", self
+        )
+        self.gridLayout.addWidget(self.suggest, 3, 0, 1, 2)
+        self.createSuggested = QtWidgets.QPushButton(
+            "Create selected suggestion", self
+        )
+        self.gridLayout.addWidget(self.createSuggested, 3, 2, 1, 2)
+        self.suggestionsView = QtWidgets.QTableView(self)
+        self.gridLayout.addWidget(self.suggestionsView, 4, 0, 1, 4)
+        for view in (self.tableView, self.suggestionsView):
+            view.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+            view.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
+        self.showIndexes("", [])
+        self.showSuggestions([])
+
+
 class settingsWindow(QtWidgets.QWidget):
     def __init__(self) -> None:
         super().__init__()
@@ -935,7 +1767,7 @@ class settingsWindow(QtWidgets.QWidget):
 
     def setupUi(self) -> None:
         self.setWindowTitle("Settings")
-        self.resize(230, 100)
+        self.resize(300, 190)
         self.gridLayout = QtWidgets.QGridLayout(self)
         self.label = QtWidgets.QLabel("How to find a row in a table?", self)
         self.gridLayout.addWidget(self.label, 0, 0, 1, 1)
@@ -947,10 +1779,23 @@ class settingsWindow(QtWidgets.QWidget):
         self.findRowSettings.addButton(self.pks)
         self.gridLayout.addWidget(self.rowid, 1, 0, 1, 1)
         self.gridLayout.addWidget(self.pks, 2, 0, 1, 1)
+        self.bufferEdits = QtWidgets.QCheckBox("Buffer edits until save", self)
+        self.gridLayout.addWidget(self.bufferEdits, 3, 0, 1, 1)
+        self.fastImport = QtWidgets.QCheckBox(
+            "Fast import (SQLite, rebuilds indexes)", self
+        )
+        self.gridLayout.addWidget(self.fastImport, 4, 0, 1, 1)
+        self.slowQueryThreshold = QtWidgets.QSpinBox(self)
+        self.slowQueryThreshold.setPrefix("Log queries slower than ")
+        self.slowQueryThreshold.setSuffix(" ms")
+        self.slowQueryThreshold.setSpecialValueText("Slow query log disabled")
+        self.slowQueryThreshold.setRange(0, 3_600_000)
+        self.slowQueryThreshold.setValue(1000)
+        self.gridLayout.addWidget(self.slowQueryThreshold, 5, 0, 1, 1)
 
 
 def run():
     app = QtWidgets.QApplication(argv)
     ex = DBeditor()
     ex.show()
-    exit(app.exec())
+    exit(run_app(app, ex.disposeAsync))
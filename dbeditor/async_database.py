@@ -0,0 +1,192 @@
+from asyncio import Lock, gather
+from typing import (
+    Any,
+    Callable,
+    Collection,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from sqlalchemy import Table
+from sqlalchemy.engine.result import RMKeyView
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.util import greenlet_spawn
+
+from dbeditor.database import Database, Key, Page, RowUpdate
+from dbeditor.uri_builder import ConnectionPolicy
+
+T = TypeVar("T")
+
+
+class TableSummary(NamedTuple):
+    rows: int
+    pk: List[str]
+    page: Page
+
+
+class AsyncDatabase:
+    """Asynchronous counterpart of :class:`Database` on an asyncio driver:
+    ``aiosqlite``, ``asyncpg`` or ``aiomysql``.
+
+    Methods of the wrapped :attr:`database` run in greenlets, as in
+    :class:`~sqlalchemy.ext.asyncio.AsyncSession`, so they share its
+    statements, result cache and profiler, but the event loop keeps running
+    during round trips. Independent calls can be awaited concurrently, each
+    of them checks out its own connection. Tables are reflected one at a
+    time. :meth:`~.Database.unit_of_work` isn't available, because it's
+    bound to a thread.
+    """
+
+    def __init__(self, database: Database) -> None:
+        """
+        :param database: database created on an asyncio driver, see
+            :meth:`create`
+        """
+        self._database = database
+        self._reflection = Lock()
+
+    @classmethod
+    async def create(
+        cls,
+        path: str,
+        *args: Any,
+        policy: Optional[ConnectionPolicy] = None,
+        cache_size: int = 32 * 1024 * 1024,
+        **kwargs: Any,
+    ) -> "AsyncDatabase":
+        """Connects to the database, arguments are the same as of
+        :class:`Database`.
+
+        :param path: database URI with asyncio driver, e.g. built by
+            :func:`~dbeditor.uri_builder.build_uri` with ``asynchronous``
+        """
+        database = await greenlet_spawn(
+            Database,
+            path,
+            *args,
+            policy=policy,
+            cache_size=cache_size,
+            future=True,
+            **kwargs,
+        )
+        return cls(database)
+
+    @property
+    def database(self) -> Database:
+        """Synchronous database, its methods can be called only through
+        :meth:`run`."""
+        return self._database
+
+    @property
+    def engine(self) -> AsyncEngine:
+        return AsyncEngine(self._database.engine)
+
+    async def run(
+        self, method: Callable[..., T], *args: Any, **kwargs: Any
+    ) -> T:
+        """Runs ``method`` using :attr:`database` without blocking the event
+        loop."""
+        result: T = await greenlet_spawn(method, *args, **kwargs)
+        return result
+
+    async def _run_on_table(
+        self,
+        method: Callable[..., T],
+        table_name: str,
+        *args: Any,
+        **kwargs: Any,
+    ) -> T:
+        await self.get_table(table_name)
+        return await self.run(method, table_name, *args, **kwargs)
+
+    async def dispose(self) -> None:
+        """Closes connections of the pool."""
+        await self.engine.dispose()
+
+    async def get_tables(self) -> List[str]:
+        return await self.run(self._database.get_tables)
+
+    async def get_table(self, name: str) -> Table:
+        async with self._reflection:
+            return await self.run(self._database.get_table, name)
+
+    async def forget_table(self, name: str) -> None:
+        """Drops cached reflection of the table, e.g. after it was altered
+        through another :class:`Database`."""
+        async with self._reflection:
+            self._database.forget_table(name)
+
+    async def get_pk_column_names(self, name: str) -> List[str]:
+        return await self._run_on_table(
+            self._database.get_pk_column_names, name
+        )
+
+    async def count_rows(self, table_name: str) -> int:
+        return await self._run_on_table(self._database.count_rows, table_name)
+
+    async def fetch_page(
+        self,
+        table_name: str,
+        after_key: Optional[Key] = None,
+        limit: int = 1024,
+    ) -> Page:
+        return await self._run_on_table(
+            self._database.fetch_page, table_name, after_key, limit
+        )
+
+    async def open_table(
+        self, table_name: str, limit: int = 1024
+    ) -> TableSummary:
+        """Concurrently reads number of rows, primary key and the first page
+        of the table."""
+        await self.get_table(table_name)
+        rows, pk, page = await gather(
+            self.count_rows(table_name),
+            self.get_pk_column_names(table_name),
+            self.fetch_page(table_name, limit=limit),
+        )
+        return TableSummary(rows, pk, page)
+
+    async def set_sort(
+        self, table_name: str, column: Optional[str], descending: bool = False
+    ) -> None:
+        await self._run_on_table(
+            self._database.set_sort, table_name, column, descending
+        )
+
+    async def insert_row(self, table_name: str, row: Dict[str, Any]) -> None:
+        await self._run_on_table(self._database.insert_row, table_name, row)
+
+    async def insert_rows(
+        self, table_name: str, rows: Sequence[Dict[str, Any]]
+    ) -> None:
+        await self._run_on_table(self._database.insert_rows, table_name, rows)
+
+    async def update_row(
+        self, table_name: str, pks: Dict[str, Any], new_values: Dict[str, Any]
+    ) -> None:
+        await self._run_on_table(
+            self._database.update_row, table_name, pks, new_values
+        )
+
+    async def update_rows(
+        self, table_name: str, updates: Sequence[RowUpdate]
+    ) -> None:
+        await self._run_on_table(
+            self._database.update_rows, table_name, updates
+        )
+
+    async def delete_rows(self, table_name: str, keys: Collection[Key]) -> int:
+        return await self._run_on_table(
+            self._database.delete_rows, table_name, keys
+        )
+
+    async def execute_raw(
+        self, query: str, **kwargs: Any
+    ) -> Optional[Tuple[RMKeyView, List[Any]]]:
+        return await self.run(self._database.execute_raw, query, **kwargs)
@@ -1,17 +1,198 @@
-from typing import List, Any, Dict, Tuple, Optional
+import re
+from array import array
+from bisect import bisect_left, insort
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+from itertools import groupby
+from threading import local
+from time import perf_counter
+from typing import (
+    List,
+    Any,
+    Dict,
+    Tuple,
+    Optional,
+    Iterator,
+    Sequence,
+    Collection,
+    Hashable,
+    Callable,
+    TypeVar,
+    cast,
+)
 
-from sqlalchemy import create_engine, MetaData, Table, text, inspect
+from sqlalchemy import (
+    create_engine,
+    MetaData,
+    Table,
+    text,
+    inspect,
+    select,
+    tuple_,
+    literal_column,
+    INTEGER,
+    delete,
+    update,
+    bindparam,
+    and_,
+    or_,
+    func,
+    event,
+    String,
+    Index,
+)
 from sqlalchemy.engine import Engine, Result, Row
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.engine.result import RMKeyView
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.sql import ColumnElement, Select
+
+from dbeditor.profiler import Profiler
+from dbeditor.query_stats import QueryInstrumentation, QueryStats
+from dbeditor.result_cache import ResultCache, estimate_size
+from dbeditor.uri_builder import ConnectionPolicy
+
+F = TypeVar("F", bound=Callable[..., Any])
+Key = Tuple[Any, ...]
+Page = Tuple[List[Any], Optional[Key]]
+# name of the column and whether rows are in descending order
+Sort = Tuple[str, bool]
+# row key (column name -> value) and new values of the row
+RowUpdate = Tuple[Dict[str, Any], Dict[str, Any]]
+# schema version, table data version, rowids
+_RowidIndex = Tuple[Tuple[Any, ...], "array[int]"]
+
+_ROWID_LABEL = "__dbeditor_rowid__"
+# UPDATE reserves names of its columns, so bound values can't reuse them
+_KEY_PARAM = "__dbeditor_key_"
+_VALUE_PARAM = "__dbeditor_value_"
+# maximum number of bound parameters in one ``IN (...)`` list
+_IN_CHUNK_SIZE = 900
+_DDL_KEYWORDS = {"CREATE", "ALTER", "DROP"}
+# quoted literals and identifiers, whitespace inside them is significant
+_QUOTED = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")""")
+# suffix of FTS5 table which indexes text columns of a SQLite table
+_FTS_SUFFIX = "__fts"
+
+
+def _is_ddl(query: str) -> bool:
+    words = query.split(None, 1)
+    return bool(words) and words[0].upper() in _DDL_KEYWORDS
+
+
+def _is_select(query: str) -> bool:
+    words = query.split(None, 1)
+    return bool(words) and words[0].upper() == "SELECT"
+
+
+def _normalize(query: str) -> str:
+    parts = _QUOTED.split(query.strip().rstrip(";"))
+    for i in range(0, len(parts), 2):
+        parts[i] = " ".join(parts[i].split())
+    return "".join(parts)
+
+
+def _column_names(row: Dict[str, Any]) -> Tuple[str, ...]:
+    return tuple(row)
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _fts_trigger(table_name: str, event_name: str) -> str:
+    return _quote(f"{table_name}{_FTS_SUFFIX}_{event_name}")
+
+
+def _after(
+    key_columns: List[ColumnElement], key: Key, descending: bool = False
+) -> ColumnElement:
+    if len(key_columns) == 1:
+        left, right = key_columns[0], key[0]
+    else:
+        left, right = tuple_(*key_columns), tuple_(*key)
+    return left < right if descending else left > right
+
+
+def _key_in(
+    key_columns: List[ColumnElement], keys: Collection[Key]
+) -> ColumnElement:
+    if len(key_columns) == 1:
+        return key_columns[0].in_([key[0] for key in keys])
+    return tuple_(*key_columns).in_(keys)
+
+
+def _after_sorted(
+    column: ColumnElement,
+    key_columns: List[ColumnElement],
+    key: Key,
+    descending: bool,
+    nulls_first: bool,
+) -> ColumnElement:
+    """Returns condition of rows following the row with ``key`` (value of
+    ``column`` and values of ``key_columns``) when rows are ordered by
+    ``column`` and then by key columns in the same direction."""
+    value = key[0]
+    same = _after(key_columns, key[1:], descending)
+    if value is None:
+        condition = and_(column.is_(None), same)
+        return or_(condition, column.isnot(None)) if nulls_first else condition
+    # the redundant range lets database use index of the column
+    if descending:
+        condition = and_(column <= value, or_(column < value, same))
+    else:
+        condition = and_(column >= value, or_(column > value, same))
+    return condition if nulls_first else or_(condition, column.is_(None))
+
+
+def _profiled(method: F) -> F:
+    """Attributes statements executed by the method to its name in the
+    profiler of the database."""
+
+    @wraps(method)
+    def wrapper(self: "Database", *args: Any, **kwargs: Any) -> Any:
+        with self._profiler.operation(method.__name__):
+            return method(self, *args, **kwargs)
+
+    return cast(F, wrapper)
 
 
 class Database:
-    def __init__(self, path: str, *args: Any, **kwargs: Any) -> None:
+    def __init__(
+        self,
+        path: str,
+        *args: Any,
+        policy: Optional[ConnectionPolicy] = None,
+        cache_size: int = 32 * 1024 * 1024,
+        **kwargs: Any,
+    ) -> None:
+        """
+        :param path: database URI
+        :param policy: connection pooling options, explicit keyword
+            arguments of :func:`~sqlalchemy.create_engine` take precedence
+        :param cache_size: maximum size in bytes of cached results of table
+            pages and raw ``SELECT`` queries, ``0`` disables the cache
+        """
+        if policy is not None:
+            kwargs = {**policy.engine_kwargs(), **kwargs}
         self._engine = create_engine(path, *args, **kwargs)
+        self._checkouts = 0
+        event.listen(self._engine, "checkout", self._on_checkout)
+        self._local = local()
         self._metadata = MetaData()
-        self._metadata.reflect(self._engine)
+        self._table_names: Optional[List[str]] = inspect(
+            self._engine
+        ).get_table_names()
         self._session = sessionmaker(self._engine)
+        self._global_version = 0
+        self._versions: Dict[str, int] = defaultdict(int)
+        self._writes = 0
+        self._rowids: Dict[str, _RowidIndex] = {}
+        self._sorts: Dict[str, Sort] = {}
+        self._cache = ResultCache(cache_size)
+        self._instrumentation = QueryInstrumentation()
+        self._profiler = Profiler(self._engine)
 
     @property
     def engine(self) -> Engine:
@@ -25,76 +206,991 @@ class Database:
     def session(self) -> Session:
         return self._session()
 
+    @property
+    def instrumentation(self) -> QueryInstrumentation:
+        """Receivers of :class:`QueryStats` of raw queries."""
+        return self._instrumentation
+
+    @property
+    def profiler(self) -> Profiler:
+        """Profiler of statements executed by the engine, it's disabled by
+        default."""
+        return self._profiler
+
+    @property
+    def cache(self) -> ResultCache:
+        """Cache of read results, entries are keyed by data version, so
+        it has to be cleared explicitly only after changes which neither
+        this object nor SQLite ``PRAGMA data_version`` can notice."""
+        return self._cache
+
+    @contextmanager
+    def unit_of_work(self) -> Iterator[Session]:
+        """Runs all operations of this object inside the block on one
+        connection and in one transaction, which is committed at the end of
+        the block or rolled back if it raises. Nested blocks join the outer
+        one. Unit of work is bound to the current thread.
+        """
+        current = getattr(self._local, "session", None)
+        if current is not None:
+            yield current
+            return
+        with self.session as session:
+            self._local.session = session
+            try:
+                yield session
+                session.commit()
+            except BaseException:
+                session.rollback()
+                # cached state could include rolled back writes
+                self.invalidate()
+                raise
+            finally:
+                self._local.session = None
+
+    @contextmanager
+    def _begin(self) -> Iterator[Session]:
+        current = getattr(self._local, "session", None)
+        if current is not None:
+            yield current
+            return
+        with self.session as session:
+            yield session
+            session.commit()
+
+    def _on_checkout(self, *args: Any) -> None:
+        self._checkouts += 1
+
+    def pool_status(self) -> Dict[str, Any]:
+        """Returns statistics of the connection pool: total number of
+        checkouts, and for queue pools their size, number of checked in and
+        checked out connections and current overflow."""
+        pool = self._engine.pool
+        status: Dict[str, Any] = {
+            "pool": type(pool).__name__,
+            "checkouts": self._checkouts,
+        }
+        for name in ("size", "checkedin", "checkedout", "overflow"):
+            method = getattr(pool, name, None)
+            if method is not None:
+                status[name] = method()
+        return status
+
+    @_profiled
     def get_tables(self) -> List[str]:
+        """Returns names of tables in database without reflecting them.
+        Tables created through :attr:`metadata` are listed after them."""
+        if self._table_names is None:
+            self._table_names = inspect(self._engine).get_table_names()
+        created = [
+            name
+            for name in self._metadata.tables
+            if name not in self._table_names
+        ]
         user_tables = filter(
-            lambda x: x != "sqlite_sequence", self._metadata.tables.keys()
+            lambda x: x != "sqlite_sequence" and _FTS_SUFFIX not in x,
+            self._table_names + created,
         )
         return list(user_tables)
 
     def get_table_column_names(self, table_name: str) -> List[str]:
-        table: Table = self._metadata.tables[table_name]
+        table = self.get_table(table_name)
         return table.columns.keys()  # type: ignore
 
     def get_pk_column_names(self, name: str) -> List[str]:
         return [key.name for key in inspect(self.get_table(name)).primary_key]
 
+    @_profiled
     def get_table(self, name: str) -> Table:
-        return self._metadata.tables[name]
+        """Returns table, it is reflected on the first access.
+
+        :raises NoSuchTableError: if table doesn't exist.
+        """
+        table = self._metadata.tables.get(name)
+        if table is None:
+            table = Table(name, self._metadata, autoload_with=self._engine)
+        return table
+
+    def forget_table(self, name: str) -> None:
+        """Drops cached reflection of the table, so it's reflected again on
+        the next access."""
+        table = self._metadata.tables.get(name)
+        if table is not None:
+            self._metadata.remove(table)
+        self._rowids.pop(name, None)
+        self._sorts.pop(name, None)
+        self.invalidate(name)
+
+    def forget_tables(self) -> None:
+        """Drops cached reflection of all tables and list of their names."""
+        self._metadata.clear()
+        self._table_names = None
+        self._rowids.clear()
+        self._sorts.clear()
+        self.invalidate()
+
+    @_profiled
+    def drop_table(self, name: str) -> None:
+        if self.has_search_index(name):
+            self.drop_search_index(name)
+        self.get_table(name).drop(self._engine)
+        self.forget_table(name)
+        if self._table_names is not None and name in self._table_names:
+            self._table_names.remove(name)
 
     # TODO: create class for this operations
+    @_profiled
     def select_all(self, table_name: str) -> List[Any]:
         table = self.get_table(table_name)
-        with self.session as session:
+        with self._begin() as session:
             return session.query(table).all()  # type: ignore
 
+    @_profiled
+    def count_rows(self, table_name: str) -> int:
+        table = self.get_table(table_name)
+        statement = select(func.count()).select_from(table)
+        with self._begin() as session:
+            return int(session.execute(statement).scalar_one())
+
+    def get_key_columns(self, table_name: str) -> List[ColumnElement]:
+        """Returns columns that identify a row of ``table_name``: primary key
+        columns or ``rowid`` if table doesn't have primary key. Empty list
+        is returned if table has no primary key and database doesn't support
+        ``rowid``.
+        """
+        pk = list(self.get_table(table_name).primary_key.columns)
+        if pk:
+            return pk
+        if self._engine.dialect.name == "sqlite":
+            return [literal_column("rowid")]
+        return []
+
+    @_profiled
+    def fetch_page(
+        self,
+        table_name: str,
+        after_key: Optional[Key] = None,
+        limit: int = 1024,
+    ) -> Page:
+        """Selects at most ``limit`` rows which keys are greater than
+        ``after_key`` using keyset pagination. Tables without any key are
+        paginated by offset, so their key is number of already fetched rows.
+        If table is sorted by :meth:`~.Database.set_sort`, rows are ordered
+        by the column and then by the key, which is prepended with value of
+        the column.
+
+        :param table_name: name of the table
+        :param after_key: key of the last row of the previous page or ``None``
+            for the first page
+        :param limit: maximum number of rows in the page
+        :return: rows of the page and key of its last row (``None`` if page
+            is empty)
+        """
+        with self._begin() as session:
+            cache_key = None
+            if self._cache.max_size:
+                token = self._read_token(session, table_name)
+                sort = self._sorts.get(table_name)
+                cache_key = ("page", table_name, after_key, limit, sort, token)
+                cached = self._cache.get(cache_key)
+                if cached is not None:
+                    return list(cached[0]), cached[1]
+            page = self._select_page(session, table_name, after_key, limit)
+        if cache_key is not None:
+            self._cache.put(cache_key, page, estimate_size(page[0]))
+        return list(page[0]), page[1]
+
+    def _select_page(
+        self,
+        session: Session,
+        table_name: str,
+        after_key: Optional[Key],
+        limit: int,
+    ) -> Page:
+        table = self.get_table(table_name)
+        key_columns = self.get_key_columns(table_name)
+        order_by = self._order_by(table_name)
+        if not key_columns:
+            offset = after_key[0] if after_key is not None else 0
+            statement = select(table).order_by(*order_by)
+            rows = session.execute(statement.offset(offset).limit(limit)).all()
+            return rows, (offset + len(rows),) if rows else None
+        is_rowid = not table.primary_key.columns
+        statement = select(table)
+        if is_rowid:
+            statement = statement.add_columns(
+                key_columns[0].label(_ROWID_LABEL)
+            )
+        if after_key is not None:
+            statement = statement.where(self._after_key(table_name, after_key))
+        statement = statement.order_by(*order_by).limit(limit)
+        rows = session.execute(statement).all()
+        if not rows:
+            return [], None
+        names = table.columns.keys()
+        sort = self._sorts.get(table_name)
+        prefix = (rows[-1][names.index(sort[0])],) if sort else ()
+        if is_rowid:
+            return [row[:-1] for row in rows], prefix + (rows[-1][-1],)
+        indexes = [names.index(column.name) for column in key_columns]
+        return rows, prefix + tuple(rows[-1][i] for i in indexes)
+
+    def get_sort(self, table_name: str) -> Optional[Sort]:
+        return self._sorts.get(table_name)
+
+    def set_sort(
+        self, table_name: str, column: Optional[str], descending: bool = False
+    ) -> None:
+        """Sets order of rows returned by :meth:`~.Database.fetch_page` and
+        used by :meth:`~.Database.get_rowid` and
+        :meth:`~.Database.get_positions`: by ``column`` and then by key of
+        the table. ``None`` restores order by key. Order is reset when
+        reflection of the table is dropped.
+
+        :raises KeyError: if table doesn't have the column.
+        """
+        if column is None:
+            self._sorts.pop(table_name, None)
+        else:
+            self.get_table(table_name).columns[column]
+            self._sorts[table_name] = column, descending
+        self._rowids.pop(table_name, None)
+
+    def _nulls_first(self, descending: bool) -> bool:
+        # NULL is less than other values in SQLite and MySQL, but greater in
+        # PostgreSQL
+        nulls_last: bool = self._engine.dialect.name == "postgresql"
+        return descending == nulls_last
+
+    def _order_by(self, table_name: str) -> List[ColumnElement]:
+        key_columns = self.get_key_columns(table_name)
+        sort = self._sorts.get(table_name)
+        if sort is None:
+            return key_columns
+        column = self.get_table(table_name).columns[sort[0]]
+        if not sort[1]:
+            return [column] + key_columns
+        return [column.desc()] + [key.desc() for key in key_columns]
+
+    def _after_key(
+        self, table_name: str, key: Key, reverse: bool = False
+    ) -> ColumnElement:
+        """Returns condition of rows following the row with ``key`` in the
+        order of :meth:`~.Database.fetch_page`, or preceding it if
+        ``reverse`` is set."""
+        key_columns = self.get_key_columns(table_name)
+        sort = self._sorts.get(table_name)
+        if sort is None:
+            return _after(key_columns, key, reverse)
+        column = self.get_table(table_name).columns[sort[0]]
+        descending = sort[1] != reverse
+        nulls_first = self._nulls_first(sort[1]) != reverse
+        return _after_sorted(column, key_columns, key, descending, nulls_first)
+
+    @_profiled
+    def has_sort_index(self, table_name: str, column: str) -> bool:
+        """Returns whether some index lets database read rows of the table
+        in the order set by :meth:`~.Database.set_sort` without sorting
+        them."""
+        required = [column]
+        if not self._is_rowid_key(table_name):
+            required += [key.name for key in self.get_key_columns(table_name)]
+        return any(
+            names[: len(required)] == required or unique and names == [column]
+            for names, unique in self.get_index_columns(table_name)
+        )
+
+    @_profiled
+    def get_index_columns(
+        self, table_name: str
+    ) -> List[Tuple[List[str], bool]]:
+        """Returns columns of primary key, indexes and unique constraints of
+        the table, each with whether it's unique."""
+        inspector = inspect(self._engine)
+        pk = inspector.get_pk_constraint(table_name)["constrained_columns"]
+        candidates = [(list(pk), True)] if pk else []
+        candidates += [
+            (list(index["column_names"]), bool(index["unique"]))
+            for index in inspector.get_indexes(table_name)
+        ]
+        candidates += [
+            (list(constraint["column_names"]), True)
+            for constraint in inspector.get_unique_constraints(table_name)
+        ]
+        return candidates
+
+    @_profiled
+    def create_sort_index(self, table_name: str, column: str) -> None:
+        """Creates index which lets database read rows ordered by
+        ``column`` (see :meth:`~.Database.has_sort_index`)."""
+        columns = [column]
+        if not self._is_rowid_key(table_name):
+            columns += self.get_pk_column_names(table_name)
+        self.create_index(table_name, columns, f"ix_{table_name}_{column}")
+
+    @_profiled
+    def get_indexes(self, table_name: str) -> List[Dict[str, Any]]:
+        """Returns indexes of the table as dictionaries with ``name``,
+        ``column_names`` and ``unique`` keys. Primary key and indexes
+        created implicitly by SQLite for unique constraints aren't
+        included."""
+        return [
+            {
+                "name": index["name"],
+                "column_names": list(index["column_names"]),
+                "unique": bool(index["unique"]),
+            }
+            for index in inspect(self._engine).get_indexes(table_name)
+        ]
+
+    @_profiled
+    def create_index(
+        self,
+        table_name: str,
+        columns: Sequence[str],
+        name: Optional[str] = None,
+        unique: bool = False,
+    ) -> str:
+        """Creates index of ``columns`` of the table.
+
+        :param table_name: name of the table
+        :param columns: names of indexed columns, the first one is the
+            leading column of the index
+        :param name: name of the index, by default it's made of names of
+            the table and the columns
+        :param unique: whether the index is unique
+        :return: name of the created index
+        :raises ValueError: if ``columns`` is empty.
+        :raises KeyError: if table doesn't have one of the columns.
+        """
+        if not columns:
+            raise ValueError("Index must have at least one column.")
+        table = self.get_table(table_name)
+        index_columns = [table.columns[column] for column in columns]
+        if name is None:
+            name = "_".join(["ix", table_name, *columns])
+        Index(name, *index_columns, unique=unique).create(self._engine)
+        return name
+
+    @_profiled
+    def drop_index(self, table_name: str, name: str) -> None:
+        """Drops index of the table.
+
+        :raises KeyError: if table doesn't have the index.
+        """
+        # index could be created after the table was reflected
+        table = Table(table_name, MetaData(), autoload_with=self._engine)
+        found = [index for index in table.indexes if index.name == name]
+        if not found:
+            raise KeyError(name)
+        found[0].drop(self._engine)
+        reflected = self._metadata.tables.get(table_name)
+        if reflected is not None:
+            for index in list(reflected.indexes):
+                if index.name == name:
+                    reflected.indexes.discard(index)
+
+    def iter_rows(
+        self, table_name: str, chunk_size: int = 1024
+    ) -> Iterator[Any]:
+        """Lazily iterates over all rows of the table fetching them by pages
+        of ``chunk_size`` rows."""
+        key: Optional[Key] = None
+        while True:
+            rows, key = self.fetch_page(table_name, key, chunk_size)
+            yield from rows
+            if len(rows) < chunk_size:
+                return
+
+    @_profiled
+    def search(
+        self,
+        table_name: str,
+        pattern: str,
+        after_key: Optional[Key] = None,
+        limit: int = 1024,
+    ) -> Page:
+        """Returns keys of rows which text columns contain ``pattern``
+        (case-insensitive), page by page in the order of the keys, which
+        differs from the order of :meth:`~.Database.fetch_page` if the table
+        is sorted by :meth:`~.Database.set_sort`. Use
+        :meth:`~.Database.get_positions` to find the rows in that order.
+
+        If the table has a search index (see
+        :meth:`~.Database.create_search_index`), the index is used instead,
+        so ``pattern`` matches whole words with the last one as a prefix.
+
+        :param table_name: name of the table
+        :param pattern: searched text
+        :param after_key: last key of the previous page or ``None`` for the
+            first page
+        :param limit: maximum number of keys in the page
+        :return: keys of :meth:`~.Database.get_key_columns` columns and the
+            last of them (``None`` if page is empty)
+        :raises ValueError: if table doesn't have any key.
+        """
+        table = self.get_table(table_name)
+        key_columns = self.get_key_columns(table_name)
+        if not key_columns:
+            raise ValueError(f"Table '{table_name}' doesn't have any key.")
+        if self.has_search_index(table_name):
+            fts = _quote(table_name + _FTS_SUFFIX)
+            matches = (
+                text(f"SELECT rowid FROM {fts} WHERE {fts} MATCH :query")
+                .bindparams(query='"' + pattern.replace('"', '""') + '"*')
+                .columns(literal_column("rowid"))
+            )
+            condition = literal_column("rowid").in_(matches)
+        else:
+            escaped = (
+                pattern.replace("\\", "\\\\")
+                .replace("%", "\\%")
+                .replace("_", "\\_")
+            )
+            columns = self._text_columns(table_name)
+            if not columns:
+                return [], None
+            condition = or_(
+                *(
+                    column.ilike(f"%{escaped}%", escape="\\")
+                    for column in columns
+                )
+            )
+        statement = select(*key_columns).select_from(table).where(condition)
+        if after_key is not None:
+            statement = statement.where(_after(key_columns, after_key))
+        statement = statement.order_by(*key_columns).limit(limit)
+        with self._begin() as session:
+            keys = [tuple(row) for row in session.execute(statement)]
+        return keys, keys[-1] if keys else None
+
+    @_profiled
+    def get_positions(self, table_name: str, keys: Sequence[Key]) -> List[int]:
+        """Returns positions of rows with ``keys`` in the order used by
+        :meth:`~.Database.fetch_page`. Keys of missing rows are skipped."""
+        if self._is_rowid_ordered(table_name):
+            rowids = self._rowid_index(table_name)
+            found = [bisect_left(rowids, key[0]) for key in keys]
+            return [
+                position
+                for position, key in zip(found, keys)
+                if position < len(rowids) and rowids[position] == key[0]
+            ]
+        keys = [tuple(key) for key in keys]
+        chunk_size = max(1, _IN_CHUNK_SIZE // len(keys[0])) if keys else 1
+        positions: Dict[Key, int] = {}
+        with self._begin() as session:
+            for start in range(0, len(keys), chunk_size):
+                end = start + chunk_size
+                statement = self._positions_statement(
+                    table_name, keys[start:end]
+                )
+                for *key, position in session.execute(statement):
+                    positions[tuple(key)] = position
+        return [positions[key] for key in keys if key in positions]
+
+    def _positions_statement(
+        self, table_name: str, keys: Collection[Key]
+    ) -> Select:
+        # rows are numbered by one window function instead of counting rows
+        # preceding each of them
+        key_columns = self.get_key_columns(table_name)
+        position = func.row_number().over(order_by=self._order_by(table_name))
+        numbered = (
+            select(
+                *(
+                    column.label(f"key{i}")
+                    for i, column in enumerate(key_columns)
+                ),
+                (position - 1).label("position"),
+            )
+            .select_from(self.get_table(table_name))
+            .subquery()
+        )
+        columns = list(numbered.columns)
+        return select(*columns).where(_key_in(columns[:-1], keys))
+
+    def _text_columns(self, table_name: str) -> List[ColumnElement]:
+        columns = self.get_table(table_name).columns
+        return [column for column in columns if isinstance(column.type, String)]
+
+    def has_search_index(self, table_name: str) -> bool:
+        if self._engine.dialect.name != "sqlite":
+            return False
+        return bool(inspect(self._engine).has_table(table_name + _FTS_SUFFIX))
+
+    @_profiled
+    def create_search_index(self, table_name: str) -> None:
+        """Creates SQLite FTS5 index of text columns of the table. The index
+        is kept in sync with the table by triggers.
+
+        :raises ValueError: if database isn't SQLite or table doesn't have
+            text columns.
+        """
+        if self._engine.dialect.name != "sqlite":
+            raise ValueError("Search index is supported only by SQLite.")
+        names = [column.name for column in self._text_columns(table_name)]
+        if not names:
+            raise ValueError(f"Table '{table_name}' doesn't have text columns.")
+        table, fts = _quote(table_name), _quote(table_name + _FTS_SUFFIX)
+        columns = ", ".join(map(_quote, names))
+        new = ", ".join("new." + _quote(name) for name in names)
+        old = ", ".join("old." + _quote(name) for name in names)
+        delete_old = (
+            f"INSERT INTO {fts} ({fts}, rowid, {columns}) "
+            f"VALUES ('delete', old.rowid, {old});"
+        )
+        insert_new = (
+            f"INSERT INTO {fts} (rowid, {columns}) VALUES (new.rowid, {new});"
+        )
+        triggers = {
+            "insert": ("INSERT", insert_new),
+            "delete": ("DELETE", delete_old),
+            "update": ("UPDATE", delete_old + " " + insert_new),
+        }
+        statements = [
+            f"CREATE VIRTUAL TABLE {fts} USING fts5({columns}, "
+            f"content={table}, content_rowid='rowid')"
+        ]
+        for event_name, (action, body) in triggers.items():
+            statements.append(
+                f"CREATE TRIGGER {_fts_trigger(table_name, event_name)} "
+                f"AFTER {action} ON {table} BEGIN {body} END"
+            )
+        statements.append(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+        with self._begin() as session:
+            for statement in statements:
+                session.execute(text(statement))
+
+    @_profiled
+    def drop_search_index(self, table_name: str) -> None:
+        with self._begin() as session:
+            for event_name in ("insert", "delete", "update"):
+                trigger = _fts_trigger(table_name, event_name)
+                session.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+            fts = _quote(table_name + _FTS_SUFFIX)
+            session.execute(text(f"DROP TABLE IF EXISTS {fts}"))
+
+    def data_version(self, table_name: str) -> Tuple[int, int]:
+        """Returns token which changes after every write to ``table_name``
+        made through this object."""
+        return self._global_version, self._versions[table_name]
+
+    def invalidate(self, table_name: Optional[str] = None) -> None:
+        """Marks ``table_name`` (or every table if ``None``) as modified
+        outside of :class:`Database` methods, e.g. by import."""
+        self._writes += 1
+        if table_name is None:
+            self._global_version += 1
+        else:
+            self._versions[table_name] += 1
+
+    def _read_token(
+        self, session: Session, table_name: Optional[str] = None
+    ) -> Tuple[Any, ...]:
+        """Returns token which changes when data read by the session may
+        change: data version of the table (or number of writes to any table)
+        and, for SQLite, ``PRAGMA data_version`` of the connection, which
+        notices commits of other connections."""
+        if table_name is None:
+            token: Tuple[Any, ...] = (self._global_version, self._writes)
+        else:
+            token = self.data_version(table_name)
+        if self._engine.dialect.name != "sqlite":
+            return token
+        dbapi_connection = session.connection().connection.dbapi_connection
+        data_version = session.execute(text("PRAGMA data_version")).scalar()
+        # data versions of different connections aren't comparable
+        return token + (id(dbapi_connection), data_version)
+
+    def _raw_cache_key(
+        self, session: Session, query: str, params: Dict[str, Any]
+    ) -> Optional[Hashable]:
+        if not self._cache.max_size or not _is_select(query):
+            return None
+        params_key = tuple(sorted(params.items()))
+        try:
+            hash(params_key)
+        except TypeError:
+            return None
+        return "raw", _normalize(query), params_key, self._read_token(session)
+
+    def raw_cache_key(
+        self, query: str, params: Optional[Dict[str, Any]] = None
+    ) -> Optional[Hashable]:
+        """Returns key of :attr:`cache` entry with result of ``query``
+        executed now, ``None`` if the result shouldn't be cached."""
+        with self._begin() as session:
+            return self._raw_cache_key(session, query, params or {})
+
+    def _schema_version(self) -> int:
+        if self._engine.dialect.name != "sqlite":
+            return 0
+        with self._begin() as session:
+            return int(session.execute(text("PRAGMA schema_version")).scalar())
+
+    def _is_rowid_key(self, table_name: str) -> bool:
+        # only SQLite tables are ordered by rowid
+        if self._engine.dialect.name != "sqlite":
+            return False
+        pk = list(self.get_table(table_name).primary_key.columns)
+        return not pk or len(pk) == 1 and isinstance(pk[0].type, INTEGER)
+
+    def _is_rowid_ordered(self, table_name: str) -> bool:
+        return table_name not in self._sorts and self._is_rowid_key(table_name)
+
+    def _rowid_token(
+        self, session: Session, table_name: str
+    ) -> Tuple[Any, ...]:
+        """Returns :meth:`~.Database._read_token` of the table extended by
+        schema version, as both writes and schema changes move rowids."""
+        token = self._read_token(session, table_name)
+        if self._engine.dialect.name != "sqlite":
+            return token
+        schema_version = session.execute(text("PRAGMA schema_version"))
+        return token + (schema_version.scalar(),)
+
+    def _rowid_index(self, table_name: str) -> "array[int]":
+        rowid = literal_column("rowid")
+        statement = (
+            select(rowid)
+            .select_from(self.get_table(table_name))
+            .order_by(*self._order_by(table_name))
+        )
+        with self._begin() as session:
+            rowids = self._cached_rowids(session, table_name)
+            if rowids is not None:
+                return rowids
+            token = self._rowid_token(session, table_name)
+            rowids = array("q", session.execute(statement).scalars())
+        self._rowids[table_name] = token, rowids
+        return rowids
+
+    def _changed(self, table_name: str, keep_index: bool = False) -> None:
+        """Bumps data version of the table. Cached rowid index is kept only
+        if ``keep_index`` is set, i.e. the caller has checked it by
+        :meth:`~.Database._cached_rowids` in the session of the write and
+        has already updated it."""
+        self.invalidate(table_name)
+        cached = self._rowids.get(table_name)
+        if cached and keep_index:
+            # PRAGMA data_version of the connection ignores its own commits
+            token = self.data_version(table_name) + cached[0][2:]
+            self._rowids[table_name] = token, cached[1]
+
+    def _keeps_keys(self, table_name: str, new_values: Dict[str, Any]) -> bool:
+        keys = {column.name for column in self.get_key_columns(table_name)}
+        sort = self._sorts.get(table_name)
+        if sort is not None:
+            keys.add(sort[0])
+        return not keys.intersection(new_values)
+
+    def _cached_rowids(
+        self, session: Session, table_name: str
+    ) -> Optional["array[int]"]:
+        cached = self._rowids.get(table_name)
+        if cached and cached[0] == self._rowid_token(session, table_name):
+            return cached[1]
+        return None
+
+    @_profiled
+    def get_rowid(self, table_name: str, position: int) -> int:
+        """Returns rowid of the row at ``position`` in the order used by
+        :meth:`~.Database.fetch_page`. Rowids are cached per table, the table
+        is scanned again only after writes which move rows,
+        :meth:`~.Database.invalidate` or commits of other connections.
+        """
+        return self._rowid_index(table_name)[position]
+
+    @_profiled
+    def get_rowids(
+        self, table_name: str, positions: Sequence[int]
+    ) -> List[int]:
+        """Same as :meth:`~.Database.get_rowid` for many positions."""
+        rowids = self._rowid_index(table_name)
+        return [rowids[position] for position in positions]
+
+    @_profiled
     def insert_row(self, table_name: str, row: Dict[str, Any]) -> None:
         table = self.get_table(table_name)
-        with self.session as session:
-            session.execute(table.insert().values(**row))
-            session.commit()
+        with self._begin() as session:
+            rowids = self._cached_rowids(session, table_name)
+            result = session.execute(table.insert().values(**row))
+        keep_index = False
+        if rowids is not None and self._is_rowid_ordered(table_name):
+            # explicit key may be lower than keys of existing rows
+            insort(rowids, result.lastrowid)
+            keep_index = True
+        self._changed(table_name, keep_index)
 
+    @_profiled
+    def insert_rows(
+        self, table_name: str, rows: Sequence[Dict[str, Any]]
+    ) -> None:
+        """Inserts many rows in a single transaction. Consecutive rows with
+        the same columns are inserted by one ``executemany``."""
+        table = self.get_table(table_name)
+        with self._begin() as session:
+            for _, batch in groupby(rows, key=_column_names):
+                session.execute(table.insert(), list(batch))
+        self._changed(table_name)
+
+    @_profiled
     def delete_row(self, table_name: str, pks: Dict[str, Any]) -> None:
         table = self.get_table(table_name)
-        with self.session as session:
+        with self._begin() as session:
             session.query(table).filter_by(**pks).delete()
-            session.commit()
+        self._changed(table_name)
 
+    @_profiled
     def select_rowid(self, table_name: str) -> Row:
         statement = text(f"rowid FROM {table_name} ORDER BY rowid ASC")
-        with self.session as session:
+        with self._begin() as session:
             return session.query(statement).all()
 
+    @_profiled
     def delete_row_through_rowid(self, table_name: str, rowid: int) -> None:
         table = self.get_table(table_name)
-        with self.session as session:
+        with self._begin() as session:
+            rowids = self._cached_rowids(session, table_name)
             session.query(table).where(text(f"rowid = {rowid}")).delete()
-            session.commit()
+        keep_index = False
+        if rowids is not None and rowid in rowids:
+            rowids.remove(rowid)
+            keep_index = True
+        self._changed(table_name, keep_index)
+
+    @_profiled
+    def delete_rows(self, table_name: str, keys: Collection[Key]) -> int:
+        """Deletes rows by their keys in a single transaction.
 
+        :param table_name: name of the table
+        :param keys: tuples of values of
+            :meth:`~.Database.get_key_columns` columns
+        :return: number of deleted rows
+        :raises ValueError: if table doesn't have any key.
+        """
+        key_columns = self.get_key_columns(table_name)
+        if not key_columns:
+            raise ValueError(f"Table '{table_name}' doesn't have any key.")
+        rowid_key = self._is_rowid_key(table_name)
+        with self._begin() as session:
+            rowids = None
+            if rowid_key:
+                rowids = self._cached_rowids(session, table_name)
+            deleted = self._delete_in(session, table_name, key_columns, keys)
+        if rowid_key:
+            self._forget_rowids(table_name, rowids, {key[0] for key in keys})
+        else:
+            self._changed(table_name)
+        return deleted
+
+    @_profiled
+    def delete_rows_through_rowid(
+        self, table_name: str, rowids: Collection[int]
+    ) -> int:
+        """Same as :meth:`~.Database.delete_rows` but rows are identified
+        by ``rowid``."""
+        keys = [(rowid,) for rowid in rowids]
+        with self._begin() as session:
+            cached = self._cached_rowids(session, table_name)
+            deleted = self._delete_in(
+                session, table_name, [literal_column("rowid")], keys
+            )
+        self._forget_rowids(table_name, cached, set(rowids))
+        return deleted
+
+    def _delete_in(
+        self,
+        session: Session,
+        table_name: str,
+        key_columns: List[ColumnElement],
+        keys: Collection[Key],
+    ) -> int:
+        table = self.get_table(table_name)
+        keys = list(keys)
+        chunk_size = max(1, _IN_CHUNK_SIZE // len(key_columns))
+        deleted = 0
+        for start in range(0, len(keys), chunk_size):
+            end = start + chunk_size
+            condition = _key_in(key_columns, keys[start:end])
+            result = session.execute(delete(table).where(condition))
+            deleted += result.rowcount
+        return deleted
+
+    def _forget_rowids(
+        self,
+        table_name: str,
+        rowids: Optional["array[int]"],
+        deleted: Collection[int],
+    ) -> None:
+        """Removes ``deleted`` from ``rowids`` checked by
+        :meth:`~.Database._cached_rowids` before the deletion."""
+        if rowids is not None:
+            kept = array("q", (r for r in rowids if r not in deleted))
+            self._rowids[table_name] = self._rowids[table_name][0], kept
+        self._changed(table_name, rowids is not None)
+
+    @_profiled
     def update_row(
         self, table_name: str, pks: Dict[str, Any], new_values: Dict[str, Any]
     ) -> None:
         table = self.get_table(table_name)
-        with self.session as session:
+        with self._begin() as session:
             session.query(table).filter_by(**pks).update(new_values)
-            session.commit()
+        self._changed(table_name, self._keeps_keys(table_name, new_values))
 
+    @_profiled
     def update_row_through_rowid(
         self, table_name: str, rowid: int, new_values: Dict[str, Any]
     ) -> None:
         table = self.get_table(table_name)
-        with self.session as session:
+        with self._begin() as session:
             session.query(table).where(text(f"rowid = {rowid}")).update(
                 new_values
             )
-            session.commit()
+        self._changed(table_name, self._keeps_keys(table_name, new_values))
 
+    @_profiled
+    def update_rows(
+        self, table_name: str, updates: Collection[RowUpdate]
+    ) -> None:
+        """Updates many rows in a single transaction. Rows which keys and
+        updated columns have the same names are updated by one
+        ``executemany``.
+
+        :param table_name: name of the table
+        :param updates: pairs of row key and new values, key may contain
+            ``rowid``
+        """
+        table = self.get_table(table_name)
+        groups: Dict[Tuple[Tuple[str, ...], Tuple[str, ...]], List[Any]] = {}
+        for key, values in updates:
+            names = tuple(key), tuple(values)
+            params = {
+                f"{_KEY_PARAM}{i}": value
+                for i, value in enumerate(key.values())
+            }
+            params.update(
+                (f"{_VALUE_PARAM}{i}", value)
+                for i, value in enumerate(values.values())
+            )
+            groups.setdefault(names, []).append(params)
+        with self._begin() as session:
+            for (key_names, value_names), batch in groups.items():
+                condition = and_(
+                    *(
+                        table.columns.get(name, literal_column(name))
+                        == bindparam(f"{_KEY_PARAM}{i}")
+                        for i, name in enumerate(key_names)
+                    )
+                )
+                statement = (
+                    update(table)
+                    .where(condition)
+                    .values(
+                        {
+                            name: bindparam(f"{_VALUE_PARAM}{i}")
+                            for i, name in enumerate(value_names)
+                        }
+                    )
+                )
+                session.execute(statement, batch)
+        keeps_keys = all(
+            self._keeps_keys(table_name, values) for _, values in updates
+        )
+        self._changed(table_name, keeps_keys)
+
+    @_profiled
     def execute_raw(
         self, query: str, **kwargs: Any
     ) -> Optional[Tuple[RMKeyView, List[Any]]]:
+        stats = QueryStats(query)
+        if self._instrumentation.capture_plans:
+            # the query is executed anyway, so it isn't analyzed
+            stats.plan = self.explain(query, kwargs, analyze=False)
+        start = perf_counter()
         statement = text(query)
-        with self.session as session:
-            data: Result = session.execute(statement, kwargs)
-            if data.returns_rows:
-                return data.keys(), data.all()
+        with self._begin() as session:
+            cache_key = self._raw_cache_key(session, query, kwargs)
+            cached = None
+            if cache_key is not None:
+                cached = self._cache.get(cache_key)
+            if cached is not None:
+                keys, rows = cached
+                stats.cached = True
             else:
-                session.commit()
+                data: Result = session.execute(statement, kwargs)
+                if not data.returns_rows:
+                    stats.rows_affected = data.rowcount
+                    stats.elapsed = perf_counter() - start
+                    self._instrumentation.record(stats)
+                    self.raw_executed(query)
+                    return None
+                keys, rows = data.keys(), data.all()
+        # e.g. UPDATE ... RETURNING modifies data and returns rows
+        self.raw_executed(query)
+        stats.elapsed = perf_counter() - start
+        stats.rows_returned = len(rows)
+        stats.bytes_fetched = estimate_size(rows)
+        if cache_key is not None and cached is None:
+            self._cache.put(cache_key, (keys, rows), stats.bytes_fetched)
+        self._instrumentation.record(stats)
+        return keys, list(rows)
+
+    @_profiled
+    def explain(
+        self,
+        query: str,
+        params: Optional[Dict[str, Any]] = None,
+        analyze: bool = True,
+    ) -> List[str]:
+        """Returns plan of the query: ``EXPLAIN QUERY PLAN`` in SQLite,
+        ``EXPLAIN (ANALYZE, BUFFERS)`` of ``SELECT`` queries and ``EXPLAIN``
+        of other statements in PostgreSQL. ``SELECT`` is really executed by
+        ``ANALYZE``, so it's done in a separate transaction which is rolled
+        back. If the query can't be explained, the error is returned.
+
+        :param query: explained statement
+        :param params: parameters of the statement
+        :param analyze: whether ``SELECT`` may be executed to measure the
+            plan in PostgreSQL, unset it when the query is executed anyway
+        """
+        dialect = self._engine.dialect.name
+        if dialect == "sqlite":
+            prefix = "EXPLAIN QUERY PLAN"
+            # SQLite keeps plans of cached statements after schema changes
+            query = f"{query}\n-- {self._schema_version()}"
+        elif dialect == "postgresql" and analyze and _is_select(query):
+            prefix = "EXPLAIN (ANALYZE, BUFFERS)"
+        else:
+            prefix = "EXPLAIN"
+        with self.session as session:
+            try:
+                statement = text(f"{prefix} {query}")
+                rows = session.execute(statement, params or {}).all()
+            except SQLAlchemyError as error:
+                return [f"Can't explain the query: {error}"]
+            finally:
+                session.rollback()
+        if dialect != "sqlite":
+            return [" | ".join(map(str, row)) for row in rows]
+        # rows are (id, parent id, unused, detail), children follow parents
+        depths = {0: -1}
+        lines = []
+        for node, parent, _, detail in rows:
+            depths[node] = depths.get(parent, -1) + 1
+            lines.append("  " * depths[node] + detail)
+        return lines
+
+    def raw_executed(self, query: str) -> None:
+        """Drops cached reflection or data versions which may be stale after
+        ``query`` was executed directly. Only plain ``SELECT`` is known not
+        to modify data, other statements may do so even if they return rows,
+        e.g. ``UPDATE ... RETURNING``."""
+        if _is_select(query):
+            return
+        if _is_ddl(query):
+            self.forget_tables()
+        else:
+            self.invalidate()
@@ -0,0 +1,81 @@
+from typing import Any, Dict, Tuple
+
+from dbeditor.database import Database, RowUpdate
+
+_KeyItems = Tuple[Tuple[str, Any], ...]
+
+
+def _items(key: Dict[str, Any]) -> _KeyItems:
+    return tuple(key.items())
+
+
+class EditBuffer:
+    """Collects cell edits and writes them to database at once.
+
+    Edits are merged per row, row is identified by the key it had in the
+    database before the first buffered edit, so key columns can be edited
+    too.
+    """
+
+    def __init__(self, database: Database, max_size: int = 1000) -> None:
+        """
+        :param database: database to write edits to
+        :param max_size: number of edited cells after which buffer should be
+            flushed
+        """
+        self._database = database
+        self._max_size = max_size
+        self._edits: Dict[str, Dict[_KeyItems, RowUpdate]] = {}
+        # current row key -> key of the row in database
+        self._aliases: Dict[str, Dict[_KeyItems, _KeyItems]] = {}
+
+    def __len__(self) -> int:
+        return sum(
+            len(values)
+            for edits in self._edits.values()
+            for _, values in edits.values()
+        )
+
+    def __contains__(self, table_name: str) -> bool:
+        return table_name in self._edits
+
+    @property
+    def database(self) -> Database:
+        return self._database
+
+    def add(
+        self, table_name: str, key: Dict[str, Any], values: Dict[str, Any]
+    ) -> bool:
+        """Buffers new values of the row.
+
+        :param table_name: name of the table
+        :param key: current key of the row (primary key values or rowid)
+        :param values: new values of the row
+        :return: ``True`` if buffer is full and should be flushed
+        """
+        edits = self._edits.setdefault(table_name, {})
+        aliases = self._aliases.setdefault(table_name, {})
+        current = _items(key)
+        original = aliases.pop(current, current)
+        if original in edits:
+            edits[original][1].update(values)
+        else:
+            edits[original] = dict(original), dict(values)
+        new_key = {name: values.get(name, value) for name, value in current}
+        if new_key != key:
+            aliases[_items(new_key)] = original
+        return len(self) >= self._max_size
+
+    def flush(self) -> None:
+        """Writes buffered edits in a single transaction. Buffer is cleared
+        even if writing fails."""
+        try:
+            with self._database.unit_of_work():
+                for table_name, edits in self._edits.items():
+                    self._database.update_rows(table_name, list(edits.values()))
+        finally:
+            self.clear()
+
+    def clear(self) -> None:
+        self._edits.clear()
+        self._aliases.clear()
@@ -0,0 +1,73 @@
+import asyncio
+from typing import Any, Callable, Coroutine, Optional, Set
+
+from PyQt5 import QtCore
+
+try:
+    import qasync
+except ImportError:  # pragma: no cover (qasync is optional)
+    qasync = None
+
+# the event loop keeps only weak references to tasks
+_tasks: Set["asyncio.Task[Any]"] = set()
+
+
+def create_event_loop(
+    app: QtCore.QCoreApplication,
+) -> asyncio.AbstractEventLoop:
+    """Creates asyncio event loop running in the Qt event loop of ``app``
+    and sets it as the current one.
+
+    :raises ImportError: if ``qasync`` isn't installed.
+    """
+    if qasync is None:
+        raise ImportError("qasync is required to run asyncio in Qt.")
+    loop: asyncio.AbstractEventLoop = qasync.QEventLoop(app)
+    asyncio.set_event_loop(loop)
+    return loop
+
+
+def run_app(
+    app: QtCore.QCoreApplication,
+    cleanup: Optional[Callable[[], Coroutine[Any, Any, Any]]] = None,
+) -> int:
+    """Runs the Qt event loop of ``app`` until it quits. If optional
+    dependency ``qasync`` is installed, asyncio event loop runs inside it,
+    so slots can :func:`schedule` coroutines.
+
+    :param cleanup: coroutine function awaited after the application quits,
+        e.g. to close asynchronous connections
+    :return: exit code of the application
+    """
+    if qasync is None:
+        return app.exec()
+    # unlike other loops, QEventLoop returns exit code of the application
+    loop: Any = create_event_loop(app)
+    try:
+        code: int = loop.run_forever()
+        if cleanup is not None:
+            loop.run_until_complete(cleanup())
+    finally:
+        loop.close()
+    return code
+
+
+def schedule(coroutine: Coroutine[Any, Any, Any]) -> bool:
+    """Runs the coroutine as a task of the running event loop. If no loop
+    is running, e.g. ``qasync`` isn't installed, the coroutine is closed
+    without running.
+
+    :return: whether the coroutine was scheduled
+    """
+    loop: Optional[asyncio.AbstractEventLoop]
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    if loop is None:
+        coroutine.close()
+        return False
+    task = loop.create_task(coroutine)
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return True
@@ -0,0 +1,72 @@
+from time import perf_counter
+from typing import Callable, ContextManager
+
+from PyQt5 import QtCore
+
+from dbeditor.database import Database
+from dbeditor.exporters import export_rows
+from dbeditor.exporters.abstract_exporter import AbstractExporter
+from dbeditor.raw_query import RawQuery
+
+ExporterOpener = Callable[[], ContextManager[AbstractExporter]]
+
+
+class ExportSignals(QtCore.QObject):
+    # rows written, rows per second
+    progress = QtCore.pyqtSignal(int, float)
+    finished = QtCore.pyqtSignal(int)
+    cancelled = QtCore.pyqtSignal()
+    failed = QtCore.pyqtSignal(str)
+
+
+class ExportWorker(QtCore.QRunnable):
+    """Exports result of a query in a background thread.
+
+    Rows are streamed from the database to the exporter by chunks, so
+    memory use doesn't depend on size of the result. Cancellation
+    interrupts the query, partially written output is left to the caller.
+    """
+
+    def __init__(
+        self,
+        database: Database,
+        query: str,
+        open_exporter: ExporterOpener,
+        chunk_size: int = 1000,
+    ) -> None:
+        """
+        :param database: database to execute the query in
+        :param query: SQL query returning rows
+        :param open_exporter: callable returning context manager with
+            exporter, it's called in the worker thread
+        :param chunk_size: number of rows fetched and written at once
+        """
+        super().__init__()
+        self.signals = ExportSignals()
+        self._query = RawQuery(database, query)
+        self._open_exporter = open_exporter
+        self._chunk_size = chunk_size
+
+    def cancel(self) -> None:
+        """Cancels the export, even if the query is still being executed."""
+        self._query.cancel()
+
+    def run(self) -> None:
+        rows = 0
+        try:
+            start = perf_counter()
+            with self._query as query, self._open_exporter() as exporter:
+                for rows in export_rows(query, exporter, self._chunk_size):
+                    rate = rows / max(perf_counter() - start, 1e-9)
+                    self.signals.progress.emit(rows, rate)
+        # exceptions can't leave the worker thread, so report any of them
+        except Exception as error:
+            if self._query.cancelled:
+                self.signals.cancelled.emit()
+            else:
+                self.signals.failed.emit(str(error))
+            return
+        if self._query.cancelled:
+            self.signals.cancelled.emit()
+        else:
+            self.signals.finished.emit(rows)
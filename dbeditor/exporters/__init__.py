@@ -0,0 +1,48 @@
+from typing import Iterator
+
+from dbeditor.database import Database
+from dbeditor.exporters.abstract_exporter import AbstractExporter
+from dbeditor.raw_query import RawQuery
+
+
+def table_query(database: Database, table_name: str) -> str:
+    """Returns query selecting all rows of the table."""
+    preparer = database.engine.dialect.identifier_preparer
+    return f"SELECT * FROM {preparer.quote(table_name)}"
+
+
+def export_rows(
+    query: RawQuery, exporter: AbstractExporter, chunk_size: int = 1000
+) -> Iterator[int]:
+    """Streams result of the executed query to the exporter by chunks of
+    ``chunk_size`` rows, yielding number of rows written so far after
+    every chunk.
+
+    :raises ValueError: if the statement doesn't return rows.
+    """
+    if not query.returns_rows:
+        raise ValueError("Statement doesn't return rows.")
+    exporter.write_header(query.columns)
+    written = 0
+    while rows := query.fetch(chunk_size):
+        exporter.write_rows(rows)
+        written += len(rows)
+        yield written
+
+
+def export_query(
+    database: Database,
+    query: str,
+    exporter: AbstractExporter,
+    chunk_size: int = 1000,
+) -> int:
+    """Exports result of the query, it's executed on a separate connection
+    and streamed with a server-side cursor where supported.
+
+    :return: number of exported rows
+    """
+    written = 0
+    with RawQuery(database, query) as raw_query, exporter:
+        for written in export_rows(raw_query, exporter, chunk_size):
+            pass
+    return written
@@ -0,0 +1,34 @@
+from abc import ABC, abstractmethod
+from types import TracebackType
+from typing import Any, Iterable, Optional, Sequence, Type
+
+
+class AbstractExporter(ABC):
+    """Writes rows one chunk at a time, so only the current chunk is kept
+    in memory. Output is finished by :meth:`close`."""
+
+    @abstractmethod
+    def write_header(
+        self, columns: Sequence[str]
+    ) -> None:  # pragma: no cover (abstract method)
+        pass
+
+    @abstractmethod
+    def write_rows(
+        self, rows: Iterable[Sequence[Any]]
+    ) -> None:  # pragma: no cover (abstract method)
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "AbstractExporter":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
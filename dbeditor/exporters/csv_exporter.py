@@ -0,0 +1,23 @@
+from csv import writer
+from typing import Any, Iterable, Sequence, TextIO
+
+from dbeditor.exporters.abstract_exporter import AbstractExporter
+
+
+class CSVExporter(AbstractExporter):
+    """Writes rows to a text file, ``NULL`` becomes an empty string. The
+    file isn't closed by the exporter."""
+
+    def __init__(self, fp: TextIO, *args: Any, **kwargs: Any) -> None:
+        """
+        :param fp: file opened with ``newline=""``
+        :param args: positional arguments of :func:`csv.writer`
+        :param kwargs: keyword arguments of :func:`csv.writer`
+        """
+        self._writer = writer(fp, *args, **kwargs)
+
+    def write_header(self, columns: Sequence[str]) -> None:
+        self._writer.writerow(columns)
+
+    def write_rows(self, rows: Iterable[Sequence[Any]]) -> None:
+        self._writer.writerows(rows)
@@ -0,0 +1,75 @@
+from datetime import date, time, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable, List, Sequence, Union
+
+from openpyxl import Workbook
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+from dbeditor.exporters.abstract_exporter import AbstractExporter
+
+FileOrFilename = Union[str, Path, BinaryIO]
+
+# types which openpyxl writes as is, ``datetime`` is a subclass of ``date``
+_NATIVE_TYPES = (bool, int, float, Decimal, date, time, timedelta)
+
+# Excel doesn't open rows of a worksheet after this limit
+MAX_ROWS = 1048576
+_MAX_TITLE_LENGTH = 31
+
+
+def _cell_value(value: Any) -> Any:
+    if value is None or isinstance(value, _NATIVE_TYPES):
+        return value
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).hex()
+    return ILLEGAL_CHARACTERS_RE.sub("", str(value))
+
+
+class XLSExporter(AbstractExporter):
+    """Writes rows to a worksheet of a new workbook in write-only mode,
+    which flushes rows to a temporary file instead of keeping them in
+    memory. Binary values are written as hex strings, values of other types
+    unknown to Excel as strings. When the worksheet reaches :data:`MAX_ROWS`
+    rows, the following rows are written to a new worksheet titled
+    ``"<worksheet> (2)"`` and so on, starting with the same header. The
+    workbook is saved by :meth:`close`.
+    """
+
+    def __init__(self, file: FileOrFilename, worksheet: str = "Sheet1") -> None:
+        self._file = file
+        self._workbook = Workbook(write_only=True)
+        self._title = worksheet
+        self._worksheet = self._workbook.create_sheet(worksheet)
+        self._sheets = 1
+        self._rows = 0
+        self._header: List[str] = []
+        self._saved = False
+
+    def write_header(self, columns: Sequence[str]) -> None:
+        self._header = list(columns)
+        self._append(self._header)
+
+    def write_rows(self, rows: Iterable[Sequence[Any]]) -> None:
+        for row in rows:
+            if self._rows >= MAX_ROWS:
+                self._next_worksheet()
+            self._append([_cell_value(value) for value in row])
+
+    def _append(self, row: List[Any]) -> None:
+        self._worksheet.append(row)
+        self._rows += 1
+
+    def _next_worksheet(self) -> None:
+        self._sheets += 1
+        suffix = f" ({self._sheets})"
+        title = self._title[: _MAX_TITLE_LENGTH - len(suffix)] + suffix
+        self._worksheet = self._workbook.create_sheet(title)
+        self._rows = 0
+        if self._header:
+            self._append(self._header)
+
+    def close(self) -> None:
+        if not self._saved:
+            self._saved = True
+            self._workbook.save(self._file)
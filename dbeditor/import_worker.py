@@ -0,0 +1,80 @@
+from threading import Event
+from time import perf_counter
+from typing import Callable, ContextManager
+
+from PyQt5 import QtCore
+from sqlalchemy.orm import Session
+
+from dbeditor.loaders.abstract_loader import AbstractLoader
+from dbeditor.loaders.merger import Merger
+
+LoaderOpener = Callable[[], ContextManager[AbstractLoader]]
+
+
+class ImportSignals(QtCore.QObject):
+    # rows processed, rows per second
+    progress = QtCore.pyqtSignal(int, float)
+    finished = QtCore.pyqtSignal(int)
+    cancelled = QtCore.pyqtSignal()
+    failed = QtCore.pyqtSignal(str)
+
+
+class ImportWorker(QtCore.QRunnable):
+    """Imports rows from a loader in a background thread.
+
+    The worker owns its session and merges the whole source in a single
+    transaction, which is rolled back if the import is cancelled.
+    """
+
+    def __init__(
+        self,
+        merger: Merger,
+        session_factory: Callable[[], Session],
+        open_loader: LoaderOpener,
+    ) -> None:
+        """
+        :param merger: merger of the target table
+        :param session_factory: callable returning a new session
+        :param open_loader: callable returning context manager with loader,
+            it's called in the worker thread
+        """
+        super().__init__()
+        self.signals = ImportSignals()
+        self._merger = merger
+        self._session_factory = session_factory
+        self._open_loader = open_loader
+        self._cancel = Event()
+
+    def cancel(self) -> None:
+        """Requests cancellation, it happens before the next batch."""
+        self._cancel.set()
+
+    def run(self) -> None:
+        try:
+            with self._open_loader() as loader:
+                with self._session_factory() as session:
+                    with self._merger.import_mode(session):
+                        rows = self._merge(session, loader)
+                        if self._cancel.is_set():
+                            session.rollback()
+                        else:
+                            session.commit()
+            if self._cancel.is_set():
+                self.signals.cancelled.emit()
+                return
+        # exceptions can't leave the worker thread, so report any of them
+        except Exception as error:
+            self.signals.failed.emit(str(error))
+            return
+        self.signals.finished.emit(rows)
+
+    def _merge(self, session: Session, loader: AbstractLoader) -> int:
+        rows = 0
+        start = perf_counter()
+        for batch in self._merger.batches(loader):
+            if self._cancel.is_set():
+                break
+            self._merger.merge_batch(session, batch)
+            rows += len(batch)
+            self.signals.progress.emit(rows, rows / (perf_counter() - start))
+        return rows
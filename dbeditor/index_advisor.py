@@ -0,0 +1,448 @@
+import re
+from dataclasses import dataclass, field
+from typing import (
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from sqlalchemy import distinct, func, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from dbeditor.database import Database
+from dbeditor.profiler import StatementProfile
+
+# operation of statements executed by the advisor, they aren't analyzed
+ADVISOR_OPERATION = "suggest_indexes"
+# fraction of rows matched by a range condition, as usually assumed by
+# query planners without statistics
+RANGE_SELECTIVITY = 1 / 3
+# number of rows from which distinct values of columns are counted, so the
+# advisor doesn't scan whole tables
+DISTINCT_SAMPLE = 10000
+
+_IDENTIFIER = r'"(?:[^"]|"")+"|`[^`]+`|\[[^\]]+\]|[A-Za-z_]\w*'
+_TOKENS = re.compile(
+    rf"(?P<qualifier>{_IDENTIFIER})\s*\.\s*(?P<name>{_IDENTIFIER})"
+    rf"|(?P<word>{_IDENTIFIER})"
+    r"|(?P<operator><=|>=|<>|!=|==|=|<|>)"
+    r"|'(?:[^']|'')*'"
+    r"|\S"
+)
+_EQUALITY = {"=", "==", "IN", "IS"}
+_RANGE = {"<", ">", "<=", ">=", "BETWEEN"}
+_TABLE_KEYWORDS = {"FROM", "JOIN", "UPDATE", "INTO"}
+_WRITES = {"INSERT", "UPDATE", "DELETE"}
+# ``SCAN t``, ``SEARCH TABLE t AS a USING ...`` in older SQLite versions,
+# names aren't quoted
+_PLAN_TABLE = re.compile(r"(SCAN|SEARCH) (?:TABLE )?(.*)")
+
+
+class _Token(NamedTuple):
+    # name of the table or alias of qualified column
+    qualifier: Optional[str]
+    # identifier, operator or any other text
+    value: str
+    is_reference: bool
+
+
+def _unquote(identifier: str) -> str:
+    if identifier[:1] == '"':
+        return identifier[1:-1].replace('""', '"')
+    if identifier[:1] in "`[":
+        return identifier[1:-1]
+    return identifier
+
+
+def _tokenize(statement: str) -> List[_Token]:
+    tokens = []
+    for match in _TOKENS.finditer(statement):
+        if match["name"] is not None:
+            tokens.append(
+                _Token(
+                    _unquote(match["qualifier"]), _unquote(match["name"]), True
+                )
+            )
+        elif match["word"] is not None:
+            tokens.append(_Token(None, _unquote(match["word"]), True))
+        else:
+            tokens.append(_Token(None, match[0], False))
+    return tokens
+
+
+def _keyword(token: _Token) -> str:
+    return token.value.upper() if token.qualifier is None else ""
+
+
+def _plan_tables(detail: str, aliases: Dict[str, str]) -> List[str]:
+    """Returns tables which names start ``detail`` of plan."""
+    detail = detail.replace(" AS ", " ")
+    return [
+        table
+        for name, table in aliases.items()
+        if detail == name or detail.startswith(name + " ")
+    ]
+
+
+def _comparison(tokens: Sequence[_Token], i: int) -> Optional[str]:
+    """Returns kind of comparison if ``i``-th token is its operator."""
+    keyword = _keyword(tokens[i])
+    following = _keyword(tokens[i + 1]) if i + 1 < len(tokens) else ""
+    if keyword == "IS" and following == "NOT":
+        return None
+    if keyword in _EQUALITY:
+        return "equal"
+    if keyword in _RANGE:
+        return "range"
+    return None
+
+
+@dataclass
+class _Usage:
+    """Columns of tables used by a statement, in order of appearance."""
+
+    equal: Dict[str, List[str]] = field(default_factory=dict)
+    # columns compared for equality with columns of other tables
+    joined: Dict[str, List[str]] = field(default_factory=dict)
+    ranges: Dict[str, List[str]] = field(default_factory=dict)
+    order: List[Tuple[str, str]] = field(default_factory=list)
+    limited: bool = False
+    # names and aliases of tables
+    aliases: Dict[str, str] = field(default_factory=dict)
+
+    def add(self, kind: str, table: str, column: str) -> None:
+        tables = {
+            "equal": self.equal,
+            "joined": self.joined,
+            "range": self.ranges,
+        }[kind]
+        columns = tables.setdefault(table, [])
+        if column not in columns:
+            columns.append(column)
+
+    def candidate(self, table: str) -> Tuple[Tuple[str, ...], bool]:
+        """Returns columns of index which would help the statement to read
+        rows of the table, and whether it helps only by ordering them."""
+        columns = self.equal_columns(table)
+        ranges = [c for c in self.ranges.get(table, []) if c not in columns]
+        columns += ranges[:1]
+        if not ranges and all(name == table for name, _ in self.order):
+            columns += [c for _, c in self.order if c not in columns]
+        ordering = not self.equal_columns(table) and table not in self.ranges
+        return tuple(columns), ordering
+
+    def equal_columns(self, table: str) -> List[str]:
+        # comparisons with constants are more selective than joins
+        columns = list(self.equal.get(table, []))
+        return columns + [
+            c for c in self.joined.get(table, []) if c not in columns
+        ]
+
+    def selectivity(self, table: str, distinct: Dict[str, int]) -> float:
+        """Returns estimated fraction of rows of the table read by the
+        statement through the index of :meth:`candidate`."""
+        fraction = 1.0
+        equal = self.equal_columns(table)
+        for column in equal:
+            fraction /= max(distinct.get(column, 1), 1)
+        if set(self.ranges.get(table, [])) - set(equal):
+            fraction *= RANGE_SELECTIVITY
+        if not equal and table not in self.ranges:
+            # rows are read by pages in the order of the index
+            fraction = 0.0
+        return fraction
+
+
+@dataclass
+class IndexSuggestion:
+    table: str
+    columns: Tuple[str, ...]
+    # templates of statements which would read the table through the index
+    statements: List[str] = field(default_factory=list)
+    executions: int = 0
+    # seconds spent in the statements
+    elapsed: float = 0.0
+    # estimated seconds the index would save
+    benefit: float = 0.0
+    # executions of statements writing to the table, which would have to
+    # update the index as well
+    writes: int = 0
+
+    @property
+    def name(self) -> str:
+        return "_".join(["ix", self.table, *self.columns])
+
+
+# table, columns of the index, statement and its usage of columns
+_Candidate = Tuple[str, Tuple[str, ...], StatementProfile, _Usage]
+
+
+class IndexAdvisor:
+    """Suggests indexes for statements recorded by :class:`Profiler`.
+
+    Comparisons and ``ORDER BY`` of every statement are parsed to find
+    columns an index of each table should start with: columns compared for
+    equality, then a column compared by range or columns of the order.
+    Tables which are already searched through an index, according to the
+    plan in SQLite or to existing indexes in any database, are skipped.
+    Benefit of the index is time of the statements multiplied by the
+    estimated fraction of rows it lets them skip; costs of updating the
+    index aren't estimated, but writes to the table are counted.
+    """
+
+    def __init__(self, database: Database) -> None:
+        self._database = database
+        self._tables = set(database.get_tables())
+        self._columns: Dict[str, Set[str]] = {}
+
+    def suggest(
+        self, profiles: Optional[Sequence[StatementProfile]] = None
+    ) -> List[IndexSuggestion]:
+        """Returns suggested indexes, the most beneficial first.
+
+        :param profiles: analyzed statements, statements recorded by the
+            profiler of the database by default
+        """
+        if profiles is None:
+            profiles = self._database.profiler.statements()
+        profiles = [p for p in profiles if p.operation != ADVISOR_OPERATION]
+        with self._database.profiler.operation(ADVISOR_OPERATION):
+            candidates = [
+                (table, columns, profile, usage)
+                for profile in profiles
+                for table, columns, usage in self._candidates(profile.template)
+            ]
+            suggestions = self._merge(candidates)
+            writes = self._writes(profiles)
+        for suggestion in suggestions:
+            suggestion.writes = writes.get(suggestion.table, 0)
+        return sorted(suggestions, key=lambda s: -s.benefit)
+
+    def _candidates(
+        self, template: str
+    ) -> Iterator[Tuple[str, Tuple[str, ...], _Usage]]:
+        words = template.split(None, 1)
+        if not words or words[0].upper() not in {
+            "SELECT",
+            "WITH",
+            "UPDATE",
+            "DELETE",
+        }:
+            return
+        usage = self.usage(template)
+        plan = self._plan(template, usage.aliases)
+        for table in dict.fromkeys(usage.aliases.values()):
+            columns, ordering = usage.candidate(table)
+            if not columns or ordering and not usage.limited:
+                continue
+            if plan is not None:
+                scanned, sorted_ = plan
+                if table not in scanned and not (ordering and sorted_):
+                    continue
+            if not self._covered(table, columns):
+                yield table, columns, usage
+
+    def _plan(
+        self, template: str, aliases: Dict[str, str]
+    ) -> Optional[Tuple[Set[str], bool]]:
+        """Returns tables fully scanned by the statement and whether its
+        rows are sorted, ``None`` if plan is unknown."""
+        if self._database.engine.dialect.name != "sqlite":
+            return None
+        statement = template.replace("(?, ...)", "(?)")
+        parameters = (None,) * statement.count("?")
+        try:
+            with self._database.engine.connect() as connection:
+                # SQLite keeps plans of cached statements after schema changes
+                version = connection.exec_driver_sql(
+                    "PRAGMA schema_version"
+                ).scalar()
+                rows = connection.exec_driver_sql(
+                    f"EXPLAIN QUERY PLAN {statement}\n-- {version}", parameters
+                ).all()
+        except SQLAlchemyError:
+            return None
+        scanned = set()
+        sorted_ = False
+        for row in rows:
+            detail = row[-1]
+            match = _PLAN_TABLE.match(detail)
+            # automatic index is built by SQLite for a single statement
+            if match is not None and (
+                match[1] == "SCAN"
+                and " USING " not in detail
+                or "AUTOMATIC" in detail
+            ):
+                scanned.update(_plan_tables(match[2], aliases))
+            sorted_ = sorted_ or "TEMP B-TREE FOR" in detail
+        return scanned, sorted_
+
+    def _covered(self, table: str, columns: Tuple[str, ...]) -> bool:
+        wanted = list(columns)
+        return any(
+            names[: len(wanted)] == wanted or wanted[: len(names)] == names
+            for names, _ in self._database.get_index_columns(table)
+        )
+
+    def _merge(self, candidates: List[_Candidate]) -> List[IndexSuggestion]:
+        # index of more columns serves statements using its prefix too
+        candidates = sorted(candidates, key=lambda c: -len(c[1]))
+        counts = self._distinct(candidates)
+        suggestions: List[IndexSuggestion] = []
+        for table, columns, profile, usage in candidates:
+            suggestion = next(
+                (
+                    s
+                    for s in suggestions
+                    if s.table == table and s.columns[: len(columns)] == columns
+                ),
+                None,
+            )
+            if suggestion is None:
+                suggestion = IndexSuggestion(table, columns)
+                suggestions.append(suggestion)
+            fraction = usage.selectivity(table, counts.get(table, {}))
+            suggestion.statements.append(profile.template)
+            suggestion.executions += profile.count
+            suggestion.elapsed += profile.total
+            suggestion.benefit += profile.total * (1 - fraction)
+        return suggestions
+
+    def _distinct(
+        self, candidates: List[_Candidate]
+    ) -> Dict[str, Dict[str, int]]:
+        """Returns numbers of distinct values of columns compared for
+        equality among the first :data:`DISTINCT_SAMPLE` rows of the table.
+        The sample may have fewer values than the table, which matters
+        little, as selectivity of columns with many values stays close to
+        zero anyway."""
+        columns: Dict[str, Set[str]] = {}
+        for table, _, _, usage in candidates:
+            columns.setdefault(table, set()).update(usage.equal_columns(table))
+        counts: Dict[str, Dict[str, int]] = {}
+        with self._database.engine.connect() as connection:
+            for table, names in columns.items():
+                if not names:
+                    continue
+                reflected = self._database.get_table(table)
+                ordered = sorted(names)
+                sample = (
+                    select(*(reflected.c[n] for n in ordered))
+                    .limit(DISTINCT_SAMPLE)
+                    .subquery()
+                )
+                statement = select(
+                    *(func.count(distinct(sample.c[n])) for n in ordered)
+                )
+                row = connection.execute(statement).one()
+                counts[table] = dict(zip(ordered, row))
+        return counts
+
+    def _writes(self, profiles: Sequence[StatementProfile]) -> Dict[str, int]:
+        writes: Dict[str, int] = {}
+        for profile in profiles:
+            words = profile.template.split(None, 1)
+            if not words or words[0].upper() not in _WRITES:
+                continue
+            tables = list(self.tables(_tokenize(profile.template)).values())
+            if tables:
+                writes[tables[0]] = writes.get(tables[0], 0) + profile.count
+        return writes
+
+    def columns(self, table: str) -> Set[str]:
+        if table not in self._columns:
+            names = self._database.get_table_column_names(table)
+            self._columns[table] = set(names)
+        return self._columns[table]
+
+    def tables(self, tokens: Sequence[_Token]) -> Dict[str, str]:
+        """Returns tables of the statement by their names and aliases."""
+        aliases = {}
+        for i, token in enumerate(tokens[:-1]):
+            table = tokens[i + 1]
+            if _keyword(token) not in _TABLE_KEYWORDS or not table.is_reference:
+                continue
+            if table.value not in self._tables:
+                continue
+            aliases[table.value] = table.value
+            alias = tokens[i + 2] if i + 2 < len(tokens) else table
+            if _keyword(alias) == "AS" and i + 3 < len(tokens):
+                alias = tokens[i + 3]
+            if alias.is_reference and alias.qualifier is None:
+                aliases[alias.value] = table.value
+        return aliases
+
+    def resolve(
+        self, token: _Token, aliases: Dict[str, str]
+    ) -> Optional[Tuple[str, str]]:
+        """Returns table and column referenced by the token."""
+        if not token.is_reference:
+            return None
+        if token.qualifier is not None:
+            table = aliases.get(token.qualifier)
+            if table is None or token.value not in self.columns(table):
+                return None
+            return table, token.value
+        tables = {
+            table
+            for table in aliases.values()
+            if token.value in self.columns(table)
+        }
+        return (tables.pop(), token.value) if len(tables) == 1 else None
+
+    def usage(self, statement: str) -> _Usage:
+        tokens = _tokenize(statement)
+        usage = _Usage(aliases=self.tables(tokens))
+        for i, token in enumerate(tokens):
+            kind = _comparison(tokens, i)
+            if kind is None:
+                continue
+            sides = [tokens[i - 1]] if i else []
+            if kind == "equal" and i + 1 < len(tokens):
+                sides.append(tokens[i + 1])
+            resolved = [self.resolve(side, usage.aliases) for side in sides]
+            columns = [column for column in resolved if column is not None]
+            if len(columns) == 2:
+                kind = "joined"
+            for table, column in columns:
+                usage.add(kind, table, column)
+        usage.order = self._order(tokens, usage.aliases)
+        usage.limited = any(_keyword(token) == "LIMIT" for token in tokens)
+        return usage
+
+    def _order(
+        self, tokens: Sequence[_Token], aliases: Dict[str, str]
+    ) -> List[Tuple[str, str]]:
+        keywords = [_keyword(token) for token in tokens]
+        starts = [
+            i + 2
+            for i in range(len(tokens) - 1)
+            if keywords[i] == "ORDER" and keywords[i + 1] == "BY"
+        ]
+        if not starts:
+            return []
+        order = []
+        i = starts[-1]
+        while i < len(tokens):
+            resolved = self.resolve(tokens[i], aliases)
+            if resolved is None:
+                break
+            order.append(resolved)
+            i += 1
+            while i < len(tokens) and keywords[i] in {
+                "ASC",
+                "DESC",
+                "NULLS",
+                "FIRST",
+                "LAST",
+            }:
+                i += 1
+            if i == len(tokens) or tokens[i].value != ",":
+                break
+            i += 1
+        return order
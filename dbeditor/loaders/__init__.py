@@ -2,11 +2,12 @@ from sqlalchemy import Table
 from sqlalchemy.orm import Session
 
 from dbeditor.loaders.abstract_loader import AbstractLoader
+from dbeditor.loaders.coercion import Coercer
 from dbeditor.loaders.merger import Merger
 
 
 def import_to_table(
     table: Table, session: Session, loader: AbstractLoader
 ) -> None:
-    merger = Merger(table)
+    merger = Merger(table, coercer=Coercer(table))
     merger.merge(session, loader)
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Iterator
+from itertools import islice
+from typing import Any, Dict, Iterator, List
 
 Row = Dict[str, Any]
 
@@ -11,3 +12,10 @@ class AbstractLoader(ABC, Iterator[Row]):
 
     def __next__(self) -> Row:
         return self.load_next()
+
+    def batches(self, size: int) -> Iterator[List[Row]]:
+        """Splits remaining rows into lists of at most ``size`` rows.
+        Loaders which read data by chunks override it to avoid collecting
+        batches row by row."""
+        while batch := list(islice(self, size)):
+            yield batch
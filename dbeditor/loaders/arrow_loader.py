@@ -0,0 +1,100 @@
+from itertools import islice
+from pathlib import Path
+from typing import Any, Collection, Iterator, List, Optional, Union
+
+from dbeditor.loaders.abstract_loader import AbstractLoader, Row
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover (pyarrow is optional)
+    pyarrow = None
+
+Filename = Union[str, Path]
+
+PARQUET_SUFFIXES = {".parquet", ".pq"}
+
+
+def _rows(batch: Any, names: List[str]) -> List[Row]:
+    # columns are converted at once, which is much faster than by rows
+    columns = [batch.column(name).to_pylist() for name in names]
+    return [dict(zip(names, values)) for values in zip(*columns)]
+
+
+class ArrowLoader(AbstractLoader):
+    """Loads rows of a Parquet or Arrow IPC (Feather v2) file by record
+    batches, files with suffixes from :data:`PARQUET_SUFFIXES` are read as
+    Parquet. Values keep their native types: integers, floats, decimals,
+    timestamps etc. Only ``columns`` are read from Parquet files.
+
+    Requires optional dependency ``pyarrow``.
+    """
+
+    def __init__(
+        self,
+        file: Filename,
+        columns: Optional[Collection[str]] = None,
+        batch_size: int = 1024,
+    ) -> None:
+        """
+        :param file: path of the file
+        :param columns: names of columns to load, columns which are not in
+            the file are ignored, all columns are loaded if it's ``None``
+        :param batch_size: maximum number of rows read from the file at
+            once
+        :raises ImportError: if ``pyarrow`` isn't installed.
+        """
+        if pyarrow is None:
+            raise ImportError(
+                "pyarrow is required to load Parquet and Arrow files."
+            )
+        self._batch_size = batch_size
+        self._file = pyarrow.memory_map(str(file))
+        try:
+            if Path(file).suffix.lower() in PARQUET_SUFFIXES:
+                self._source = pyarrow.parquet.ParquetFile(self._file)
+                schema = self._source.schema_arrow
+            else:
+                self._source = pyarrow.ipc.open_file(self._file)
+                schema = self._source.schema
+        except BaseException:
+            self.close()
+            raise
+        self.names = [
+            name for name in schema.names if columns is None or name in columns
+        ]
+        self._record_batches = self._read()
+        self._rows: Iterator[Row] = iter(())
+
+    def _read(self) -> Iterator[Any]:
+        if isinstance(self._source, pyarrow.parquet.ParquetFile):
+            yield from self._source.iter_batches(
+                self._batch_size, columns=self.names
+            )
+            return
+        for i in range(self._source.num_record_batches):
+            batch = self._source.get_batch(i)
+            # IPC batches are as large as they were written, so they are split
+            for start in range(0, batch.num_rows, self._batch_size):
+                yield batch.slice(start, self._batch_size)
+
+    def batches(self, size: int) -> Iterator[List[Row]]:
+        """Converts record batches to lists of at most ``size`` rows without
+        loading them one by one. Rows left in the batch partially consumed
+        by :meth:`load_next` come first."""
+        while rest := list(islice(self._rows, size)):
+            yield rest
+        for batch in self._record_batches:
+            for start in range(0, batch.num_rows, size):
+                yield _rows(batch.slice(start, size), self.names)
+
+    def load_next(self) -> Row:
+        while True:
+            row = next(self._rows, None)
+            if row is not None:
+                return row
+            self._rows = iter(_rows(next(self._record_batches), self.names))
+
+    def close(self) -> None:
+        self._file.close()
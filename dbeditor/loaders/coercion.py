@@ -0,0 +1,183 @@
+from datetime import date, datetime, time
+from decimal import Decimal, InvalidOperation
+from enum import Enum
+from typing import Any, Callable, Collection, Dict, List, Optional, Tuple
+
+from sqlalchemy import Table
+from sqlalchemy.types import TypeEngine
+
+from dbeditor.loaders.abstract_loader import Row
+
+Converter = Callable[[Any], Any]
+
+_TRUE = {"1", "true", "t", "yes", "y"}
+_FALSE = {"0", "false", "f", "no", "n"}
+
+
+class ErrorPolicy(Enum):
+    RAISE = "raise"
+    NULL = "null"
+    SKIP = "skip"
+
+
+class CoercionError(ValueError):
+    pass
+
+
+def _to_int(value: Any) -> int:
+    if isinstance(value, str):
+        value = value.strip()
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError(f"{value!r} is not integral")
+    return int(value)
+
+
+def _to_float(value: Any) -> float:
+    return float(value)
+
+
+def _to_decimal(value: Any) -> Decimal:
+    try:
+        return Decimal(str(value).strip())
+    except InvalidOperation as error:
+        raise ValueError(f"{value!r} is not a number") from error
+
+
+def _to_bool(value: Any) -> bool:
+    if isinstance(value, (bool, int, float)):
+        return bool(value)
+    text = str(value).strip().lower()
+    if text in _TRUE:
+        return True
+    if text in _FALSE:
+        return False
+    raise ValueError(f"{value!r} is not a boolean")
+
+
+def _to_date(value: Any) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value).strip())
+
+
+def _to_datetime(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    return datetime.fromisoformat(str(value).strip())
+
+
+def _to_time(value: Any) -> time:
+    if isinstance(value, datetime):
+        return value.time()
+    if isinstance(value, time):
+        return value
+    return time.fromisoformat(str(value).strip())
+
+
+def _to_str(value: Any) -> str:
+    return value if isinstance(value, str) else str(value)
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+_CONVERTERS: Dict[type, Converter] = {
+    bool: _to_bool,
+    int: _to_int,
+    float: _to_float,
+    Decimal: _to_decimal,
+    datetime: _to_datetime,
+    date: _to_date,
+    time: _to_time,
+    str: _to_str,
+}
+
+
+def get_converter(type_: TypeEngine) -> Converter:
+    """Returns converter to Python type of the SQL type, values of unknown
+    types are left as is."""
+    try:
+        python_type = type_.python_type
+    except NotImplementedError:
+        return _identity
+    return _CONVERTERS.get(python_type, _identity)
+
+
+class Coercer:
+    """Converts loaded values to Python types of the table columns.
+
+    Converters are chosen once per column. Values equal to one of
+    ``null_tokens`` become ``None``; empty strings always become ``None``
+    unless the column is textual. Columns which are not in the table are
+    left untouched.
+    """
+
+    def __init__(
+        self,
+        table: Table,
+        null_tokens: Collection[str] = (),
+        errors: ErrorPolicy = ErrorPolicy.RAISE,
+    ) -> None:
+        """
+        :param table: target table
+        :param null_tokens: strings which mean ``NULL``
+        :param errors: what to do with a value which can't be converted:
+            raise :class:`CoercionError`, replace it with ``None`` or skip
+            the whole row
+        """
+        self._converters = {
+            column.name: get_converter(column.type) for column in table.columns
+        }
+        self._null_tokens = set(null_tokens)
+        self._errors = errors
+        self._plans: Dict[Tuple[str, ...], List[Tuple[str, Converter]]] = {}
+
+    def _plan(self, names: Tuple[str, ...]) -> List[Tuple[str, Converter]]:
+        plan = self._plans.get(names)
+        if plan is None:
+            plan = [
+                (name, self._converters.get(name, _identity)) for name in names
+            ]
+            self._plans[names] = plan
+        return plan
+
+    def _convert(self, name: str, converter: Converter, value: Any) -> Any:
+        if value is None:
+            return None
+        if isinstance(value, str) and (
+            value in self._null_tokens or not value and converter is not _to_str
+        ):
+            return None
+        return converter(value)
+
+    def coerce_row(self, row: Row) -> Optional[Row]:
+        """Returns converted row or ``None`` if the row should be skipped.
+
+        :raises CoercionError: if value can't be converted and error policy
+            is :attr:`ErrorPolicy.RAISE`.
+        """
+        result = {}
+        for name, converter in self._plan(tuple(row)):
+            value = row[name]
+            try:
+                result[name] = self._convert(name, converter, value)
+            except (ValueError, TypeError) as error:
+                if self._errors == ErrorPolicy.SKIP:
+                    return None
+                if self._errors == ErrorPolicy.RAISE:
+                    raise CoercionError(
+                        f"Column '{name}': can't convert {value!r}: {error}"
+                    ) from error
+                result[name] = None
+        return result
+
+    def coerce(self, batch: List[Row]) -> List[Row]:
+        """Converts the batch, skipped rows are omitted."""
+        coerced = map(self.coerce_row, batch)
+        return [row for row in coerced if row is not None]
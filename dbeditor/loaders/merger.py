@@ -1,21 +1,96 @@
-from typing import List
+from contextlib import nullcontext
+from typing import ContextManager, Iterator, List, Optional
 
 from sqlalchemy import Table
 from sqlalchemy.orm import Session
 
 from dbeditor.loaders.abstract_loader import AbstractLoader, Row
+from dbeditor.loaders.coercion import Coercer
+from dbeditor.loaders.pg_copy import can_copy, copy_rows, copy_supported
+from dbeditor.loaders.sqlite_tuning import sqlite_fast_import
 
 Batch = List[Row]
 
 
 class Merger:
-    def __init__(self, table: Table, batch_size: int = 1024) -> None:
+    def __init__(
+        self,
+        table: Table,
+        batch_size: int = 1024,
+        commit_each_batch: bool = False,
+        coercer: Optional[Coercer] = None,
+        fast_import: bool = False,
+        rebuild_indexes: bool = False,
+        use_copy: bool = False,
+    ) -> None:
+        """
+        :param table: target table
+        :param batch_size: number of rows sent in a single ``executemany``
+        :param commit_each_batch: commit after every batch instead of once
+            after the whole import
+        :param coercer: converter of loaded values to column types, values
+            are passed to database as is if it's ``None``
+        :param fast_import: tune SQLite connection for bulk insert during
+            the import, ignored for other databases; the tuning lasts until
+            the first commit, so it can't be combined with
+            ``commit_each_batch``
+        :param rebuild_indexes: drop secondary indexes of SQLite table before
+            the import and create them after it, requires ``fast_import``
+        :param use_copy: send every batch to PostgreSQL with a single
+            ``COPY ... FROM STDIN``, batches are inserted as usual if the
+            driver doesn't support it or the batch can't be copied (see
+            :func:`~dbeditor.loaders.pg_copy.can_copy`)
+        :raises ValueError: if ``batch_size`` is not positive or both
+            ``fast_import`` and ``commit_each_batch`` are set.
+        """
+        if batch_size < 1:
+            raise ValueError("Batch size must be positive.")
+        if fast_import and commit_each_batch:
+            raise ValueError("Fast import can't commit after every batch.")
         self._table = table
         self._batch_size = batch_size
+        self._commit_each_batch = commit_each_batch
+        self._coercer = coercer
+        self._fast_import = fast_import
+        self._rebuild_indexes = rebuild_indexes
+        self._use_copy = use_copy
+
+    @property
+    def batch_size(self) -> int:
+        return self._batch_size
+
+    def batches(self, loader: AbstractLoader) -> Iterator[Batch]:
+        """Splits rows of ``loader`` into lists of at most ``batch_size``."""
+        return loader.batches(self._batch_size)
+
+    def import_mode(self, session: Session) -> ContextManager[None]:
+        """Returns context of the whole import transaction, the block has to
+        commit or roll back it."""
+        if self._fast_import and session.get_bind().dialect.name == "sqlite":
+            return sqlite_fast_import(
+                session, self._table, self._rebuild_indexes
+            )
+        return nullcontext()
+
+    def merge_batch(self, session: Session, batch: Batch) -> None:
+        """Inserts ``batch`` with a single ``COPY`` or ``executemany``."""
+        if self._coercer is not None:
+            batch = self._coercer.coerce(batch)
+        if not batch:
+            return
+        if (
+            self._use_copy
+            and copy_supported(session)
+            and can_copy(self._table, batch)
+        ):
+            copy_rows(session, self._table, batch)
+        else:
+            session.execute(self._table.insert(), batch)
 
     def merge(self, session: Session, loader: AbstractLoader) -> None:
-        # TODO: add batching
-        ins = self._table.insert()
-        for row in loader:
-            session.execute(ins.values(**row))
-        session.commit()
+        with self.import_mode(session):
+            for batch in self.batches(loader):
+                self.merge_batch(session, batch)
+                if self._commit_each_batch:
+                    session.commit()
+            session.commit()
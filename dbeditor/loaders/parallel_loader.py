@@ -0,0 +1,287 @@
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
+from itertools import islice
+from multiprocessing import get_context
+from queue import Empty
+from types import TracebackType
+from typing import (
+    Any,
+    ContextManager,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+)
+
+from openpyxl import load_workbook
+
+from dbeditor.loaders.abstract_loader import AbstractLoader, Row
+from dbeditor.loaders.coercion import Coercer
+from dbeditor.loaders.csv_loader import CSVLoader
+from dbeditor.loaders.xls_loader import XLSLoader
+
+# seconds to wait for a batch before checking whether parsers are alive
+_POLL_INTERVAL = 0.5
+# error of sources which parsers were stopped after failure of another one
+STOPPED = "Stopped after failure of another source"
+
+
+class Source(ABC):
+    """Picklable description of rows parsed in a separate process."""
+
+    @property
+    @abstractmethod
+    def name(self) -> str:  # pragma: no cover (abstract method)
+        pass
+
+    @abstractmethod
+    def open(
+        self,
+    ) -> ContextManager[AbstractLoader]:  # pragma: no cover (abstract method)
+        pass
+
+
+@dataclass(frozen=True)
+class CSVSource(Source):
+    path: str
+
+    @property
+    def name(self) -> str:
+        return self.path
+
+    @contextmanager
+    def open(self) -> Iterator[AbstractLoader]:
+        with open(self.path, newline="") as file:
+            yield CSVLoader(file)
+
+
+@dataclass(frozen=True)
+class WorksheetSource(Source):
+    path: str
+    worksheet: str
+
+    @property
+    def name(self) -> str:
+        return f"{self.path} [{self.worksheet}]"
+
+    def open(self) -> ContextManager[AbstractLoader]:
+        return closing(XLSLoader(self.path, self.worksheet))
+
+
+def worksheet_sources(path: str) -> List[WorksheetSource]:
+    """Returns sources of every worksheet of the workbook."""
+    workbook = load_workbook(path, read_only=True)
+    try:
+        return [WorksheetSource(path, name) for name in workbook.sheetnames]
+    finally:
+        workbook.close()
+
+
+@dataclass
+class SourceResult:
+    name: str
+    rows: int = 0
+    error: Optional[str] = None
+
+
+class PipelineError(Exception):
+    """Raised when some of the sources failed, ``results`` are in the order
+    of sources."""
+
+    def __init__(self, results: Sequence[SourceResult]) -> None:
+        self.results = list(results)
+        super().__init__(
+            "\n".join(
+                f"{result.name}: {result.error}"
+                for result in self.results
+                if result.error is not None
+            )
+        )
+
+
+# message from parser: index of source, batch or ``None`` when the source is
+# finished, error of the source
+_Message = Tuple[int, Optional[List[Row]], Optional[str]]
+
+
+def _parse(
+    index: int,
+    source: Source,
+    coercer: Optional[Coercer],
+    batch_size: int,
+    queue: Any,
+    stop: Any,
+) -> None:
+    try:
+        with source.open() as loader:
+            for batch in loader.batches(batch_size):
+                if stop.is_set():
+                    queue.put((index, None, STOPPED))
+                    return
+                if coercer is not None:
+                    batch = coercer.coerce(batch)
+                queue.put((index, batch, None))
+    # the error is reported to the writer instead of the pool
+    except Exception as error:
+        queue.put((index, None, f"{type(error).__name__}: {error}"))
+        return
+    queue.put((index, None, None))
+
+
+class ParallelLoader(AbstractLoader):
+    """Loads rows of many sources parsed and coerced in a process pool.
+
+    Parsers send batches through a bounded queue, so they wait while the
+    consumer (a single writer, e.g. :class:`Merger`) is busy. Rows of
+    different sources are interleaved. After the first failure rows are no
+    longer passed to the consumer and the other parsers are stopped, their
+    sources are reported with :data:`STOPPED` error unless they were
+    already finished. When every source is finished, :class:`PipelineError`
+    is raised instead of :class:`StopIteration` if any of them failed. The
+    loader must be used as a context manager.
+    """
+
+    def __init__(
+        self,
+        sources: Sequence[Source],
+        coercer: Optional[Coercer] = None,
+        batch_size: int = 1024,
+        workers: Optional[int] = None,
+        queue_size: int = 8,
+        stop_on_failure: bool = True,
+    ) -> None:
+        """
+        :param sources: sources of rows
+        :param coercer: converter applied to rows in the parsers
+        :param batch_size: number of rows sent to the consumer at once
+        :param workers: number of parser processes, number of CPUs by
+            default
+        :param queue_size: number of batches which can wait for the consumer
+        :param stop_on_failure: whether parsers are stopped after the first
+            failure; if unset, every source is parsed to the end, so
+            :attr:`results` report rows and error of each source regardless
+            of timing, at the cost of parsing rows which aren't loaded
+        """
+        self._sources = list(sources)
+        self._coercer = coercer
+        self._batch_size = batch_size
+        self._workers = workers
+        self._queue_size = queue_size
+        self._stop_on_failure = stop_on_failure
+        self.results = [SourceResult(source.name) for source in self._sources]
+        self._finished: Set[int] = set()
+        self._batch: Iterator[Row] = iter(())
+        self._futures: List[Future[None]] = []
+
+    def __enter__(self) -> "ParallelLoader":
+        # forking a multithreaded process (e.g. from a Qt thread pool) isn't
+        # safe
+        context = get_context("spawn")
+        self._manager = context.Manager()
+        self._queue = self._manager.Queue(self._queue_size)
+        self._stop = self._manager.Event()
+        self._executor = ProcessPoolExecutor(self._workers, mp_context=context)
+        self._futures = [
+            self._executor.submit(
+                _parse,
+                index,
+                source,
+                self._coercer,
+                self._batch_size,
+                self._queue,
+                self._stop,
+            )
+            for index, source in enumerate(self._sources)
+        ]
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self._stop.set()
+        # unblock parsers waiting for a free slot in the queue
+        while len(self._finished) < len(self._sources):
+            self._receive()
+        self._executor.shutdown()
+        self._manager.shutdown()
+
+    @property
+    def failed(self) -> bool:
+        return any(result.error is not None for result in self.results)
+
+    def _receive(self) -> Optional[Tuple[int, List[Row]]]:
+        try:
+            message: _Message = self._queue.get(timeout=_POLL_INTERVAL)
+        except Empty:
+            self._check_parsers()
+            return None
+        index, batch, error = message
+        if batch is not None:
+            return index, batch
+        self._finish(index, error)
+        return None
+
+    def _finish(self, index: int, error: Optional[str]) -> None:
+        if index in self._finished:
+            return
+        self._finished.add(index)
+        self.results[index].error = error
+        if error is not None and self._stop_on_failure:
+            self._stop.set()
+
+    def _check_parsers(self) -> None:
+        # a parser process which died never reports its source finished
+        for index, future in enumerate(self._futures):
+            if future.done() and future.exception() is not None:
+                self._finish(index, str(future.exception()))
+
+    def _next_batch(self) -> Optional[List[Row]]:
+        """Returns the next batch of rows, ``None`` if every source is
+        finished. Batches received after a failure are only counted.
+
+        :raises PipelineError: if every source is finished and some of them
+            failed.
+        """
+        while len(self._finished) < len(self._sources):
+            received = self._receive()
+            if received is None:
+                continue
+            index, batch = received
+            self.results[index].rows += len(batch)
+            if not self.failed:
+                return batch
+        if self.failed:
+            raise PipelineError(self.results)
+        return None
+
+    def batches(self, size: int) -> Iterator[List[Row]]:
+        """Passes batches received from parsers without collecting them row
+        by row, batches larger than ``size`` are split. Rows left in the
+        batch partially consumed by :meth:`load_next` come first."""
+        while rest := list(islice(self._batch, size)):
+            yield rest
+        while (batch := self._next_batch()) is not None:
+            if len(batch) <= size:
+                yield batch
+                continue
+            for start in range(0, len(batch), size):
+                end = start + size
+                yield batch[start:end]
+
+    def load_next(self) -> Row:
+        while True:
+            row = next(self._batch, None)
+            if row is not None:
+                return row
+            batch = self._next_batch()
+            if batch is None:
+                raise StopIteration
+            self._batch = iter(batch)
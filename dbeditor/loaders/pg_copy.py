@@ -0,0 +1,128 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Any, Iterator, List, Sequence
+from uuid import UUID
+
+from sqlalchemy import Table
+from sqlalchemy.orm import Session
+
+from dbeditor.loaders.abstract_loader import Row
+
+# characters sent to the server in a single COPY data message
+COPY_BUFFER_SIZE = 64 * 1024
+# types of values which are written in the format PostgreSQL accepts
+_SCALAR_TYPES = (
+    str,
+    int,
+    float,
+    Decimal,
+    UUID,
+    bytes,
+    bytearray,
+    memoryview,
+    date,
+    time,
+    timedelta,
+)
+
+
+def _format_value(value: Any) -> str:
+    # unquoted empty field is NULL in CSV format, anything else is quoted so
+    # empty strings survive
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        text = "true" if value else "false"
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        text = "\\x" + bytes(value).hex()
+    elif isinstance(value, (date, datetime, time)):
+        text = value.isoformat()
+    else:
+        text = str(value)
+    return '"' + text.replace('"', '""') + '"'
+
+
+def format_row(row: Row, columns: Sequence[str]) -> str:
+    """Returns line of ``COPY ... (FORMAT csv)`` data with ``columns`` of
+    the row, missing values are ``NULL``."""
+    return ",".join(_format_value(row.get(name)) for name in columns) + "\n"
+
+
+class CopyStream:
+    """File-like object which serializes rows for ``COPY ... FROM STDIN``
+    lazily, so only one buffer of data is kept in memory."""
+
+    def __init__(self, rows: Iterator[Row], columns: Sequence[str]) -> None:
+        self._rows = rows
+        self._columns = columns
+        self._pending = ""
+
+    def read(self, size: int = -1) -> str:
+        chunks: List[str] = [self._pending]
+        length = len(self._pending)
+        while size < 0 or length < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            line = format_row(row, self._columns)
+            chunks.append(line)
+            length += len(line)
+        data = "".join(chunks)
+        if size < 0:
+            size = len(data)
+        self._pending = data[size:]
+        return data[:size]
+
+
+def copy_supported(session: Session) -> bool:
+    """Whether the session is connected through a driver with ``COPY``
+    support."""
+    dialect = session.get_bind().dialect
+    return bool(dialect.name == "postgresql" and dialect.driver == "psycopg2")
+
+
+def can_copy(table: Table, rows: Sequence[Row]) -> bool:
+    """Whether ``rows`` can be sent by :func:`copy_rows`: every key is a
+    column of ``table`` and every value is ``None`` or a scalar which text
+    form PostgreSQL accepts (e.g. not a dictionary or a list)."""
+    columns = table.columns
+    return all(
+        name in columns and (value is None or isinstance(value, _SCALAR_TYPES))
+        for row in rows
+        for name, value in row.items()
+    )
+
+
+def copy_rows(
+    session: Session,
+    table: Table,
+    rows: Sequence[Row],
+    buffer_size: int = COPY_BUFFER_SIZE,
+) -> None:
+    """Inserts ``rows`` into ``table`` with a single ``COPY ... FROM STDIN``
+    in the current transaction of the session.
+
+    Columns are mapped by name: every key of any row is copied into the
+    column with the same name.
+
+    :raises ValueError: if rows can't be copied, see :func:`can_copy`.
+    """
+    if not rows:
+        return
+    if not can_copy(table, rows):
+        raise ValueError(
+            f"Rows don't match columns of '{table.name}' or contain values "
+            "which can't be copied."
+        )
+    columns = list(dict.fromkeys(name for row in rows for name in row))
+    preparer = session.get_bind().dialect.identifier_preparer
+    statement = "COPY {} ({}) FROM STDIN WITH (FORMAT csv)".format(
+        preparer.format_table(table),
+        ", ".join(preparer.quote(name) for name in columns),
+    )
+    cursor = session.connection().connection.cursor()
+    try:
+        stream = CopyStream(iter(rows), columns)
+        cursor.copy_expert(statement, stream, size=buffer_size)
+    finally:
+        cursor.close()
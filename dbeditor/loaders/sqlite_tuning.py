@@ -0,0 +1,98 @@
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+from sqlalchemy import Table, event, text
+from sqlalchemy.orm import Session
+
+# pragmas trading durability of the import for speed: in WAL mode with
+# NORMAL synchronization the last transactions may be lost on power failure,
+# but the database can't be corrupted
+FAST_PRAGMAS = {
+    "journal_mode": "WAL",
+    "cache_size": "-262144",
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+}
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _pragma(dbapi_connection: Any, name: str, value: Any = None) -> Any:
+    cursor = dbapi_connection.cursor()
+    try:
+        if value is None:
+            cursor.execute(f"PRAGMA {name}")
+            row = cursor.fetchone()
+            return row[0] if row else None
+        cursor.execute(f"PRAGMA {name} = {value}")
+    finally:
+        cursor.close()
+
+
+def _indexes(session: Session, table_name: str) -> Dict[str, str]:
+    statement = text(
+        "SELECT name, sql FROM sqlite_master "
+        "WHERE type = 'index' AND tbl_name = :table AND sql IS NOT NULL"
+    )
+    rows = session.execute(statement, {"table": table_name}).all()
+    return {name: sql for name, sql in rows}
+
+
+def _restore_indexes(
+    session: Session, table_name: str, indexes: Dict[str, str]
+) -> None:
+    existing = _indexes(session, table_name)
+    for name, sql in indexes.items():
+        if name not in existing:
+            session.execute(text(sql))
+    session.commit()
+
+
+@contextmanager
+def sqlite_fast_import(
+    session: Session, table: Table, rebuild_indexes: bool = False
+) -> Iterator[None]:
+    """Tunes SQLite connection of ``session`` for bulk insert into ``table``.
+
+    :data:`FAST_PRAGMAS` are applied to the connection of the current
+    transaction, the block has to commit or roll back the import itself.
+    Original values are restored when the connection is returned to the
+    pool, so the tuning only lasts until the first commit or rollback. If
+    ``rebuild_indexes`` is set, secondary indexes of the table are dropped
+    before the block and created again after it, even if the import fails.
+    """
+    engine = session.get_bind()
+    dbapi_connection = session.connection().connection.dbapi_connection
+    original = {name: _pragma(dbapi_connection, name) for name in FAST_PRAGMAS}
+
+    restored = False
+
+    def restore(checked_in: Any, record: Any) -> None:
+        nonlocal restored
+        if checked_in is not dbapi_connection or restored:
+            return
+        restored = True
+        for name, value in original.items():
+            _pragma(dbapi_connection, name, value)
+
+    event.listen(engine, "checkin", restore)
+    for name, value in FAST_PRAGMAS.items():
+        _pragma(dbapi_connection, name, value)
+    indexes = _indexes(session, table.name) if rebuild_indexes else {}
+    try:
+        for name in indexes:
+            session.execute(text(f"DROP INDEX {_quote(name)}"))
+        yield
+    except BaseException:
+        session.rollback()
+        raise
+    finally:
+        try:
+            if indexes:
+                _restore_indexes(session, table.name, indexes)
+            else:
+                session.commit()
+        finally:
+            event.remove(engine, "checkin", restore)
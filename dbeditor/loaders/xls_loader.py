@@ -1,5 +1,5 @@
 from io import StringIO
-from typing import Union
+from typing import Any, BinaryIO, Iterator, Optional, Union
 from pathlib import Path
 
 from openpyxl import load_workbook
@@ -11,15 +11,49 @@ ContentOrFilename = Union[str, Path, StringIO]
 
 
 class XLSLoader(AbstractLoader):
+    """Loads rows of the worksheet. The workbook is read in streaming
+    read-only mode and released as soon as all rows are loaded."""
+
     def __init__(self, file: ContentOrFilename, worksheet: str) -> None:
-        self._workbook_iterator = iter(
-            load_workbook(file, data_only=True)[worksheet]
-        )
-        self._header = list(
-            map(lambda x: str(x.value), next(self._workbook_iterator))
-        )
+        self._rows: Iterator[Any] = iter(())
+        # the file is opened here, because openpyxl releases it only when
+        # unfinished generator of rows is collected
+        self._file: Optional[BinaryIO] = None
+        source: Union[StringIO, BinaryIO]
+        if isinstance(file, (str, Path)):
+            source = self._file = open(file, "rb")
+        else:
+            source = file
+        try:
+            self._workbook = load_workbook(
+                source, read_only=True, data_only=True
+            )
+        except BaseException:
+            self._close_file()
+            raise
+        try:
+            self._rows = self._workbook[worksheet].iter_rows(values_only=True)
+            self._header = list(map(str, next(self._rows)))
+        except (KeyError, StopIteration):
+            self.close()
+            raise
 
     def load_next(self) -> Row:
-        line = next(self._workbook_iterator)
-        kw = zip(self._header, map(lambda x: str(x.value), line))
-        return dict(kw)
+        try:
+            line = next(self._rows)
+        except StopIteration:
+            self.close()
+            raise
+        return dict(zip(self._header, line))
+
+    def close(self) -> None:
+        """Releases the workbook, no more rows are loaded after it."""
+        self._rows = iter(())
+        try:
+            self._workbook.close()
+        finally:
+            self._close_file()
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
@@ -0,0 +1,259 @@
+import json
+import re
+from array import array
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from math import ceil
+from pathlib import Path
+from random import randrange
+from threading import Lock
+from time import perf_counter
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# string literals and numbers which aren't parts of identifiers
+_LITERALS = re.compile(r"'(?:[^']|'')*'|(?<![\w.])\d+(?:\.\d+)?\b")
+# lists of placeholders of any length, e.g. ``IN (?, ?, ?)``
+_PLACEHOLDER_LISTS = re.compile(r"\(\?(?:, \?)+\)")
+# key of start times of cursor executions by their contexts in
+# ``Connection.info``
+_STARTS = "dbeditor_profiler_starts"
+# maximum number of latencies kept per statement profile
+SAMPLE_SIZE = 1024
+# key of checkout time in ``ConnectionRecord.info``
+_CHECKED_OUT = "dbeditor_profiler_checked_out"
+
+
+@lru_cache(maxsize=4096)
+def statement_template(statement: str) -> str:
+    """Returns statement with literals replaced by ``?`` and lists of
+    placeholders collapsed, so statements differing only in values share
+    a template."""
+    template = _LITERALS.sub("?", " ".join(statement.split()))
+    return _PLACEHOLDER_LISTS.sub("(?, ...)", template)
+
+
+@dataclass
+class StatementProfile:
+    template: str
+    # method of the database which issued the statement
+    operation: Optional[str]
+    count: int = 0
+    # seconds spent in cursor executions
+    total: float = 0.0
+    # rows reported by the driver, SQLite doesn't report rows of ``SELECT``
+    rows: int = 0
+    # uniform sample of at most SAMPLE_SIZE latencies of all executions
+    latencies: "array[float]" = field(default_factory=lambda: array("d"))
+
+    def add(self, elapsed: float, rows: int) -> None:
+        """Records an execution, its latency replaces a random one in the
+        full sample with decreasing probability (reservoir sampling)."""
+        self.count += 1
+        self.total += elapsed
+        self.rows += rows
+        if len(self.latencies) < SAMPLE_SIZE:
+            self.latencies.append(elapsed)
+            return
+        index = randrange(self.count)
+        if index < SAMPLE_SIZE:
+            self.latencies[index] = elapsed
+
+    def percentile(self, fraction: float) -> float:
+        """Returns latency of the ``fraction`` of executions by the
+        nearest-rank method, ``0`` if there were no executions."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        rank = max(1, ceil(fraction * len(ordered)))
+        return ordered[rank - 1]
+
+    @property
+    def p50(self) -> float:
+        return self.percentile(0.5)
+
+    @property
+    def p99(self) -> float:
+        return self.percentile(0.99)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "template": self.template,
+            "operation": self.operation,
+            "count": self.count,
+            "total": self.total,
+            "p50": self.p50,
+            "p99": self.p99,
+            "rows": self.rows,
+        }
+
+
+@dataclass
+class PoolProfile:
+    checkouts: int = 0
+    checkins: int = 0
+    # seconds connections were checked out
+    held_total: float = 0.0
+    held_max: float = 0.0
+
+
+class Profiler:
+    """Aggregates cursor executions and pool usage of the engine through
+    SQLAlchemy events.
+
+    Executions are grouped by :func:`statement_template` and by the
+    operation which issued them. Operation is set per thread (and per
+    greenlet, i.e. per call of :class:`AsyncDatabase`) by :meth:`operation`,
+    only the outermost one is taken into account.
+    The profiler is disabled until :meth:`enable` is called, it's
+    thread-safe.
+    """
+
+    def __init__(self, engine: Engine) -> None:
+        self._engine = engine
+        self._enabled = False
+        self._lock = Lock()
+        self._operation: ContextVar[Optional[str]] = ContextVar(
+            f"profiler_operation_{id(self)}", default=None
+        )
+        self._statements: Dict[Tuple[str, Optional[str]], StatementProfile] = {}
+        self._pool = PoolProfile()
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def _events(self) -> List[Tuple[str, Any]]:
+        return [
+            ("before_cursor_execute", self._before_execute),
+            ("after_cursor_execute", self._after_execute),
+            ("handle_error", self._on_error),
+            ("checkout", self._on_checkout),
+            ("checkin", self._on_checkin),
+        ]
+
+    def enable(self) -> None:
+        if self._enabled:
+            return
+        for name, listener in self._events():
+            event.listen(self._engine, name, listener)
+        self._enabled = True
+
+    def disable(self) -> None:
+        """Stops profiling, collected statistics are kept."""
+        if not self._enabled:
+            return
+        for name, listener in self._events():
+            event.remove(self._engine, name, listener)
+        self._enabled = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self._statements.clear()
+            self._pool = PoolProfile()
+
+    @contextmanager
+    def operation(self, name: str) -> Iterator[None]:
+        """Attributes statements executed by the current thread inside the
+        block to ``name`` unless they are already inside another block."""
+        if self._operation.get() is not None:
+            yield
+            return
+        token = self._operation.set(name)
+        try:
+            yield
+        finally:
+            self._operation.reset(token)
+
+    def _before_execute(
+        self,
+        conn: Any,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        *args: Any,
+    ) -> None:
+        conn.info.setdefault(_STARTS, {})[id(context)] = perf_counter()
+
+    def _after_execute(
+        self,
+        conn: Any,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        *args: Any,
+    ) -> None:
+        start = conn.info.get(_STARTS, {}).pop(id(context), None)
+        if start is None:
+            # profiler was enabled during the execution
+            return
+        elapsed = perf_counter() - start
+        rows = max(cursor.rowcount, 0) if cursor is not None else 0
+        operation = self._operation.get()
+        key = statement_template(statement), operation
+        with self._lock:
+            profile = self._statements.get(key)
+            if profile is None:
+                profile = self._statements[key] = StatementProfile(*key)
+            profile.add(elapsed, rows)
+
+    def _on_error(self, context: Any) -> None:
+        # failed execution is never finished by after_cursor_execute
+        if context.connection is not None:
+            starts = context.connection.info.get(_STARTS, {})
+            starts.pop(id(context.execution_context), None)
+
+    def _on_checkout(
+        self, dbapi_connection: Any, record: Any, *args: Any
+    ) -> None:
+        record.info[_CHECKED_OUT] = perf_counter()
+        with self._lock:
+            self._pool.checkouts += 1
+
+    def _on_checkin(self, dbapi_connection: Any, record: Any) -> None:
+        checked_out = record.info.pop(_CHECKED_OUT, None)
+        with self._lock:
+            self._pool.checkins += 1
+            if checked_out is not None:
+                held = perf_counter() - checked_out
+                self._pool.held_total += held
+                self._pool.held_max = max(self._pool.held_max, held)
+
+    def statements(self) -> List[StatementProfile]:
+        """Returns copies of statement profiles, the most time-consuming
+        first."""
+        with self._lock:
+            profiles = [
+                StatementProfile(
+                    profile.template,
+                    profile.operation,
+                    profile.count,
+                    profile.total,
+                    profile.rows,
+                    array("d", profile.latencies),
+                )
+                for profile in self._statements.values()
+            ]
+        return sorted(profiles, key=lambda profile: -profile.total)
+
+    def pool(self) -> PoolProfile:
+        with self._lock:
+            return PoolProfile(**asdict(self._pool))
+
+    def report(self) -> Dict[str, Any]:
+        """Returns JSON-serializable statistics, times are in seconds."""
+        return {
+            "statements": [profile.summary() for profile in self.statements()],
+            "pool": asdict(self.pool()),
+        }
+
+    def dump(self, path: Union[str, Path]) -> None:
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.report(), file, indent=2)
+            file.write("\n")
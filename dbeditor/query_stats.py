@@ -0,0 +1,96 @@
+import json
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from threading import Lock
+from typing import Callable, List, Optional, Union
+
+
+@dataclass
+class QueryStats:
+    query: str
+    started_at: datetime = field(default_factory=datetime.now)
+    # wall time in seconds
+    elapsed: float = 0.0
+    rows_returned: int = 0
+    # -1 if unknown or the statement returns rows
+    rows_affected: int = -1
+    # approximate size of fetched rows
+    bytes_fetched: int = 0
+    cached: bool = False
+    plan: Optional[List[str]] = None
+
+    def summary(self) -> str:
+        parts = [f"{self.elapsed * 1000:.1f} ms"]
+        if self.rows_affected >= 0:
+            parts.append(f"{self.rows_affected} rows affected")
+        else:
+            parts.append(f"{self.rows_returned} rows")
+            parts.append(f"{self.bytes_fetched / 1024:.1f} KiB")
+        if self.cached:
+            parts.append("cached")
+        return ", ".join(parts)
+
+
+QueryListener = Callable[[QueryStats], None]
+
+
+class SlowQueryLog:
+    """Appends statistics of queries slower than the threshold to a file,
+    one JSON object per line."""
+
+    def __init__(self, path: Union[str, Path], threshold: float) -> None:
+        """
+        :param path: path of the log file, parent directories are created
+        :param threshold: minimum wall time in seconds of logged queries
+        """
+        self.path = Path(path)
+        self.threshold = threshold
+        self._lock = Lock()
+
+    def __call__(self, stats: QueryStats) -> None:
+        if stats.cached or stats.elapsed < self.threshold:
+            return
+        record = asdict(stats)
+        record["started_at"] = stats.started_at.isoformat()
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(json.dumps(record) + "\n")
+
+    def read(self) -> List[QueryStats]:
+        """Returns logged statistics, oldest first."""
+        if not self.path.exists():
+            return []
+        result = []
+        with open(self.path, encoding="utf-8") as file:
+            for line in file:
+                record = json.loads(line)
+                record["started_at"] = datetime.fromisoformat(
+                    record["started_at"]
+                )
+                result.append(QueryStats(**record))
+        return result
+
+
+class QueryInstrumentation:
+    """Receivers of statistics of executed raw queries."""
+
+    def __init__(self) -> None:
+        self.capture_plans = False
+        self.slow_log: Optional[SlowQueryLog] = None
+        self._listeners: List[QueryListener] = []
+        self.last: Optional[QueryStats] = None
+
+    def add_listener(self, listener: QueryListener) -> None:
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: QueryListener) -> None:
+        self._listeners.remove(listener)
+
+    def record(self, stats: QueryStats) -> None:
+        self.last = stats
+        if self.slow_log is not None:
+            self.slow_log(stats)
+        for listener in list(self._listeners):
+            listener(stats)
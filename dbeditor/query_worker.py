@@ -0,0 +1,145 @@
+from time import perf_counter
+from typing import Any, List, Optional, Tuple
+
+from PyQt5 import QtCore
+
+from dbeditor.database import Database
+from dbeditor.query_stats import QueryStats
+from dbeditor.raw_query import RawQuery
+from dbeditor.result_cache import estimate_size
+
+
+class QuerySignals(QtCore.QObject):
+    # column names, empty if statement doesn't return rows
+    started = QtCore.pyqtSignal(list)
+    # batch of fetched rows
+    rows = QtCore.pyqtSignal(list)
+    # rows fetched, seconds elapsed
+    progress = QtCore.pyqtSignal(int, float)
+    # rows fetched, seconds elapsed, rows affected (-1 if unknown), whether
+    # rows were truncated by the limit
+    finished = QtCore.pyqtSignal(int, float, int, bool)
+    cancelled = QtCore.pyqtSignal()
+    failed = QtCore.pyqtSignal(str)
+    # QueryStats of the finished statement, emitted before finished
+    measured = QtCore.pyqtSignal(object)
+
+
+class QueryWorker(QtCore.QRunnable):
+    """Executes a raw statement in a background thread streaming at most
+    ``max_rows`` rows of its result by chunks. Complete results of
+    ``SELECT`` queries are kept in the result cache of the database.
+    Statistics of finished statements are recorded by instrumentation of
+    the database, plan is captured if it's enabled there."""
+
+    def __init__(
+        self,
+        database: Database,
+        query: str,
+        max_rows: int = 10000,
+        chunk_size: int = 500,
+        timeout: Optional[float] = None,
+        explain: bool = False,
+    ) -> None:
+        """
+        :param database: database to execute the statement in
+        :param query: SQL statement
+        :param max_rows: maximum number of fetched rows
+        :param chunk_size: number of rows fetched at once
+        :param timeout: maximum execution time in seconds
+        :param explain: capture plan of the statement even if it's disabled
+            in instrumentation of the database
+        """
+        super().__init__()
+        self.signals = QuerySignals()
+        self._database = database
+        self._sql = query
+        self._query = RawQuery(database, query, timeout=timeout)
+        self._max_rows = max_rows
+        self._chunk_size = chunk_size
+        self._explain = explain
+
+    def cancel(self) -> None:
+        """Cancels the statement, even if it's still being executed."""
+        self._query.cancel()
+
+    def run(self) -> None:
+        stats = QueryStats(self._sql)
+        try:
+            if self._query.cancelled:
+                self.signals.cancelled.emit()
+                return
+            instrumentation = self._database.instrumentation
+            if self._explain or instrumentation.capture_plans:
+                # ANALYZE would execute the query once more and couldn't be
+                # cancelled
+                stats.plan = self._database.explain(self._sql, analyze=False)
+            start = perf_counter()
+            cache_key = self._database.raw_cache_key(self._sql)
+            cache = self._database.cache
+            cached = cache.get(cache_key) if cache_key is not None else None
+            if cached is not None:
+                stats.cached = True
+                self._emit_cached(start, stats, *cached)
+                return
+            with self._query as query:
+                self.signals.started.emit(query.columns)
+                result, truncated = self._stream(query, start)
+                stats.rows_affected = query.rowcount
+                columns = query.columns
+        # exceptions can't leave the worker thread, so report any of them
+        except Exception as error:
+            if self._query.cancelled:
+                self.signals.cancelled.emit()
+            else:
+                self.signals.failed.emit(str(error))
+            return
+        if self._query.cancelled:
+            self.signals.cancelled.emit()
+            return
+        stats.elapsed = perf_counter() - start
+        stats.rows_returned = len(result)
+        stats.bytes_fetched = estimate_size(result)
+        if cache_key is not None and not truncated:
+            cache.put(cache_key, (columns, result), stats.bytes_fetched)
+        self._finish(stats, truncated)
+
+    def _stream(
+        self, query: RawQuery, start: float
+    ) -> Tuple[List[Tuple[Any, ...]], bool]:
+        result: List[Tuple[Any, ...]] = []
+        while len(result) < self._max_rows:
+            size = min(self._chunk_size, self._max_rows - len(result))
+            rows = [tuple(row) for row in query.fetch(size)]
+            if not rows:
+                return result, False
+            result.extend(rows)
+            self.signals.rows.emit(rows)
+            self.signals.progress.emit(len(result), perf_counter() - start)
+        return result, bool(query.fetch(1))
+
+    def _emit_cached(
+        self,
+        start: float,
+        stats: QueryStats,
+        columns: List[str],
+        rows: List[Any],
+    ) -> None:
+        self.signals.started.emit(list(columns))
+        shown = rows[: self._max_rows]
+        for first in range(0, len(shown), self._chunk_size):
+            end = first + self._chunk_size
+            self.signals.rows.emit([tuple(row) for row in shown[first:end]])
+        stats.elapsed = perf_counter() - start
+        stats.rows_returned = len(shown)
+        self._finish(stats, len(rows) > len(shown))
+
+    def _finish(self, stats: QueryStats, truncated: bool) -> None:
+        self._database.instrumentation.record(stats)
+        self.signals.measured.emit(stats)
+        self.signals.finished.emit(
+            stats.rows_returned,
+            stats.elapsed,
+            stats.rows_affected,
+            truncated,
+        )
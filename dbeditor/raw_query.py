@@ -0,0 +1,162 @@
+from threading import Event
+from time import monotonic
+from types import TracebackType
+from typing import Any, Dict, List, Optional, Type
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Result, Row, Transaction
+
+from dbeditor.database import Database
+
+# number of SQLite virtual machine instructions between timeout checks
+_PROGRESS_STEPS = 10000
+
+
+class QueryCancelled(Exception):
+    pass
+
+
+class RawQuery:
+    """Raw statement executed on its own connection.
+
+    Rows are streamed with ``fetchmany`` instead of being loaded at once, and
+    the statement can be cancelled from another thread: SQLite connection is
+    interrupted, PostgreSQL backend is cancelled with
+    ``pg_cancel_backend``. Optional timeout is enforced by the progress
+    handler in SQLite and ``statement_timeout`` in PostgreSQL. The statement
+    is committed when the context is left without an error.
+    """
+
+    def __init__(
+        self,
+        database: Database,
+        query: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> None:
+        """
+        :param database: database to execute the statement in
+        :param query: SQL statement
+        :param params: values of bound parameters
+        :param timeout: maximum execution time in seconds
+        """
+        self._database = database
+        self._query = query
+        self._params = params or {}
+        self._timeout = timeout
+        self._cancel = Event()
+        self._dialect = database.engine.dialect.name
+        self._backend_pid: Optional[int] = None
+        self._connection: Optional[Connection] = None
+        self._transaction: Optional[Transaction] = None
+        self._result: Optional[Result] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def returns_rows(self) -> bool:
+        return self._result is not None and self._result.returns_rows
+
+    @property
+    def columns(self) -> List[str]:
+        if self._result is None or not self._result.returns_rows:
+            return []
+        return list(self._result.keys())
+
+    @property
+    def rowcount(self) -> int:
+        """Number of rows affected by the statement, -1 if unknown."""
+        if self._result is None or self.returns_rows:
+            return -1
+        return int(self._result.rowcount)
+
+    def __enter__(self) -> "RawQuery":
+        self._connection = self._database.engine.connect()
+        try:
+            with self._database.profiler.operation("raw_query"):
+                self._prepare(self._connection)
+                self._transaction = self._connection.begin()
+                self._result = self._connection.execution_options(
+                    stream_results=True
+                ).execute(text(self._query), self._params)
+        except BaseException:
+            self._close()
+            raise
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        assert self._transaction is not None
+        try:
+            if exc_type is None and not self.cancelled:
+                self._transaction.commit()
+                self._database.raw_executed(self._query)
+            else:
+                self._transaction.rollback()
+        finally:
+            self._close()
+
+    def _prepare(self, connection: Connection) -> None:
+        dbapi_connection = connection.connection.dbapi_connection
+        if self._dialect == "sqlite" and self._timeout is not None:
+            deadline = monotonic() + self._timeout
+            dbapi_connection.set_progress_handler(
+                lambda: monotonic() > deadline, _PROGRESS_STEPS
+            )
+        elif self._dialect == "postgresql":
+            self._backend_pid = connection.execute(
+                text("SELECT pg_backend_pid()")
+            ).scalar()
+            if self._timeout is not None:
+                milliseconds = int(self._timeout * 1000)
+                connection.execute(
+                    text(f"SET statement_timeout = {milliseconds}")
+                )
+
+    def _close(self) -> None:
+        connection = self._connection
+        if connection is None:
+            return
+        self._connection = None
+        try:
+            if not connection.invalidated:
+                if self._dialect == "sqlite" and self._timeout is not None:
+                    dbapi_connection = connection.connection.dbapi_connection
+                    dbapi_connection.set_progress_handler(None, 0)
+                elif self._dialect == "postgresql" and self._timeout:
+                    connection.execute(text("RESET statement_timeout"))
+        finally:
+            connection.close()
+
+    def fetch(self, size: int) -> List[Row]:
+        """Returns next at most ``size`` rows, empty list if there are no
+        more rows.
+
+        :raises QueryCancelled: if query was cancelled.
+        """
+        if self.cancelled:
+            raise QueryCancelled()
+        if self._result is None or not self._result.returns_rows:
+            return []
+        return list(self._result.fetchmany(size))
+
+    def cancel(self) -> None:
+        """Cancels the statement, it's safe to call from any thread."""
+        self._cancel.set()
+        connection = self._connection
+        if connection is None:
+            return
+        if self._dialect == "sqlite":
+            connection.connection.dbapi_connection.interrupt()
+        elif self._dialect == "postgresql" and self._backend_pid is not None:
+            with self._database.engine.connect() as other:
+                other.execute(
+                    text("SELECT pg_cancel_backend(:pid)"),
+                    {"pid": self._backend_pid},
+                )
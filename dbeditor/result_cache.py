@@ -0,0 +1,87 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from sys import getsizeof
+from threading import Lock
+from typing import Any, Hashable, Iterable, Optional, Tuple
+
+
+def estimate_size(rows: Iterable[Any]) -> int:
+    """Returns approximate number of bytes taken by rows and their values."""
+    size = 0
+    for row in rows:
+        size += getsizeof(row) + sum(getsizeof(value) for value in row)
+    return size
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    size: int = 0
+
+
+class ResultCache:
+    """LRU cache of query results bounded by their approximate size.
+
+    Keys have to include a token which changes when the data does, the cache
+    doesn't track staleness by itself, so outdated entries are just never
+    requested again and eventually evicted. The cache is thread-safe.
+    """
+
+    def __init__(self, max_size: int = 32 * 1024 * 1024) -> None:
+        """
+        :param max_size: maximum total size of cached results in bytes,
+            ``0`` disables the cache
+        """
+        self._max_size = max_size
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._stats = CacheStats()
+        self._lock = Lock()
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                self._stats.hits,
+                self._stats.misses,
+                self._stats.evictions,
+                len(self._entries),
+                self._stats.size,
+            )
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, size: int) -> None:
+        """Caches ``value`` of ``size`` bytes, values larger than the whole
+        cache are ignored."""
+        if size > self._max_size:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._stats.size -= previous[1]
+            self._entries[key] = value, size
+            self._stats.size += size
+            while self._stats.size > self._max_size:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._stats.size -= evicted
+                self._stats.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._stats.size = 0
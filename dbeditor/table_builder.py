@@ -1,6 +1,6 @@
 from typing import Optional, Dict, Iterator
 
-from sqlalchemy import Column, Table, MetaData
+from sqlalchemy import Column, Table, MetaData, inspect
 from sqlalchemy.engine import Engine
 
 
@@ -60,14 +60,14 @@ class BuilderGroup:
     def start_building(self, table_name: str) -> None:
         """Creates new builder with ``table_name``."""
 
-        if table_name in self or table_name in self._engine.table_names():
+        if table_name in self or inspect(self._engine).has_table(table_name):
             raise ValueError(f"Table with name '{table_name}' already exist.")
 
         self._builders[table_name] = TableBuilder(table_name)
 
     def create_table(self, table_name: str, meta: MetaData) -> None:
-        """Creates table with name ``table_name``."""
+        """Creates table with name ``table_name``, the table is added to
+        ``meta``."""
 
         builder = self._builders.pop(table_name)
-        builder.build_table(meta)
-        meta.create_all(self._engine)
+        builder.build_table(meta).create(self._engine)
@@ -0,0 +1,221 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from PyQt5 import QtCore
+
+from dbeditor.database import Key, Page
+
+Fetcher = Callable[[Optional[Key], int], Page]
+PendingRow = Dict[int, str]
+
+
+class TableModel(QtCore.QAbstractTableModel):
+    """Model of a database table. Rows are fetched lazily by pages while the
+    view is scrolled, pending (not yet inserted) rows are shown after them.
+    """
+
+    # row, column, previous value
+    cellEdited = QtCore.pyqtSignal(int, int, object)
+
+    def __init__(
+        self,
+        names: List[str],
+        fetcher: Optional[Fetcher] = None,
+        pending: Optional[List[PendingRow]] = None,
+        page_size: int = 256,
+        parent: Optional[QtCore.QObject] = None,
+        editable: bool = True,
+    ) -> None:
+        """
+        :param names: column names
+        :param fetcher: callable returning next page of rows after the key,
+            ``None`` if the table doesn't exist in database yet
+        :param pending: pending rows, the list is modified in place
+        :param page_size: number of rows fetched at once
+        :param parent: parent object
+        :param editable: whether cells can be edited in the view
+        """
+        super().__init__(parent)
+        self._names = list(names)
+        self._fetcher = fetcher
+        self._page_size = page_size
+        self._rows: List[List[Any]] = []
+        self._pending = pending if pending is not None else []
+        self._key: Optional[Key] = None
+        self._exhausted = fetcher is None
+        self._deferred = False
+        self._editable = editable
+
+    @property
+    def names(self) -> List[str]:
+        return self._names
+
+    @property
+    def pending(self) -> List[PendingRow]:
+        return self._pending
+
+    @property
+    def page_size(self) -> int:
+        return self._page_size
+
+    def fetched_count(self) -> int:
+        return len(self._rows)
+
+    def is_pending(self, row: int) -> bool:
+        return row >= len(self._rows)
+
+    def value(self, row: int, column: int) -> Any:
+        if self.is_pending(row):
+            return self._pending[row - len(self._rows)].get(column)
+        return self._rows[row][column]
+
+    def row_values(self, row: int) -> List[Any]:
+        return [self.value(row, col) for col in range(len(self._names))]
+
+    def set_value(self, row: int, column: int, value: Any) -> None:
+        """Sets value of the cell without emitting :attr:`cellEdited`."""
+        if self.is_pending(row):
+            self._pending[row - len(self._rows)][column] = value
+        else:
+            self._rows[row][column] = value
+        index = self.index(row, column)
+        self.dataChanged.emit(index, index)
+
+    def append_rows(self, rows: Iterable[Iterable[Any]]) -> None:
+        """Appends rows fetched by the caller after already fetched ones."""
+        appended = [list(row) for row in rows]
+        if not appended:
+            return
+        first = len(self._rows)
+        last = first + len(appended) - 1
+        self.beginInsertRows(QtCore.QModelIndex(), first, last)
+        self._rows.extend(appended)
+        self.endInsertRows()
+
+    def append_pending(self) -> int:
+        """Appends empty pending row and returns its index."""
+        row = self.rowCount()
+        self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        self._pending.append({})
+        self.endInsertRows()
+        return row
+
+    def rowCount(
+        self, parent: QtCore.QModelIndex = QtCore.QModelIndex()
+    ) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._rows) + len(self._pending)
+
+    def columnCount(
+        self, parent: QtCore.QModelIndex = QtCore.QModelIndex()
+    ) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._names)
+
+    def data(
+        self, index: QtCore.QModelIndex, role: int = QtCore.Qt.DisplayRole
+    ) -> Any:
+        if not index.isValid() or role not in (
+            QtCore.Qt.DisplayRole,
+            QtCore.Qt.EditRole,
+        ):
+            return None
+        if self.is_pending(index.row()):
+            return self.value(index.row(), index.column()) or ""
+        return str(self.value(index.row(), index.column()))
+
+    def headerData(
+        self,
+        section: int,
+        orientation: QtCore.Qt.Orientation,
+        role: int = QtCore.Qt.DisplayRole,
+    ) -> Any:
+        if role != QtCore.Qt.DisplayRole:
+            return None
+        if orientation == QtCore.Qt.Horizontal:
+            if section >= len(self._names):
+                return None
+            return self._names[section]
+        return section + 1
+
+    def flags(self, index: QtCore.QModelIndex) -> QtCore.Qt.ItemFlags:
+        if not self._editable:
+            return super().flags(index)
+        return super().flags(index) | QtCore.Qt.ItemIsEditable  # type: ignore
+
+    def setData(
+        self,
+        index: QtCore.QModelIndex,
+        value: Any,
+        role: int = QtCore.Qt.EditRole,
+    ) -> bool:
+        if not index.isValid() or role != QtCore.Qt.EditRole:
+            return False
+        row, column = index.row(), index.column()
+        previous = self.value(row, column)
+        self.set_value(row, column, value)
+        self.cellEdited.emit(row, column, previous)
+        return True
+
+    def removeRows(
+        self,
+        row: int,
+        count: int,
+        parent: QtCore.QModelIndex = QtCore.QModelIndex(),
+    ) -> bool:
+        if parent.isValid() or row < 0 or row + count > self.rowCount():
+            return False
+        self.beginRemoveRows(parent, row, row + count - 1)
+        for i in reversed(range(row, row + count)):
+            if self.is_pending(i):
+                del self._pending[i - len(self._rows)]
+            else:
+                del self._rows[i]
+        self.endRemoveRows()
+        return True
+
+    def remove_rows(self, rows: Iterable[int]) -> None:
+        """Removes rows with given indexes, contiguous ones at once."""
+        ranges: List[List[int]] = []
+        for row in sorted(set(rows), reverse=True):
+            if ranges and ranges[-1][0] == row + 1:
+                ranges[-1][0] = row
+            else:
+                ranges.append([row, row])
+        for first, last in ranges:
+            self.removeRows(first, last - first + 1)
+
+    def canFetchMore(self, parent: QtCore.QModelIndex) -> bool:
+        if parent.isValid() or self._deferred:
+            return False
+        return not self._exhausted
+
+    def fetchMore(self, parent: QtCore.QModelIndex) -> None:
+        if not self.canFetchMore(parent) or self._fetcher is None:
+            return
+        self.add_page(*self._fetcher(self._key, self._page_size))
+
+    def defer_fetching(self) -> None:
+        """Stops fetching rows until the first page, fetched by the caller
+        (e.g. asynchronously), is passed to :meth:`add_page`."""
+        self._deferred = True
+
+    def resume_fetching(self) -> None:
+        """Fetches rows again after :meth:`defer_fetching`, e.g. when the
+        caller couldn't fetch the first page."""
+        self._deferred = False
+
+    def add_page(self, rows: List[Any], key: Optional[Key]) -> None:
+        """Appends the next page of rows, the following pages are fetched
+        after ``key``."""
+        self._deferred = False
+        if len(rows) < self._page_size:
+            self._exhausted = True
+        if not rows:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QtCore.QModelIndex(), first, first + len(rows) - 1)
+        self._rows.extend(list(row) for row in rows)
+        self._key = key
+        self.endInsertRows()
@@ -1,6 +1,8 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Optional, Union
+from typing import Any, Dict, Optional, Type, Union
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool, StaticPool
 
 
 class DatabaseKind(Enum):
@@ -15,13 +17,24 @@ _DRIVER = {
     DatabaseKind.POSTGRESQL: "psycopg2",
 }
 
+_ASYNC_DRIVER = {
+    DatabaseKind.SQLITE: "aiosqlite",
+    DatabaseKind.MYSQL: "aiomysql",
+    DatabaseKind.POSTGRESQL: "asyncpg",
+}
+
 
-def _get_protocol(db_kind: DatabaseKind, driver: Optional[str] = None) -> str:
+def _get_protocol(
+    db_kind: DatabaseKind,
+    driver: Optional[str] = None,
+    asynchronous: bool = False,
+) -> str:
     if db_kind == DatabaseKind.SQLITE and driver:
         raise ValueError("Sqlite does not support any drivers.")
 
     if driver is None:
-        driver = _DRIVER.get(db_kind)
+        drivers = _ASYNC_DRIVER if asynchronous else _DRIVER
+        driver = drivers.get(db_kind)
 
     if driver:
         return f"{db_kind.value}+{driver}"
@@ -47,12 +60,69 @@ def build_uri(
     path: str,
     netloc: Optional[Netloc] = None,
     driver: Optional[str] = None,
+    asynchronous: bool = False,
 ) -> str:
+    """
+    :param asynchronous: use asyncio driver of the database by default, see
+        :class:`~dbeditor.async_database.AsyncDatabase`
+    """
     if db_kind == DatabaseKind.SQLITE and netloc:
         raise ValueError("SQLite does not supporting remote databases.")
 
     # TODO: use polymorphism
-    proto = _get_protocol(db_kind, driver)
+    proto = _get_protocol(db_kind, driver, asynchronous)
     if netloc is None:
         return f"{proto}:///{path}"
     return f"{proto}://{netloc}/{path}"
+
+
+@dataclass
+class ConnectionPolicy:
+    """Options of connection pooling passed to
+    :func:`~sqlalchemy.create_engine`. ``None`` means dialect default."""
+
+    pool_class: Optional[Type[Pool]] = None
+    pool_size: Optional[int] = None
+    max_overflow: Optional[int] = None
+    pre_ping: bool = False
+    recycle: int = -1
+    connect_args: Dict[str, Any] = field(default_factory=dict)
+
+    def engine_kwargs(self) -> Dict[str, Any]:
+        kwargs: Dict[str, Any] = {
+            "pool_pre_ping": self.pre_ping,
+            "pool_recycle": self.recycle,
+        }
+        if self.pool_class is not None:
+            kwargs["poolclass"] = self.pool_class
+        if self.pool_size is not None:
+            kwargs["pool_size"] = self.pool_size
+        if self.max_overflow is not None:
+            kwargs["max_overflow"] = self.max_overflow
+        if self.connect_args:
+            kwargs["connect_args"] = dict(self.connect_args)
+        return kwargs
+
+
+def default_policy(
+    db_kind: DatabaseKind, path: str, asynchronous: bool = False
+) -> ConnectionPolicy:
+    """Returns policy suitable for a long-lived editor session.
+
+    SQLite connections are shared between threads: in-memory database has
+    one static connection, file database keeps a small queue of them instead
+    of opening the file for every operation. Remote connections are checked
+    before use and recycled hourly, as servers drop idle ones. Queues of
+    ``asynchronous`` policies can be used by asyncio drivers.
+    """
+    queue = AsyncAdaptedQueuePool if asynchronous else QueuePool
+    if db_kind == DatabaseKind.SQLITE:
+        connect_args = {"check_same_thread": False}
+        if not path or path == ":memory:":
+            return ConnectionPolicy(StaticPool, connect_args=connect_args)
+        return ConnectionPolicy(
+            queue, pool_size=2, max_overflow=2, connect_args=connect_args
+        )
+    return ConnectionPolicy(
+        queue, pool_size=5, max_overflow=5, pre_ping=True, recycle=3600
+    )
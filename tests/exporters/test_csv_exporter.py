@@ -0,0 +1,37 @@
+from io import StringIO
+
+from dbeditor.database import Database
+from dbeditor.exporters import export_query, table_query
+from dbeditor.exporters.csv_exporter import CSVExporter
+
+
+def test_write() -> None:
+    output = StringIO()
+    with CSVExporter(output) as exporter:
+        exporter.write_header(["id", "name"])
+        exporter.write_rows([(1, "lorem"), (2, None)])
+    assert output.getvalue() == "id,name\r\n1,lorem\r\n2,\r\n"
+
+
+def test_export_table(database: Database) -> None:
+    database.execute_raw(
+        "INSERT INTO second (amount, name) VALUES (1, 'a, b'), (NULL, 'c')"
+    )
+    output = StringIO()
+    exported = export_query(
+        database,
+        table_query(database, "second"),
+        CSVExporter(output, lineterminator="\n"),
+        chunk_size=1,
+    )
+    assert exported == 2
+    assert output.getvalue() == 'id,amount,name\n1,1,"a, b"\n2,,c\n'
+
+
+def test_export_empty_result(database: Database) -> None:
+    output = StringIO()
+    exported = export_query(
+        database, "SELECT name FROM first WHERE id < 0", CSVExporter(output)
+    )
+    assert exported == 0
+    assert output.getvalue() == "name\r\n"
@@ -0,0 +1,53 @@
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+from dbeditor.database import Database
+from dbeditor.exporters import export_query, table_query, xls_exporter
+from dbeditor.exporters.xls_exporter import XLSExporter
+from dbeditor.loaders.xls_loader import XLSLoader
+
+
+def test_write(tmp_path: Path) -> None:
+    path = tmp_path / "result.xlsx"
+    with XLSExporter(path, "Result") as exporter:
+        exporter.write_header(["a", "b", "c"])
+        exporter.write_rows(
+            [
+                (1, "lorem\x00", date(2020, 1, 2)),
+                (Decimal("1.5"), None, b"\x01\xff"),
+            ]
+        )
+    rows = list(XLSLoader(path, "Result"))
+    assert rows[0]["a"] == 1
+    assert rows[0]["b"] == "lorem"
+    assert rows[0]["c"].date() == date(2020, 1, 2)
+    assert rows[1] == {"a": 1.5, "b": None, "c": "01ff"}
+
+
+def test_export_table(database: Database, tmp_path: Path) -> None:
+    path = tmp_path / "first.xlsx"
+    exported = export_query(
+        database, table_query(database, "first"), XLSExporter(path)
+    )
+    assert exported == 2
+    assert list(XLSLoader(path, "Sheet1")) == [
+        {"id": 1, "name": "lorem"},
+        {"id": 2, "name": "ipsum"},
+    ]
+
+
+def test_split_worksheets(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(xls_exporter, "MAX_ROWS", 3)
+    path = tmp_path / "result.xlsx"
+    with XLSExporter(path, "Result") as exporter:
+        exporter.write_header(["n"])
+        exporter.write_rows([(1,), (2,), (3,)])
+        exporter.write_rows([(4,), (5,)])
+    assert list(XLSLoader(path, "Result")) == [{"n": 1}, {"n": 2}]
+    assert list(XLSLoader(path, "Result (2)")) == [{"n": 3}, {"n": 4}]
+    assert list(XLSLoader(path, "Result (3)")) == [{"n": 5}]
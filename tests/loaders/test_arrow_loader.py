@@ -0,0 +1,84 @@
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+
+import pytest
+
+from dbeditor.database import Database
+from dbeditor.loaders import arrow_loader
+from dbeditor.loaders.arrow_loader import ArrowLoader
+from dbeditor.loaders.coercion import Coercer
+from dbeditor.loaders.merger import Merger
+
+STARTED = datetime(2021, 12, 1, 10, 30)
+
+
+@pytest.fixture(params=["data.parquet", "data.arrow"])
+def path(request: pytest.FixtureRequest, tmp_path: Path) -> Path:
+    pa = pytest.importorskip("pyarrow")
+    feather = pytest.importorskip("pyarrow.feather")
+    parquet = pytest.importorskip("pyarrow.parquet")
+    table = pa.table(
+        {
+            "amount": pa.array(range(5), pa.int64()),
+            "name": [f"row {i}" for i in range(5)],
+            "ratio": [i / 2 for i in range(5)],
+            "started": [STARTED] * 5,
+        }
+    )
+    result = tmp_path / str(request.param)
+    if result.suffix == ".parquet":
+        parquet.write_table(table, result, row_group_size=2)
+    else:
+        feather.write_feather(table, result, chunksize=3)
+    return result
+
+
+def test_load_next(path: Path) -> None:
+    rows = list(ArrowLoader(path))
+    assert len(rows) == 5
+    assert rows[3] == {
+        "amount": 3,
+        "name": "row 3",
+        "ratio": 1.5,
+        "started": STARTED,
+    }
+
+
+def test_projection(path: Path) -> None:
+    loader = ArrowLoader(path, columns={"name", "amount", "missing"})
+    assert loader.names == ["amount", "name"]
+    assert next(loader) == {"amount": 0, "name": "row 0"}
+
+
+def test_batches(path: Path) -> None:
+    loader = ArrowLoader(path, columns=["amount"], batch_size=2)
+    assert next(loader) == {"amount": 0}
+    batches = list(loader.batches(4))
+    assert all(len(batch) <= 4 for batch in batches)
+    assert [row["amount"] for batch in batches for row in batch] == [
+        1,
+        2,
+        3,
+        4,
+    ]
+
+
+def test_merge(database: Database, path: Path) -> None:
+    table = database.get_table("second")
+    merger = Merger(table, batch_size=2, coercer=Coercer(table))
+    loader = ArrowLoader(path, table.columns.keys())
+    with database.session as s:
+        merger.merge(s, loader)
+    rows = database.select_all("second")
+    assert [row[1:] for row in islice(rows, 2)] == [(0, "row 0"), (1, "row 1")]
+    assert len(rows) == 5
+    loader.close()
+
+
+def test_missing_pyarrow(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.setattr(arrow_loader, "pyarrow", None)
+    with pytest.raises(ImportError):
+        ArrowLoader(tmp_path / "data.parquet")
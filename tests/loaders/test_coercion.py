@@ -0,0 +1,77 @@
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+import pytest
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Date,
+    DateTime,
+    Float,
+    Integer,
+    MetaData,
+    Numeric,
+    String,
+    Table,
+)
+
+from dbeditor.loaders.coercion import Coercer, CoercionError, ErrorPolicy
+
+TABLE = Table(
+    "t",
+    MetaData(),
+    Column("i", Integer),
+    Column("f", Float),
+    Column("n", Numeric),
+    Column("b", Boolean),
+    Column("d", Date),
+    Column("dt", DateTime),
+    Column("s", String),
+)
+
+
+@pytest.mark.parametrize(
+    "column, value, expected",
+    [
+        ("i", " 42 ", 42),
+        ("i", 42.0, 42),
+        ("i", "", None),
+        ("f", "1.5", 1.5),
+        ("n", "1.10", Decimal("1.10")),
+        ("b", "Yes", True),
+        ("b", "0", False),
+        ("d", "2021-12-01", date(2021, 12, 1)),
+        ("d", datetime(2021, 12, 1, 10), date(2021, 12, 1)),
+        ("dt", "2021-12-01 10:00", datetime(2021, 12, 1, 10)),
+        ("s", 123, "123"),
+        ("s", "", ""),
+        ("s", None, None),
+        ("unknown", "x", "x"),
+    ],
+)
+def test_coerce_row(column: str, value: Any, expected: Any) -> None:
+    assert Coercer(TABLE).coerce_row({column: value}) == {column: expected}
+
+
+def test_null_tokens() -> None:
+    coercer = Coercer(TABLE, null_tokens=("NULL", "None"))
+    assert coercer.coerce_row({"s": "NULL", "i": "None"}) == {
+        "s": None,
+        "i": None,
+    }
+
+
+def test_error_raise() -> None:
+    with pytest.raises(CoercionError):
+        Coercer(TABLE).coerce([{"i": "abc"}])
+
+
+def test_error_null() -> None:
+    coercer = Coercer(TABLE, errors=ErrorPolicy.NULL)
+    assert coercer.coerce([{"i": "abc", "s": "x"}]) == [{"i": None, "s": "x"}]
+
+
+def test_error_skip() -> None:
+    coercer = Coercer(TABLE, errors=ErrorPolicy.SKIP)
+    assert coercer.coerce([{"i": "abc"}, {"i": "1"}]) == [{"i": 1}]
@@ -1,5 +1,9 @@
+import pytest
+from sqlalchemy import MetaData, Table
+
 from dbeditor.database import Database
 from dbeditor.loaders.csv_loader import CSVLoader
+from dbeditor.loaders.coercion import Coercer
 from dbeditor.loaders.merger import Merger
 
 
@@ -12,3 +16,40 @@ def test_merge(database: Database, csv_loader: CSVLoader) -> None:
             (1, 42, "example"),
             (2, 7, "lorem ipsum"),
         ]
+
+
+def test_batches(csv_loader: CSVLoader) -> None:
+    merger = Merger(Table("t", MetaData()), batch_size=1)
+    assert list(merger.batches(csv_loader)) == [
+        [{"amount": "42", "name": "example"}],
+        [{"amount": "7", "name": "lorem ipsum"}],
+    ]
+
+
+def test_merge_commit_each_batch(
+    database: Database, csv_loader: CSVLoader
+) -> None:
+    table = database.get_table("second")
+    merger = Merger(table, batch_size=1, commit_each_batch=True)
+    with database.session as s:
+        merger.merge(s, csv_loader)
+    assert database.select_all("second") == [
+        (1, 42, "example"),
+        (2, 7, "lorem ipsum"),
+    ]
+
+
+def test_merger_invalid_batch_size() -> None:
+    with pytest.raises(ValueError):
+        Merger(Table("t", MetaData()), batch_size=0)
+
+
+def test_merge_coerced(database: Database, csv_loader: CSVLoader) -> None:
+    table = database.get_table("second")
+    merger = Merger(table, coercer=Coercer(table))
+    with database.session as s:
+        merger.merge(s, csv_loader)
+    assert database.execute_raw("SELECT typeof(amount) FROM second") == (
+        ["typeof(amount)"],
+        [("integer",), ("integer",)],
+    )
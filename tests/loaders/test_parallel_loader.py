@@ -0,0 +1,110 @@
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from dbeditor.database import Database
+from dbeditor.loaders.coercion import Coercer
+from dbeditor.loaders.merger import Merger
+from dbeditor.loaders.parallel_loader import (
+    CSVSource,
+    ParallelLoader,
+    PipelineError,
+    STOPPED,
+    WorksheetSource,
+    worksheet_sources,
+)
+
+
+def write_csv(path: Path, amounts: List[str]) -> CSVSource:
+    path.write_text("amount,name\n" + "".join(f"{a},x\n" for a in amounts))
+    return CSVSource(str(path))
+
+
+def test_parallel_loader(database: Database, tmp_path: Path) -> None:
+    sources = [
+        write_csv(tmp_path / f"{i}.csv", [str(i * 10 + j) for j in range(5)])
+        for i in range(3)
+    ]
+    table = database.get_table("second")
+    loader = ParallelLoader(sources, Coercer(table), batch_size=2, workers=2)
+    with loader, database.session as s:
+        Merger(table).merge(s, loader)
+    amounts = sorted(row[1] for row in database.select_all("second"))
+    assert amounts == [i * 10 + j for i in range(3) for j in range(5)]
+    assert [result.rows for result in loader.results] == [5, 5, 5]
+
+
+def test_parallel_loader_errors(tmp_path: Path) -> None:
+    sources = [
+        write_csv(tmp_path / "good.csv", ["1"]),
+        CSVSource(str(tmp_path / "missing.csv")),
+        write_csv(tmp_path / "also_good.csv", ["2"]),
+        CSVSource(str(tmp_path / "missing_too.csv")),
+    ]
+    with pytest.raises(PipelineError) as info:
+        with ParallelLoader(
+            sources, workers=1, stop_on_failure=False
+        ) as loader:
+            list(loader)
+    errors = [result.error for result in info.value.results]
+    assert errors[0] is None and errors[2] is None
+    assert "missing.csv" in str(errors[1])
+    assert "missing_too.csv" in str(errors[3])
+    assert str(info.value).index("missing.csv") < str(info.value).index(
+        "missing_too.csv"
+    )
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_parallel_loader_reports_every_source(
+    tmp_path: Path, workers: int
+) -> None:
+    sources = [
+        CSVSource(str(tmp_path / "missing.csv")),
+        write_csv(tmp_path / "first.csv", [str(i) for i in range(50)]),
+        write_csv(tmp_path / "second.csv", ["1", "2", "3"]),
+    ]
+    loader = ParallelLoader(
+        sources, batch_size=2, workers=workers, stop_on_failure=False
+    )
+    with pytest.raises(PipelineError) as info:
+        with loader:
+            list(loader)
+    assert [r.rows for r in info.value.results] == [0, 50, 3]
+    assert [r.error is None for r in info.value.results] == [
+        False,
+        True,
+        True,
+    ]
+
+
+def test_parallel_loader_stops_on_failure(tmp_path: Path) -> None:
+    sources = [
+        CSVSource(str(tmp_path / "missing.csv")),
+        write_csv(tmp_path / "rows.csv", [str(i) for i in range(1000)]),
+    ]
+    loader = ParallelLoader(sources, batch_size=2, workers=1, queue_size=2)
+    with pytest.raises(PipelineError) as info:
+        with loader:
+            list(loader)
+    missing, rows = info.value.results
+    assert "missing.csv" in str(missing.error)
+    assert rows.error == STOPPED
+    assert rows.rows < 1000
+
+
+def test_parallel_loader_batches(tmp_path: Path) -> None:
+    source = write_csv(tmp_path / "rows.csv", [str(i) for i in range(5)])
+    with ParallelLoader([source], batch_size=2) as loader:
+        assert next(loader)["amount"] == "0"
+        sizes = [len(batch) for batch in loader.batches(100)]
+    assert sizes == [1, 2, 1]
+
+
+def test_worksheet_sources() -> None:
+    path = str(Path(__file__).parent / "testcase.xlsx")
+    sources = worksheet_sources(path)
+    assert WorksheetSource(path, "Sheet1") in sources
+    with ParallelLoader(sources) as loader:
+        assert len(list(loader)) == sum(r.rows for r in loader.results)
@@ -0,0 +1,155 @@
+import shutil
+import subprocess
+from datetime import date
+from io import StringIO
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Iterator, List
+
+import pytest
+from sqlalchemy import Column, Date, Integer, JSON, MetaData, Table
+from sqlalchemy.dialects.postgresql.psycopg2 import PGDialect_psycopg2
+
+from dbeditor.database import Database
+from dbeditor.loaders.coercion import Coercer
+from dbeditor.loaders.csv_loader import CSVLoader
+from dbeditor.loaders.merger import Merger
+from dbeditor.loaders.pg_copy import CopyStream, copy_rows, format_row
+from dbeditor.uri_builder import build_uri, DatabaseKind
+
+
+@pytest.fixture
+def postgresql(tmp_path: Path) -> Iterator[Database]:
+    pytest.importorskip("psycopg2")
+    initdb, pg_ctl = shutil.which("initdb"), shutil.which("pg_ctl")
+    if initdb is None or pg_ctl is None:
+        pytest.skip("PostgreSQL server is not installed")
+    data, socket = tmp_path / "data", tmp_path / "socket"
+    socket.mkdir()
+    subprocess.run([initdb, "-A", "trust", "-D", str(data)], check=True)
+    options = f"-k {socket} -c listen_addresses=''"
+    subprocess.run(
+        [pg_ctl, "-D", str(data), "-o", options, "-w", "start"], check=True
+    )
+    try:
+        database = Database(
+            build_uri(DatabaseKind.POSTGRESQL, f"postgres?host={socket}")
+        )
+        yield database
+        database.engine.dispose()
+    finally:
+        subprocess.run([pg_ctl, "-D", str(data), "-w", "stop"], check=True)
+
+
+def test_format_row() -> None:
+    row = {
+        "a": None,
+        "b": "",
+        "c": 'say "hi"',
+        "d": True,
+        "e": date(2020, 1, 2),
+    }
+    assert format_row(row, ["a", "b", "c", "d", "e", "f"]) == (
+        ',"","say ""hi""","true","2020-01-02",\n'
+    )
+
+
+def test_copy_stream_chunks() -> None:
+    rows = [{"n": i} for i in range(100)]
+    stream = CopyStream(iter(rows), ["n"])
+    chunks = list(iter(lambda: stream.read(7), ""))
+    assert all(len(chunk) == 7 for chunk in chunks[:-1])
+    assert "".join(chunks) == "".join(f'"{i}"\n' for i in range(100))
+
+
+def test_merge_copy_fallback(database: Database, csv_loader: CSVLoader) -> None:
+    table = database.get_table("second")
+    merger = Merger(table, coercer=Coercer(table), use_copy=True)
+    with database.session as s:
+        merger.merge(s, csv_loader)
+    assert database.select_all("second") == [
+        (1, 42, "example"),
+        (2, 7, "lorem ipsum"),
+    ]
+
+
+class FakeSession:
+    """Session of psycopg2 connection which records ``COPY`` data and
+    inserted rows instead of sending them."""
+
+    def __init__(self) -> None:
+        self.copied: List[str] = []
+        self.inserted: List[Any] = []
+        self._bind = SimpleNamespace(dialect=PGDialect_psycopg2())
+
+    def get_bind(self) -> Any:
+        return self._bind
+
+    def connection(self) -> Any:
+        return SimpleNamespace(connection=SimpleNamespace(cursor=lambda: self))
+
+    def copy_expert(self, statement: str, stream: Any, size: int) -> None:
+        self.copied.append(statement + "\n" + stream.read())
+
+    def close(self) -> None:
+        pass
+
+    def execute(self, statement: Any, rows: List[Any]) -> None:
+        self.inserted.extend(rows)
+
+
+@pytest.fixture
+def pg_table() -> Table:
+    return Table(
+        "t",
+        MetaData(),
+        Column("id", Integer, primary_key=True),
+        Column("n", Integer),
+        Column("d", Date),
+        Column("data", JSON),
+    )
+
+
+def test_merge_batch_copy(pg_table: Table) -> None:
+    session: Any = FakeSession()
+    Merger(pg_table, use_copy=True).merge_batch(
+        session, [{"n": 1, "d": date(2020, 1, 2)}, {"n": None, "d": None}]
+    )
+    assert session.copied == [
+        'COPY t (n, d) FROM STDIN WITH (FORMAT csv)\n"1","2020-01-02"\n,\n'
+    ]
+    assert session.inserted == []
+
+
+@pytest.mark.parametrize(
+    "batch",
+    [
+        [{"n": 1}, {"unknown": 2}],
+        [{"n": 1, "data": {"key": [1, 2]}}],
+        [{"data": [1, 2]}],
+    ],
+)
+def test_merge_batch_copy_unsupported(pg_table: Table, batch: Any) -> None:
+    session: Any = FakeSession()
+    Merger(pg_table, use_copy=True).merge_batch(session, batch)
+    assert session.copied == []
+    assert session.inserted == batch
+    with pytest.raises(ValueError):
+        copy_rows(session, pg_table, batch)
+    assert session.copied == []
+
+
+def test_merge_copy(postgresql: Database) -> None:
+    postgresql.execute_raw(
+        "CREATE TABLE t (id SERIAL PRIMARY KEY, n INT, s TEXT, d DATE)"
+    )
+    table = postgresql.get_table("t")
+    merger = Merger(table, batch_size=2, coercer=Coercer(table), use_copy=True)
+    data = 'n,s,d\n1,"a,b",2020-01-02\n,,\n3,"x ""y""",'
+    with postgresql.session as s:
+        merger.merge(s, CSVLoader(StringIO(data)))
+    assert postgresql.select_all("t") == [
+        (1, 1, "a,b", date(2020, 1, 2)),
+        (2, None, "", None),
+        (3, 3, 'x "y"', None),
+    ]
@@ -0,0 +1,76 @@
+from io import StringIO
+from pathlib import Path
+from typing import Any
+
+import pytest
+from sqlalchemy import text
+
+from dbeditor.database import Database
+from dbeditor.loaders.coercion import Coercer, CoercionError
+from dbeditor.loaders.csv_loader import CSVLoader
+from dbeditor.loaders.merger import Merger
+from dbeditor.loaders.sqlite_tuning import sqlite_fast_import
+from dbeditor.uri_builder import build_uri, DatabaseKind
+
+
+@pytest.fixture
+def file_database(tmp_path: Path) -> Database:
+    uri = build_uri(DatabaseKind.SQLITE, str(tmp_path / "db.sqlite"))
+    database = Database(uri)
+    database.execute_raw("CREATE TABLE t (id INTEGER PRIMARY KEY, n INT)")
+    database.execute_raw("CREATE INDEX t_n ON t (n)")
+    return database
+
+
+def pragma(database: Database, name: str) -> Any:
+    with database.session as s:
+        return s.execute(text(f"PRAGMA {name}")).scalar()
+
+
+def merge(database: Database, data: str) -> None:
+    table = database.get_table("t")
+    merger = Merger(
+        table, coercer=Coercer(table), fast_import=True, rebuild_indexes=True
+    )
+    with database.session as s:
+        merger.merge(s, CSVLoader(StringIO(data)))
+
+
+def test_fast_import(file_database: Database) -> None:
+    merge(file_database, "n\n3\n1\n2")
+    assert file_database.select_all("t") == [(1, 3), (2, 1), (3, 2)]
+    assert pragma(file_database, "journal_mode") == "delete"
+    assert pragma(file_database, "synchronous") == 2
+    result = file_database.execute_raw(
+        "SELECT name FROM sqlite_master WHERE type = 'index'"
+    )
+    assert result is not None and list(result[1]) == [("t_n",)]
+
+
+def test_fast_import_failed(file_database: Database) -> None:
+    with pytest.raises(CoercionError):
+        merge(file_database, "n\n1\nabc")
+    assert file_database.select_all("t") == []
+    assert pragma(file_database, "journal_mode") == "delete"
+    result = file_database.execute_raw(
+        "SELECT name FROM sqlite_master WHERE type = 'index'"
+    )
+    assert result is not None and list(result[1]) == [("t_n",)]
+
+
+def test_fast_import_pragmas(file_database: Database) -> None:
+    table = file_database.get_table("t")
+    with file_database.session as s:
+        with sqlite_fast_import(s, table):
+            assert s.execute(text("PRAGMA synchronous")).scalar() == 1
+            assert s.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+    assert pragma(file_database, "synchronous") == 2
+
+
+def test_fast_import_commit_each_batch(file_database: Database) -> None:
+    with pytest.raises(ValueError):
+        Merger(
+            file_database.get_table("t"),
+            commit_each_batch=True,
+            fast_import=True,
+        )
@@ -1,8 +1,51 @@
+import os
+import shutil
+from pathlib import Path
+from typing import Set
+
+import pytest
+
 from dbeditor.loaders.xls_loader import XLSLoader
 
-ANSWER = [{"a": "a", "b": "123", "c": "b"}, {"a": "c", "b": "456", "c": "d"}]
+ANSWER = [{"a": "a", "b": 123, "c": "b"}, {"a": "c", "b": 456, "c": "d"}]
 
 
 def test_load_next(xls_loader: XLSLoader) -> None:
     for r, a in zip(xls_loader, ANSWER):
         assert r == a
+
+
+@pytest.fixture
+def workbook(tmp_path: Path) -> Path:
+    path = tmp_path / "workbook.xlsx"
+    shutil.copy(Path(__file__).parent / "testcase.xlsx", path)
+    return path
+
+
+def open_files() -> Set[str]:
+    descriptors = Path("/proc/self/fd")
+    if not descriptors.is_dir():
+        pytest.skip("open files of the process can't be listed")
+    return {os.path.realpath(fd) for fd in descriptors.iterdir()}
+
+
+def test_workbook_released(workbook: Path) -> None:
+    loader = XLSLoader(str(workbook), "Sheet1")
+    assert os.path.realpath(workbook) in open_files()
+    assert len(list(loader)) == 2
+    assert os.path.realpath(workbook) not in open_files()
+    workbook.unlink()
+
+
+def test_close(workbook: Path) -> None:
+    loader = XLSLoader(str(workbook), "Sheet1")
+    assert next(loader) == ANSWER[0]
+    loader.close()
+    assert os.path.realpath(workbook) not in open_files()
+    assert list(loader) == []
+    workbook.unlink()
+
+
+def test_missing_worksheet() -> None:
+    with pytest.raises(KeyError):
+        XLSLoader(str(Path(__file__).parent / "testcase.xlsx"), "Missing")
@@ -0,0 +1,113 @@
+import asyncio
+from pathlib import Path
+from sqlite3 import connect
+from typing import Any, Coroutine, TypeVar
+
+import pytest
+
+from dbeditor.async_database import AsyncDatabase
+from dbeditor.event_loop import schedule
+from dbeditor.uri_builder import build_uri, DatabaseKind, default_policy
+
+pytest.importorskip("aiosqlite")
+
+T = TypeVar("T")
+
+
+def _run(coroutine: Coroutine[Any, Any, T]) -> T:
+    return asyncio.run(coroutine)
+
+
+@pytest.fixture
+def path(tmp_path: Path) -> str:
+    path = str(tmp_path / "test.db")
+    with connect(path) as conn:
+        conn.executescript(
+            """
+            CREATE TABLE first (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT
+            );
+            INSERT INTO first(name) VALUES ('lorem'), ('ipsum');
+            """
+        )
+    conn.close()
+    return path
+
+
+async def _create(path: str) -> AsyncDatabase:
+    return await AsyncDatabase.create(
+        build_uri(DatabaseKind.SQLITE, path, asynchronous=True),
+        policy=default_policy(DatabaseKind.SQLITE, path, asynchronous=True),
+    )
+
+
+def test_open_table(path: str) -> None:
+    async def open_table() -> Any:
+        database = await _create(path)
+        try:
+            return await database.open_table("first")
+        finally:
+            await database.dispose()
+
+    summary = _run(open_table())
+    assert summary.rows == 2
+    assert summary.pk == ["id"]
+    assert summary.page == ([(1, "lorem"), (2, "ipsum")], (2,))
+
+
+def test_open_sorted_table(path: str) -> None:
+    async def open_table() -> Any:
+        database = await _create(path)
+        try:
+            await database.insert_rows(
+                "first", [{"name": "dolor"}, {"name": "amet"}]
+            )
+            await database.set_sort("first", "name", True)
+            return await database.open_table("first", limit=2)
+        finally:
+            await database.dispose()
+
+    summary = _run(open_table())
+    assert summary.rows == 4
+    assert summary.page[0] == [(1, "lorem"), (2, "ipsum")]
+
+
+def test_concurrent_calls(path: str) -> None:
+    async def modify() -> Any:
+        database = await _create(path)
+        try:
+            await database.execute_raw(
+                "CREATE TABLE second (id INTEGER PRIMARY KEY, amount INT)"
+            )
+            await asyncio.gather(
+                database.insert_row("first", {"name": "dolor"}),
+                database.insert_row("second", {"amount": 10}),
+                database.update_row("first", {"id": 1}, {"name": "test"}),
+            )
+            deleted = await database.delete_rows("first", [(2,)])
+            return deleted, await asyncio.gather(
+                database.fetch_page("first"),
+                database.count_rows("second"),
+                database.get_tables(),
+            )
+        finally:
+            await database.dispose()
+
+    deleted, (page, rows, tables) = _run(modify())
+    assert deleted == 1
+    assert page == ([(1, "test"), (3, "dolor")], (3,))
+    assert rows == 1
+    assert tables == ["first", "second"]
+
+
+def test_schedule() -> None:
+    async def answer() -> int:
+        return 42
+
+    assert not schedule(answer())
+
+    async def scheduled() -> bool:
+        return schedule(answer())
+
+    assert _run(scheduled())
@@ -0,0 +1,46 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from benchmarks.run import BENCHMARKS, main, run
+
+
+def test_run() -> None:
+    report = run(rows=20, width=4, repeat=2, operations=5)
+    results = {result["name"]: result for result in report["results"]}
+    assert set(results) == set(BENCHMARKS)
+    assert results["csv_loader"]["items"] == 20
+    assert results["rowid_edit"]["items"] == 5
+    assert all(len(result["times"]) == 2 for result in results.values())
+    assert report["parameters"]["rows"] == 20
+    json.dumps(report)
+
+
+def test_run_unknown() -> None:
+    with pytest.raises(ValueError):
+        run(rows=20, width=4, names=["unknown"])
+
+
+def test_main_output(tmp_path: Path) -> None:
+    output = tmp_path / "results.json"
+    main(
+        [
+            "--rows",
+            "10",
+            "--width",
+            "3",
+            "--repeat",
+            "1",
+            "--only",
+            "select_all",
+            "paged_read",
+            "--output",
+            str(output),
+        ]
+    )
+    report = json.loads(output.read_text())
+    assert [result["name"] for result in report["results"]] == [
+        "select_all",
+        "paged_read",
+    ]
@@ -63,3 +63,10 @@ def test_builder_group_create_table(
 ) -> None:
     group.create_table("example", database.metadata)
     assert database.get_tables() == ["first", "second", "example"]
+
+
+def test_builder_group_create_table_only_built(
+    group: BuilderGroup, database: Database
+) -> None:
+    group.create_table("example", database.metadata)
+    assert list(database.metadata.tables) == ["example"]
@@ -1,8 +1,14 @@
-from sqlalchemy.exc import IntegrityError
+from pathlib import Path
+from sqlite3 import connect
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError, NoSuchTableError
 
 import pytest
 
 from dbeditor.database import Database
+from dbeditor.uri_builder import build_uri, DatabaseKind, default_policy
 
 
 def test_get_tables(database: Database) -> None:
@@ -26,6 +32,21 @@ def test_insert_row(database: Database) -> None:
     ]
 
 
+def test_insert_rows(database: Database) -> None:
+    database.get_rowid("first", 0)
+    database.insert_rows(
+        "first",
+        [{"name": "a"}, {"name": "b"}, {"id": 10, "name": "c"}, {"name": "d"}],
+    )
+    assert database.select_all("first")[2:] == [
+        (3, "a"),
+        (4, "b"),
+        (10, "c"),
+        (11, "d"),
+    ]
+    assert database.get_rowids("first", [4, 5]) == [10, 11]
+
+
 def test_delete_row(database: Database) -> None:
     database.delete_row("first", {"id": 1})
     assert database.select_all("first") == [(2, "ipsum")]
@@ -61,3 +82,392 @@ def test_raw_execute_update(database: Database) -> None:
         (1, "lorem"),
         (2, "hello"),
     ]
+
+
+@pytest.fixture
+def rowid_database() -> Database:
+    conn = connect(":memory:")
+    conn.executescript(
+        "CREATE TABLE log (message TEXT);"
+        "INSERT INTO log VALUES ('a'), ('b'), ('c');"
+    )
+    return Database(build_uri(DatabaseKind.SQLITE, ""), creator=lambda: conn)
+
+
+def test_fetch_page(database: Database) -> None:
+    database.insert_row("first", {"name": "hello"})
+    rows, key = database.fetch_page("first", limit=2)
+    assert rows == [(1, "lorem"), (2, "ipsum")]
+    assert key == (2,)
+    rows, key = database.fetch_page("first", key, limit=2)
+    assert rows == [(3, "hello")]
+    assert key == (3,)
+    assert database.fetch_page("first", key, limit=2) == ([], None)
+
+
+def test_fetch_page_rowid(rowid_database: Database) -> None:
+    rows, key = rowid_database.fetch_page("log", limit=2)
+    assert rows == [("a",), ("b",)]
+    assert key == (2,)
+    assert rowid_database.fetch_page("log", key) == ([("c",)], (3,))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 100])
+def test_iter_rows(rowid_database: Database, chunk_size: int) -> None:
+    rows = rowid_database.iter_rows("log", chunk_size)
+    assert list(rows) == [("a",), ("b",), ("c",)]
+
+
+def test_get_rowid(rowid_database: Database) -> None:
+    assert rowid_database.get_rowids("log", [0, 1, 2]) == [1, 2, 3]
+    rowid_database.delete_row_through_rowid("log", 2)
+    assert rowid_database.get_rowid("log", 1) == 3
+    rowid_database.insert_row("log", {"message": "d"})
+    assert rowid_database.get_rowids("log", [0, 1, 2]) == [1, 3, 4]
+
+
+def test_get_rowid_cached(rowid_database: Database) -> None:
+    rowid_database.get_rowid("log", 0)
+    rowid_database.update_row_through_rowid("log", 1, {"message": "z"})
+    rowid_database.insert_row("log", {"message": "d"})
+    with rowid_database.session as s:
+        s.execute(text("DELETE FROM log WHERE rowid = 2"))
+        s.commit()
+    # the index is updated in place, so it doesn't notice the deletion
+    assert rowid_database.get_rowids("log", [0, 1, 2, 3]) == [1, 2, 3, 4]
+
+
+def test_get_rowid_explicit_key(database: Database) -> None:
+    database.insert_row("first", {"id": 10, "name": "c"})
+    assert database.get_rowids("first", [0, 1, 2]) == [1, 2, 10]
+    database.insert_row("first", {"id": 5, "name": "d"})
+    assert database.get_rowids("first", [0, 1, 2, 3]) == [1, 2, 5, 10]
+    assert database.get_positions("first", [(5,), (10,)]) == [2, 3]
+
+
+def test_get_positions_missing(rowid_database: Database) -> None:
+    assert rowid_database.get_positions("log", [(99,), (2,), (0,)]) == [1]
+    rowid_database.set_sort("log", "message", True)
+    assert rowid_database.get_positions("log", [(99,), (2,)]) == [1]
+
+
+def test_get_rowid_invalidated(tmp_path: Path) -> None:
+    path = tmp_path / "db.sqlite"
+    conn = connect(path)
+    conn.executescript(
+        "CREATE TABLE log (message TEXT);"
+        "INSERT INTO log VALUES ('a'), ('b'), ('c'), ('d');"
+    )
+    database = Database(
+        build_uri(DatabaseKind.SQLITE, str(path)),
+        policy=default_policy(DatabaseKind.SQLITE, str(path)),
+    )
+    assert database.get_rowid("log", 0) == 1
+    conn.execute("DELETE FROM log WHERE rowid = 1")
+    conn.commit()
+    assert database.get_rowid("log", 0) == 2
+    assert database.fetch_page("log")[0] == [("b",), ("c",), ("d",)]
+    database.execute_raw("DELETE FROM log WHERE rowid = 2")
+    assert database.get_rowid("log", 0) == 3
+    with database.session as s:
+        s.execute(text("DELETE FROM log WHERE rowid = 3"))
+        s.commit()
+    database.invalidate("log")
+    assert database.get_rowid("log", 0) == 4
+    conn.close()
+
+
+def test_get_rowid_pk_order(database: Database) -> None:
+    database.update_row("first", {"id": 1}, {"id": 5})
+    assert database.get_rowids("first", [0, 1]) == [2, 5]
+
+
+def test_delete_rows(database: Database) -> None:
+    for name in ("a", "b", "c"):
+        database.insert_row("first", {"name": name})
+    assert database.delete_rows("first", [(1,), (3,), (5,)]) == 3
+    assert database.select_all("first") == [(2, "ipsum"), (4, "b")]
+
+
+def test_delete_rows_chunked(
+    database: Database, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr("dbeditor.database._IN_CHUNK_SIZE", 1)
+    assert database.delete_rows("first", {(1,), (2,)}) == 2
+    assert database.select_all("first") == []
+
+
+def test_delete_rows_through_rowid(rowid_database: Database) -> None:
+    assert rowid_database.get_rowids("log", [0, 1, 2]) == [1, 2, 3]
+    assert rowid_database.delete_rows_through_rowid("log", [1, 3]) == 2
+    assert rowid_database.select_all("log") == [("b",)]
+    assert rowid_database.get_rowid("log", 0) == 2
+
+
+def test_update_rows(database: Database) -> None:
+    database.insert_row("first", {"name": "hello"})
+    database.update_rows(
+        "first",
+        [
+            ({"id": 1}, {"name": "a"}),
+            ({"id": 3}, {"name": "c"}),
+            ({"id": 2}, {"id": 4, "name": "b"}),
+        ],
+    )
+    assert database.select_all("first") == [(1, "a"), (3, "c"), (4, "b")]
+
+
+def test_update_rows_param_names(database: Database) -> None:
+    database.execute_raw("CREATE TABLE third (k0 INT PRIMARY KEY, v0 TEXT)")
+    database.execute_raw("INSERT INTO third VALUES (1, 'a'), (2, 'b')")
+    database.update_rows(
+        "third", [({"k0": 1}, {"v0": "c"}), ({"k0": 2}, {"k0": 3})]
+    )
+    assert database.select_all("third") == [(1, "c"), (3, "b")]
+
+
+def test_unit_of_work(database: Database) -> None:
+    with database.unit_of_work() as session:
+        database.insert_row("first", {"name": "a"})
+        database.update_row("first", {"id": 3}, {"name": "b"})
+        assert session.in_transaction()
+    assert database.select_all("first")[-1] == (3, "b")
+
+
+def test_unit_of_work_rollback(database: Database) -> None:
+    with pytest.raises(IntegrityError):
+        with database.unit_of_work():
+            database.insert_row("first", {"name": "a"})
+            database.update_row("first", {"id": 1}, {"id": 2})
+    assert database.select_all("first") == [(1, "lorem"), (2, "ipsum")]
+
+
+def test_policy_and_pool_status(tmp_path: Path) -> None:
+    uri = build_uri(DatabaseKind.SQLITE, str(tmp_path / "db.sqlite"))
+    database = Database(uri, policy=default_policy(DatabaseKind.SQLITE, "f"))
+    checkouts = database.pool_status()["checkouts"]
+    database.execute_raw("CREATE TABLE t (a INT)")
+    database.execute_raw("SELECT * FROM t")
+    status = database.pool_status()
+    assert status["pool"] == "QueuePool"
+    assert status["checkouts"] == checkouts + 2
+    assert status["checkedout"] == 0
+    assert status["checkedin"] == 1
+
+
+def test_lazy_reflection(database: Database) -> None:
+    assert list(database.metadata.tables) == []
+    assert database.get_tables() == ["first", "second"]
+    database.get_table("second")
+    assert list(database.metadata.tables) == ["second"]
+
+
+def test_forget_table(database: Database) -> None:
+    table = database.get_table("first")
+    database.forget_table("first")
+    assert "first" not in database.metadata.tables
+    assert database.get_table("first") is not table
+
+
+def test_drop_table(database: Database) -> None:
+    database.drop_table("first")
+    assert database.get_tables() == ["second"]
+    with pytest.raises(NoSuchTableError):
+        database.get_table("first")
+
+
+def test_raw_execute_ddl(database: Database) -> None:
+    assert database.get_table_column_names("first") == ["id", "name"]
+    database.execute_raw("ALTER TABLE first ADD COLUMN age INT")
+    database.execute_raw("CREATE TABLE third (a INT)")
+    assert database.get_table_column_names("first") == ["id", "name", "age"]
+    assert database.get_tables() == ["first", "second", "third"]
+
+
+def test_search(database: Database) -> None:
+    for name in ("Lorem ipsum", "50%", "a_b", "ab"):
+        database.insert_row("first", {"name": name})
+    assert database.search("first", "LOREM") == ([(1,), (3,)], (3,))
+    assert database.search("first", "lorem", after_key=(1,)) == ([(3,)], (3,))
+    assert database.search("first", "ipsum", limit=1) == ([(2,)], (2,))
+    assert database.search("first", "%")[0] == [(4,)]
+    assert database.search("first", "_")[0] == [(5,)]
+    assert database.get_positions("first", [(3,), (5,)]) == [2, 4]
+
+
+def test_search_sorted(database: Database) -> None:
+    database.set_sort("first", "name")
+    # keys come in their order, positions in the sorted order
+    assert database.search("first", "m") == ([(1,), (2,)], (2,))
+    assert database.get_positions("first", [(1,), (2,)]) == [1, 0]
+
+
+def test_search_index(rowid_database: Database) -> None:
+    rowid_database.create_search_index("log")
+    assert rowid_database.has_search_index("log")
+    assert rowid_database.get_tables() == ["log"]
+    rowid_database.insert_row("log", {"message": "brown fox"})
+    rowid_database.update_row_through_rowid("log", 1, {"message": "red fox"})
+    rowid_database.delete_row_through_rowid("log", 2)
+    assert rowid_database.search("log", "FO") == ([(1,), (4,)], (4,))
+    assert rowid_database.search("log", "c") == ([(3,)], (3,))
+    rowid_database.drop_table("log")
+    assert rowid_database.execute_raw("SELECT name FROM sqlite_master") == (
+        ["name"],
+        [],
+    )
+
+
+def test_fetch_page_cached(database: Database) -> None:
+    assert database.fetch_page("first") == database.fetch_page("first")
+    assert database.cache.stats.hits == 1
+    database.insert_row("first", {"name": "new"})
+    rows, _ = database.fetch_page("first")
+    assert rows[-1] == (3, "new")
+
+
+def test_execute_raw_cached(database: Database) -> None:
+    first = database.execute_raw("SELECT name FROM first  WHERE id = :id", id=1)
+    again = database.execute_raw("SELECT name FROM first WHERE id = :id;", id=1)
+    assert first == again and database.cache.stats.hits == 1
+    database.execute_raw("SELECT name FROM first WHERE name = 'a  b'")
+    database.execute_raw("SELECT name FROM first WHERE name = 'a b'")
+    assert database.cache.stats.hits == 1
+    database.execute_raw("UPDATE first SET name = 'changed' WHERE id = 1")
+    assert database.execute_raw(
+        "SELECT name FROM first WHERE id = :id", id=1
+    ) == (["name"], [("changed",)])
+
+
+def test_execute_raw_returning(database: Database) -> None:
+    query = "SELECT name FROM first WHERE id = 1"
+    database.execute_raw(query)
+    assert database.fetch_page("first")[0][0] == (1, "lorem")
+    assert database.execute_raw(
+        "UPDATE first SET name = 'changed' WHERE id = 1 RETURNING id"
+    ) == (["id"], [(1,)])
+    assert database.execute_raw(query) == (["name"], [("changed",)])
+    assert database.fetch_page("first")[0][0] == (1, "changed")
+
+
+def test_cache_notices_other_connections(tmp_path: Path) -> None:
+    path = tmp_path / "db.sqlite"
+    conn = connect(path)
+    conn.executescript("CREATE TABLE t (n INT); INSERT INTO t VALUES (1);")
+    database = Database(
+        build_uri(DatabaseKind.SQLITE, str(path)),
+        policy=default_policy(DatabaseKind.SQLITE, str(path)),
+    )
+    assert database.select_all("t") == [(1,)]
+    assert database.fetch_page("t")[0] == [(1,)]
+    conn.execute("INSERT INTO t VALUES (2)")
+    conn.commit()
+    assert database.fetch_page("t")[0] == [(1,), (2,)]
+
+
+def test_cache_disabled() -> None:
+    database = Database(build_uri(DatabaseKind.SQLITE, ""), cache_size=0)
+    database.execute_raw("SELECT 1")
+    database.execute_raw("SELECT 1")
+    assert database.cache.stats.hits == 0
+
+
+def _fill_second(database: Database) -> None:
+    amounts = [3, None, 1, 3, None, 2]
+    for i, amount in enumerate(amounts):
+        database.insert_row("second", {"amount": amount, "name": f"n{i}"})
+
+
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("limit", [1, 2, 4, 10])
+def test_fetch_page_sorted(
+    database: Database, descending: bool, limit: int
+) -> None:
+    _fill_second(database)
+    database.set_sort("second", "amount", descending)
+    rows, key = [], None
+    while True:
+        page, key = database.fetch_page("second", key, limit)
+        rows.extend(page)
+        if len(page) < limit:
+            break
+    # SQLite puts NULL first in ascending order
+    expected = [(2, None), (5, None), (3, 1), (6, 2), (1, 3), (4, 3)]
+    if descending:
+        expected.reverse()
+    assert [row[:2] for row in rows] == expected
+
+
+def test_sorted_positions(database: Database) -> None:
+    _fill_second(database)
+    database.set_sort("second", "amount", True)
+    assert database.get_rowids("second", [0, 1, 5]) == [4, 1, 2]
+    assert database.get_positions("second", [(4,), (2,), (6,)]) == [0, 5, 2]
+    database.update_row_through_rowid("second", 4, {"amount": 0})
+    assert database.get_rowid("second", 0) == 1
+    database.set_sort("second", None)
+    assert database.get_rowid("second", 0) == 1
+    assert database.fetch_page("second", limit=1)[0][0][0] == 1
+
+
+def test_positions_without_rowid(
+    database: Database, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(database.engine.dialect, "name", "postgresql")
+    statement = database._positions_statement("first", [(2,)])
+    query = str(statement.compile(dialect=postgresql.dialect()))
+    assert "rowid" not in query
+    assert "row_number() OVER (ORDER BY first.id)" in query
+    assert database.get_positions("first", [(2,), (3,), (1,)]) == [1, 0]
+
+
+def test_set_sort_unknown_column(database: Database) -> None:
+    with pytest.raises(KeyError):
+        database.set_sort("second", "missing")
+    assert database.get_sort("second") is None
+
+
+def test_sort_index(database: Database) -> None:
+    assert database.has_sort_index("second", "id")
+    assert not database.has_sort_index("second", "amount")
+    database.create_sort_index("second", "amount")
+    assert database.has_sort_index("second", "amount")
+    database.set_sort("second", "amount")
+    plan = database.explain("SELECT * FROM second ORDER BY amount, id")
+    assert not any("TEMP B-TREE" in line for line in plan)
+
+
+def test_indexes(database: Database) -> None:
+    assert database.get_indexes("second") == []
+    name = database.create_index("second", ["amount", "name"])
+    database.create_index("second", ["name"], "second_name", unique=True)
+    assert database.get_indexes("second") == [
+        {
+            "name": "ix_second_amount_name",
+            "column_names": ["amount", "name"],
+            "unique": False,
+        },
+        {"name": "second_name", "column_names": ["name"], "unique": True},
+    ]
+    assert (["name"], True) in database.get_index_columns("second")
+    plan = database.explain("SELECT * FROM second WHERE amount = 1")
+    assert name in plan[0]
+    database.drop_index("second", name)
+    assert [i["name"] for i in database.get_indexes("second")] == [
+        "second_name"
+    ]
+    plan = database.explain("SELECT * FROM second WHERE amount = 1")
+    assert name not in plan[0]
+
+
+def test_index_errors(database: Database) -> None:
+    with pytest.raises(ValueError):
+        database.create_index("second", [])
+    with pytest.raises(KeyError):
+        database.create_index("second", ["missing"])
+    with pytest.raises(KeyError):
+        database.drop_index("second", "missing")
+    database.execute_raw("CREATE INDEX raw_name ON second (name)")
+    database.get_table("second")
+    database.drop_index("second", "raw_name")
+    assert database.get_indexes("second") == []
@@ -0,0 +1,36 @@
+from dbeditor.database import Database
+from dbeditor.edit_buffer import EditBuffer
+
+
+def test_add_merges_rows(database: Database) -> None:
+    buffer = EditBuffer(database)
+    assert not buffer.add("first", {"id": 1}, {"name": "a"})
+    assert not buffer.add("first", {"id": 1}, {"name": "b"})
+    assert not buffer.add("first", {"id": 2}, {"name": "c"})
+    assert len(buffer) == 2
+    assert "first" in buffer
+    assert database.select_all("first") == [(1, "lorem"), (2, "ipsum")]
+    buffer.flush()
+    assert len(buffer) == 0
+    assert database.select_all("first") == [(1, "b"), (2, "c")]
+
+
+def test_add_full(database: Database) -> None:
+    buffer = EditBuffer(database, max_size=2)
+    assert not buffer.add("first", {"id": 1}, {"name": "a"})
+    assert buffer.add("first", {"id": 2}, {"name": "b"})
+
+
+def test_edit_key_column(database: Database) -> None:
+    buffer = EditBuffer(database)
+    buffer.add("first", {"id": 1}, {"id": 10})
+    buffer.add("first", {"id": 10}, {"name": "moved"})
+    buffer.flush()
+    assert database.select_all("first") == [(2, "ipsum"), (10, "moved")]
+
+
+def test_rowid_key(database: Database) -> None:
+    buffer = EditBuffer(database)
+    buffer.add("first", {"rowid": 2}, {"name": "test"})
+    buffer.flush()
+    assert database.select_all("first") == [(1, "lorem"), (2, "test")]
@@ -0,0 +1,55 @@
+from contextlib import nullcontext
+from io import StringIO
+from typing import List
+
+from dbeditor.database import Database
+from dbeditor.export_worker import ExportWorker
+from dbeditor.exporters.csv_exporter import CSVExporter
+
+
+def make_worker(
+    database: Database, query: str, output: StringIO
+) -> ExportWorker:
+    return ExportWorker(
+        database,
+        query,
+        lambda: nullcontext(CSVExporter(output, lineterminator="\n")),
+        chunk_size=2,
+    )
+
+
+def test_export_worker(database: Database) -> None:
+    database.execute_raw(
+        "INSERT INTO second (amount, name) "
+        "WITH RECURSIVE r(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM r "
+        "WHERE n < 5) SELECT n, 'row ' || n FROM r"
+    )
+    output = StringIO()
+    worker = make_worker(database, "SELECT amount FROM second", output)
+    progress: List[int] = []
+    finished: List[int] = []
+    worker.signals.progress.connect(lambda rows, _: progress.append(rows))
+    worker.signals.finished.connect(finished.append)
+    worker.run()
+    assert progress == [2, 4, 5]
+    assert finished == [5]
+    assert output.getvalue() == "amount\n1\n2\n3\n4\n5\n"
+
+
+def test_export_worker_cancel(database: Database) -> None:
+    output = StringIO()
+    worker = make_worker(database, "SELECT * FROM first", output)
+    cancelled: List[bool] = []
+    worker.signals.progress.connect(lambda *_: worker.cancel())
+    worker.signals.cancelled.connect(lambda: cancelled.append(True))
+    worker.run()
+    assert cancelled == [True]
+
+
+def test_export_worker_failed(database: Database) -> None:
+    errors: List[str] = []
+    worker = make_worker(database, "DELETE FROM first", StringIO())
+    worker.signals.failed.connect(errors.append)
+    worker.run()
+    assert errors == ["Statement doesn't return rows."]
+    assert len(database.select_all("first")) == 2
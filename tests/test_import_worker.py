@@ -0,0 +1,53 @@
+from contextlib import nullcontext
+from io import StringIO
+from typing import Any, List
+
+from dbeditor.database import Database
+from dbeditor.import_worker import ImportWorker
+from dbeditor.loaders.csv_loader import CSVLoader
+from dbeditor.loaders.merger import Merger
+
+INPUT = "amount,name\n" + "\n".join(f"{i},row {i}" for i in range(5))
+
+
+def make_worker(database: Database) -> ImportWorker:
+    merger = Merger(database.get_table("second"), batch_size=2)
+    return ImportWorker(
+        merger,
+        lambda: database.session,
+        lambda: nullcontext(CSVLoader(StringIO(INPUT))),
+    )
+
+
+def test_import_worker(database: Database) -> None:
+    worker = make_worker(database)
+    progress: List[int] = []
+    finished: List[int] = []
+    worker.signals.progress.connect(lambda rows, _: progress.append(rows))
+    worker.signals.finished.connect(finished.append)
+    worker.run()
+    assert progress == [2, 4, 5]
+    assert finished == [5]
+    assert len(database.select_all("second")) == 5
+
+
+def test_import_worker_cancel(database: Database) -> None:
+    worker = make_worker(database)
+    cancelled: List[bool] = []
+    worker.signals.progress.connect(lambda *_: worker.cancel())
+    worker.signals.cancelled.connect(lambda: cancelled.append(True))
+    worker.run()
+    assert cancelled == [True]
+    assert database.select_all("second") == []
+
+
+def test_import_worker_failed(database: Database) -> None:
+    def broken() -> Any:
+        raise OSError("no such file")
+
+    worker = make_worker(database)
+    worker._open_loader = broken
+    errors: List[str] = []
+    worker.signals.failed.connect(errors.append)
+    worker.run()
+    assert errors == ["no such file"]
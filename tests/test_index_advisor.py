@@ -0,0 +1,96 @@
+from typing import List
+
+import pytest
+
+from dbeditor.database import Database
+from dbeditor import index_advisor
+from dbeditor.index_advisor import ADVISOR_OPERATION, IndexAdvisor
+from dbeditor.profiler import StatementProfile
+
+
+@pytest.fixture
+def advised(database: Database) -> Database:
+    database.execute_raw("CREATE TABLE orders (ref TEXT, second_id INT)")
+    for i in range(40):
+        database.insert_row("second", {"amount": i % 4, "name": f"n{i}"})
+        database.insert_row("orders", {"ref": f"r{i}", "second_id": i})
+    return database
+
+
+def _profiles(*templates: str) -> List[StatementProfile]:
+    return [StatementProfile(template, None, 1, 1.0) for template in templates]
+
+
+def test_sorted_pages(advised: Database) -> None:
+    advised.profiler.enable()
+    advised.set_sort("second", "amount", True)
+    rows, key = advised.fetch_page("second", limit=10)
+    advised.fetch_page("second", key, limit=10)
+    suggestions = IndexAdvisor(advised).suggest()
+    assert [(s.name, s.executions) for s in suggestions] == [
+        ("ix_second_amount_id", 2)
+    ]
+    advised.create_index("second", ["amount", "id"])
+    advised.fetch_page("second", key, limit=10)
+    assert IndexAdvisor(advised).suggest() == []
+
+
+def test_where_clause(advised: Database) -> None:
+    profiles = _profiles(
+        "SELECT * FROM second WHERE name = ? AND amount > ? ORDER BY id",
+        "DELETE FROM second WHERE name = ?",
+        "UPDATE second SET amount=? WHERE second.id = ?",
+        "INSERT INTO second (amount, name) VALUES (?, ?)",
+        "SELECT * FROM second WHERE amount > ? ORDER BY amount",
+    )
+    suggestions = IndexAdvisor(advised).suggest(profiles)
+    assert [(s.columns, s.executions, s.writes) for s in suggestions] == [
+        (("name", "amount"), 2, 3),
+        (("amount",), 1, 3),
+    ]
+    # statements read one of 40 names, the first one also a third of them
+    assert suggestions[0].benefit == pytest.approx(2 - 1 / 40 / 3 - 1 / 40)
+    assert suggestions[1].benefit == pytest.approx(2 / 3)
+
+
+def test_distinct_sample(
+    advised: Database, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(index_advisor, "DISTINCT_SAMPLE", 8)
+    profiles = _profiles("SELECT * FROM second WHERE name = ?")
+    advised.profiler.enable()
+    suggestions = IndexAdvisor(advised).suggest(profiles)
+    # 8 of 40 names are counted
+    assert suggestions[0].benefit == pytest.approx(1 - 1 / 8)
+    assert any(
+        "LIMIT" in profile.template for profile in advised.profiler.statements()
+    )
+
+
+def test_joins_and_aliases(advised: Database) -> None:
+    profiles = _profiles(
+        'SELECT s.name FROM "second" AS s JOIN orders o '
+        "ON o.second_id = s.id WHERE o.ref IN (?, ...)",
+    )
+    suggestions = IndexAdvisor(advised).suggest(profiles)
+    assert [(s.table, s.columns) for s in suggestions] == [
+        ("orders", ("ref", "second_id"))
+    ]
+
+
+def test_ignored_statements(advised: Database) -> None:
+    profiles = _profiles(
+        # primary key
+        "SELECT * FROM second WHERE id > ? ORDER BY id LIMIT ?",
+        # reading all rows through index isn't faster than sorting them
+        "SELECT * FROM second ORDER BY amount",
+        # not comparisons of columns
+        "SELECT * FROM second WHERE lower(name) LIKE ? AND amount IS NOT NULL",
+        "SELECT * FROM nowhere WHERE a = ?",
+    )
+    profiles.append(
+        StatementProfile(
+            "SELECT * FROM orders WHERE ref = ?", ADVISOR_OPERATION
+        )
+    )
+    assert IndexAdvisor(advised).suggest(profiles) == []
@@ -0,0 +1,120 @@
+import json
+from pathlib import Path
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from dbeditor.database import Database
+from dbeditor.profiler import (
+    _STARTS,
+    SAMPLE_SIZE,
+    StatementProfile,
+    statement_template,
+)
+
+
+def test_statement_template() -> None:
+    assert (
+        statement_template("SELECT * FROM t2\n WHERE rowid = 12 AND x = 'a'")
+        == "SELECT * FROM t2 WHERE rowid = ? AND x = ?"
+    )
+    assert (
+        statement_template("DELETE FROM t WHERE id IN (?, ?, ?)")
+        == "DELETE FROM t WHERE id IN (?, ...)"
+    )
+
+
+def test_percentiles() -> None:
+    profile = StatementProfile("SELECT 1", None)
+    assert profile.p50 == 0
+    profile.latencies.extend(float(i) for i in range(1, 101))
+    assert profile.p50 == 50
+    assert profile.p99 == 99
+    assert profile.percentile(1) == 100
+
+
+def test_latencies_sample() -> None:
+    profile = StatementProfile("SELECT 1", None)
+    for i in range(3 * SAMPLE_SIZE):
+        profile.add(float(i), 1)
+    assert profile.count == profile.rows == 3 * SAMPLE_SIZE
+    assert len(profile.latencies) == SAMPLE_SIZE
+    assert max(profile.latencies) >= SAMPLE_SIZE
+
+
+def test_failed_execution(database: Database) -> None:
+    database.get_table("first")
+    database.profiler.enable()
+    with pytest.raises(OperationalError):
+        database.execute_raw("SELECT * FROM nowhere")
+    with database.engine.connect() as connection:
+        assert not connection.info[_STARTS]
+    database.select_all("first")
+    profiles = database.profiler.statements()
+    assert "SELECT * FROM nowhere" not in [p.template for p in profiles]
+    select = [p for p in profiles if p.operation == "select_all"]
+    assert len(select) == 1 and select[0].count == 1
+
+
+def test_disabled_by_default(database: Database) -> None:
+    database.select_all("first")
+    assert not database.profiler.enabled
+    assert database.profiler.statements() == []
+
+
+def test_operations(database: Database) -> None:
+    database.get_table("first")
+    profiler = database.profiler
+    profiler.enable()
+    database.select_all("first")
+    for position in range(2):
+        rowid = database.get_rowid("first", position)
+        database.update_row_through_rowid("first", rowid, {"name": "x"})
+    database.execute_raw("SELECT name FROM first")
+    profiler.disable()
+    database.select_all("first")
+
+    profiles = {(p.operation, p.template): p for p in profiler.statements()}
+    assert {operation for operation, _ in profiles} == {
+        "select_all",
+        "get_rowid",
+        "update_row_through_rowid",
+        "execute_raw",
+    }
+    update = profiles[
+        "update_row_through_rowid", "UPDATE first SET name=? WHERE rowid = ?"
+    ]
+    assert update.count == 2
+    assert update.rows == 2
+    # rowids are scanned once and then cached
+    scan = profiles["get_rowid", "SELECT rowid FROM first ORDER BY first.id"]
+    assert scan.count == 1
+    assert all(p.total >= p.p99 >= p.p50 > 0 for p in profiles.values())
+    assert profiler.pool().checkouts == profiler.pool().checkins > 0
+
+
+def test_reset_and_dump(database: Database, tmp_path: Path) -> None:
+    database.get_table("first")
+    database.profiler.enable()
+    database.select_all("first")
+    path = tmp_path / "profile.json"
+    database.profiler.dump(path)
+    report = json.loads(path.read_text())
+    assert report["statements"][0]["operation"] == "select_all"
+    assert report["statements"][0]["count"] == 1
+    assert report["pool"]["checkouts"] >= 1
+    database.profiler.reset()
+    assert database.profiler.statements() == []
+
+
+@pytest.mark.parametrize("operation", ["outer", None])
+def test_nested_operation(database: Database, operation: str) -> None:
+    database.get_table("first")
+    database.profiler.enable()
+    if operation is None:
+        database.select_all("first")
+    else:
+        with database.profiler.operation(operation):
+            database.select_all("first")
+    (profile,) = database.profiler.statements()
+    assert profile.operation == (operation or "select_all")
@@ -0,0 +1,95 @@
+from pathlib import Path
+from typing import Any, List
+
+import pytest
+
+from dbeditor.database import Database
+from dbeditor.query_stats import QueryStats, SlowQueryLog
+from dbeditor.query_worker import QueryWorker
+
+
+def test_execute_raw_stats(database: Database) -> None:
+    recorded: List[QueryStats] = []
+    database.instrumentation.add_listener(recorded.append)
+    database.execute_raw("SELECT * FROM first")
+    database.execute_raw("SELECT * FROM first")
+    database.execute_raw("UPDATE first SET name = 'x' WHERE id = 1")
+    assert [s.rows_returned for s in recorded] == [2, 2, 0]
+    assert [s.cached for s in recorded] == [False, True, False]
+    assert recorded[0].bytes_fetched > 0
+    assert recorded[2].rows_affected == 1
+    assert database.instrumentation.last is recorded[2]
+
+
+def test_explain(database: Database) -> None:
+    database.execute_raw("CREATE INDEX second_amount ON second (amount)")
+    plan = database.explain(
+        "SELECT * FROM first WHERE id IN "
+        "(SELECT id FROM second WHERE amount = :amount)",
+        {"amount": 1},
+    )
+    assert any("second_amount" in line for line in plan)
+    assert any(line.startswith("  ") for line in plan)
+    assert database.explain("SELECT * FROM nowhere")[0].startswith(
+        "Can't explain"
+    )
+
+
+def test_explain_without_analyze(
+    database: Database, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(database.engine.dialect, "name", "postgresql")
+    # SQLite understands plain EXPLAIN but not its PostgreSQL options
+    assert database.explain("SELECT * FROM first")[0].startswith(
+        "Can't explain"
+    )
+    plan = database.explain("SELECT * FROM first", analyze=False)
+    assert not plan[0].startswith("Can't explain")
+
+
+def test_capture_plans(database: Database) -> None:
+    database.instrumentation.capture_plans = True
+    database.execute_raw("SELECT * FROM first WHERE id = 1")
+    stats = database.instrumentation.last
+    assert stats is not None and stats.plan and "first" in stats.plan[0]
+
+
+def test_capture_plans_without_analyze(
+    database: Database, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    database.instrumentation.capture_plans = True
+    monkeypatch.setattr(database.engine.dialect, "name", "postgresql")
+    result = database.execute_raw("SELECT :analyze AS n", analyze=2)
+    assert result == (["n"], [(2,)])
+    stats = database.instrumentation.last
+    assert stats is not None and stats.plan
+    assert not stats.plan[0].startswith("Can't explain")
+
+
+def test_slow_query_log(tmp_path: Path) -> None:
+    log = SlowQueryLog(tmp_path / "logs" / "slow.log", threshold=0.5)
+    log(QueryStats("SELECT 1", elapsed=0.1))
+    log(QueryStats("SELECT 2", elapsed=0.7, rows_returned=1))
+    log(QueryStats("SELECT 3", elapsed=0.9, cached=True))
+    assert [(s.query, s.rows_returned) for s in log.read()] == [("SELECT 2", 1)]
+
+
+def test_query_worker_measured(database: Database) -> None:
+    worker = QueryWorker(database, "SELECT * FROM first", explain=True)
+    measured: List[QueryStats] = []
+    worker.signals.measured.connect(measured.append)
+    worker.run()
+    assert len(measured) == 1
+    assert measured[0].rows_returned == 2 and measured[0].plan
+    assert database.instrumentation.last is measured[0]
+
+
+def test_query_worker_explain_without_analyze(
+    database: Database, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    calls: List[Any] = []
+    monkeypatch.setattr(
+        database, "explain", lambda *args, **kwargs: calls.append(kwargs)
+    )
+    QueryWorker(database, "SELECT * FROM first", explain=True).run()
+    assert calls == [{"analyze": False}]
@@ -0,0 +1,110 @@
+from pathlib import Path
+from typing import Any, List
+
+import pytest
+
+from dbeditor.database import Database
+from dbeditor.query_worker import QueryWorker
+from dbeditor.raw_query import QueryCancelled, RawQuery
+from dbeditor.uri_builder import build_uri, DatabaseKind
+
+
+@pytest.fixture
+def file_database(tmp_path: Path) -> Database:
+    return Database(build_uri(DatabaseKind.SQLITE, str(tmp_path / "db")))
+
+
+def collect(worker: QueryWorker) -> List[Any]:
+    events: List[Any] = []
+    worker.signals.started.connect(lambda names: events.append(names))
+    worker.signals.rows.connect(lambda rows: events.append(len(rows)))
+    worker.signals.finished.connect(
+        lambda rows, _, affected, truncated: events.append(
+            (rows, affected, truncated)
+        )
+    )
+    worker.signals.cancelled.connect(lambda: events.append("cancelled"))
+    worker.signals.failed.connect(lambda error: events.append(error))
+    return events
+
+
+def test_raw_query_fetch(database: Database) -> None:
+    with RawQuery(database, "SELECT * FROM first ORDER BY id") as query:
+        assert query.columns == ["id", "name"]
+        assert query.fetch(1) == [(1, "lorem")]
+        assert query.fetch(5) == [(2, "ipsum")]
+        assert query.fetch(5) == []
+
+
+def test_raw_query_write(database: Database) -> None:
+    version = database.data_version("first")
+    with RawQuery(database, "DELETE FROM first") as query:
+        assert query.columns == [] and query.rowcount == 2
+    assert database.select_all("first") == []
+    assert database.data_version("first") != version
+
+
+def test_raw_query_returning(database: Database) -> None:
+    assert database.get_rowid("first", 0) == 1
+    query = "DELETE FROM first WHERE id = 1 RETURNING id"
+    with RawQuery(database, query) as raw_query:
+        assert raw_query.fetch(5) == [(1,)]
+    assert database.get_rowids("first", [0]) == [2]
+    assert database.fetch_page("first") == ([(2, "ipsum")], (2,))
+
+
+def test_raw_query_cancelled(database: Database) -> None:
+    with RawQuery(database, "DELETE FROM first") as query:
+        query.cancel()
+        with pytest.raises(QueryCancelled):
+            query.fetch(1)
+    assert len(database.select_all("first")) == 2
+
+
+def test_raw_query_timeout(file_database: Database) -> None:
+    endless = (
+        "WITH RECURSIVE r(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM r) "
+        "SELECT count(*) FROM r"
+    )
+    with pytest.raises(Exception, match="interrupted"):
+        with RawQuery(file_database, endless, timeout=0.1) as query:
+            query.fetch(1)
+
+
+def test_query_worker(database: Database) -> None:
+    database.execute_raw(
+        "INSERT INTO second (amount) "
+        "WITH RECURSIVE r(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM r "
+        "LIMIT 10) SELECT n FROM r"
+    )
+    worker = QueryWorker(
+        database, "SELECT amount FROM second", max_rows=7, chunk_size=3
+    )
+    events = collect(worker)
+    worker.run()
+    assert events == [["amount"], 3, 3, 1, (7, -1, True)]
+
+
+def test_query_worker_cancel(database: Database) -> None:
+    worker = QueryWorker(database, "SELECT * FROM first", chunk_size=1)
+    events = collect(worker)
+    worker.signals.rows.connect(lambda _: worker.cancel())
+    worker.run()
+    assert events == [["id", "name"], 1, "cancelled"]
+
+
+def test_query_worker_failed(database: Database) -> None:
+    worker = QueryWorker(database, "SELECT * FROM nowhere")
+    events = collect(worker)
+    worker.run()
+    assert len(events) == 1 and "no such table" in events[0]
+
+
+def test_query_worker_cached(database: Database) -> None:
+    results = []
+    for _ in range(2):
+        worker = QueryWorker(database, "SELECT * FROM first", chunk_size=1)
+        results.append(collect(worker))
+        worker.run()
+    assert results[0] == results[1] == [["id", "name"], 1, 1, (2, -1, False)]
+    assert database.cache.stats.hits == 1
@@ -0,0 +1,28 @@
+from dbeditor.result_cache import ResultCache, estimate_size
+
+
+def test_lru_eviction() -> None:
+    cache = ResultCache(max_size=10)
+    cache.put("a", 1, 4)
+    cache.put("b", 2, 4)
+    assert cache.get("a") == 1
+    cache.put("c", 3, 4)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    stats = cache.stats
+    assert (stats.hits, stats.misses, stats.evictions) == (3, 1, 1)
+    assert (stats.entries, stats.size) == (2, 8)
+
+
+def test_too_large_value() -> None:
+    cache = ResultCache(max_size=10)
+    cache.put("a", 1, 11)
+    assert cache.get("a") is None and cache.stats.entries == 0
+
+
+def test_clear() -> None:
+    cache = ResultCache()
+    cache.put("a", [(1, "x")], estimate_size([(1, "x")]))
+    assert cache.stats.size > 0
+    cache.clear()
+    assert cache.get("a") is None and cache.stats.size == 0
@@ -0,0 +1,76 @@
+from typing import List, Optional
+
+import pytest
+
+from dbeditor.database import Database, Key, Page
+from dbeditor.table_model import TableModel
+
+
+@pytest.fixture
+def model(database: Database) -> TableModel:
+    def fetcher(key: Optional[Key], limit: int) -> Page:
+        return database.fetch_page("first", key, limit)
+
+    return TableModel(["id", "name"], fetcher, page_size=1)
+
+
+def texts(model: TableModel) -> List[List[str]]:
+    return [
+        [model.index(row, col).data() for col in range(model.columnCount())]
+        for row in range(model.rowCount())
+    ]
+
+
+def test_fetch_more(model: TableModel) -> None:
+    assert model.rowCount() == 0
+    model.fetchMore(model.index(-1, -1))
+    assert texts(model) == [["1", "lorem"]]
+    model.fetchMore(model.index(-1, -1))
+    model.fetchMore(model.index(-1, -1))
+    assert texts(model) == [["1", "lorem"], ["2", "ipsum"]]
+    assert not model.canFetchMore(model.index(-1, -1))
+
+
+def test_deferred_fetching(model: TableModel, database: Database) -> None:
+    model.defer_fetching()
+    assert not model.canFetchMore(model.index(-1, -1))
+    model.fetchMore(model.index(-1, -1))
+    assert model.rowCount() == 0
+    model.add_page(*database.fetch_page("first", None, model.page_size))
+    assert model.canFetchMore(model.index(-1, -1))
+    model.fetchMore(model.index(-1, -1))
+    assert texts(model) == [["1", "lorem"], ["2", "ipsum"]]
+
+
+def test_resume_fetching(model: TableModel) -> None:
+    model.defer_fetching()
+    model.resume_fetching()
+    assert model.canFetchMore(model.index(-1, -1))
+    model.fetchMore(model.index(-1, -1))
+    assert texts(model) == [["1", "lorem"]]
+
+
+def test_pending_rows_after_fetched(model: TableModel) -> None:
+    row = model.append_pending()
+    assert row == 0 and model.is_pending(0)
+    model.setData(model.index(0, 1), "new")
+    model.fetchMore(model.index(-1, -1))
+    assert texts(model) == [["1", "lorem"], ["", "new"]]
+    assert model.pending == [{1: "new"}]
+
+
+def test_set_data_emits_previous_value(model: TableModel) -> None:
+    model.fetchMore(model.index(-1, -1))
+    edits = []
+    model.cellEdited.connect(lambda *args: edits.append(args))
+    model.setData(model.index(0, 1), "test")
+    assert edits == [(0, 1, "lorem")]
+    assert model.value(0, 1) == "test"
+
+
+def test_remove_rows(model: TableModel) -> None:
+    model.fetchMore(model.index(-1, -1))
+    model.append_pending()
+    assert model.removeRows(0, 2)
+    assert model.rowCount() == 0
+    assert model.pending == []
@@ -1,8 +1,16 @@
-from typing import Optional
+from typing import Optional, Type
 
 import pytest
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool, StaticPool
 
-from dbeditor.uri_builder import _get_protocol, DatabaseKind, build_uri, Netloc
+from dbeditor.uri_builder import (
+    _get_protocol,
+    DatabaseKind,
+    build_uri,
+    Netloc,
+    ConnectionPolicy,
+    default_policy,
+)
 
 
 @pytest.mark.parametrize(
@@ -17,6 +25,18 @@ def test_get_protocol(kind: DatabaseKind, expected: str) -> None:
     assert _get_protocol(kind) == expected
 
 
+@pytest.mark.parametrize(
+    "kind, expected",
+    [
+        (DatabaseKind.SQLITE, "sqlite+aiosqlite"),
+        (DatabaseKind.MYSQL, "mysql+aiomysql"),
+        (DatabaseKind.POSTGRESQL, "postgresql+asyncpg"),
+    ],
+)
+def test_get_protocol_asynchronous(kind: DatabaseKind, expected: str) -> None:
+    assert _get_protocol(kind, asynchronous=True) == expected
+
+
 def test_get_protocol_sqlite_with_driver() -> None:
     with pytest.raises(ValueError):
         _get_protocol(DatabaseKind.SQLITE, "sqlite")
@@ -57,3 +77,42 @@ def test_build_uri_sqlite_with_netloc() -> None:
     netloc = Netloc("a", "b", "c")
     with pytest.raises(ValueError):
         build_uri(DatabaseKind.SQLITE, "db.sqlite", netloc)
+
+
+def test_connection_policy_engine_kwargs() -> None:
+    policy = ConnectionPolicy(
+        QueuePool, pool_size=3, connect_args={"timeout": 5}
+    )
+    assert policy.engine_kwargs() == {
+        "pool_pre_ping": False,
+        "pool_recycle": -1,
+        "poolclass": QueuePool,
+        "pool_size": 3,
+        "connect_args": {"timeout": 5},
+    }
+
+
+@pytest.mark.parametrize(
+    "kind, path, pool_class",
+    [
+        (DatabaseKind.SQLITE, "", StaticPool),
+        (DatabaseKind.SQLITE, "db.sqlite", QueuePool),
+        (DatabaseKind.POSTGRESQL, "db", QueuePool),
+    ],
+)
+def test_default_policy(
+    kind: DatabaseKind, path: str, pool_class: Type[Pool]
+) -> None:
+    policy = default_policy(kind, path)
+    assert policy.pool_class is pool_class
+    if kind == DatabaseKind.SQLITE:
+        assert policy.connect_args == {"check_same_thread": False}
+    else:
+        assert policy.pre_ping
+
+
+def test_default_policy_asynchronous() -> None:
+    policy = default_policy(DatabaseKind.MYSQL, "db", asynchronous=True)
+    assert policy.pool_class is AsyncAdaptedQueuePool
+    policy = default_policy(DatabaseKind.SQLITE, "", asynchronous=True)
+    assert policy.pool_class is StaticPool